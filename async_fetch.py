@@ -0,0 +1,59 @@
+import asyncio
+import time
+import metrics
+
+# 호출별 기본 타임아웃 (초)
+DEFAULT_TIMEOUT = 10
+FETCH_TIMEOUTS = {
+    'candles': 10,
+    'fear_greed': 10,
+    'balances': 5,
+    'orderbook': 3,
+    'current_price': 3,
+}
+
+
+async def call_with_timeout(fn, *args, timeout=DEFAULT_TIMEOUT, name=None):
+    """
+    블로킹 함수(requests 기반 python_bithumb 등)를 스레드에서 실행하고 타임아웃을 적용합니다.
+    타임아웃이 나면 결과를 기다리지 않고 asyncio.TimeoutError를 발생시킵니다.
+    (메트릭이 켜져 있으면 fetch span으로 기록, name이 없으면 함수 이름 사용)
+    """
+    with metrics.span("fetch", call=name or fn.__name__):
+        return await asyncio.wait_for(asyncio.to_thread(fn, *args), timeout)
+
+
+async def gather_calls(calls, timeouts=None):
+    """
+    서로 독립적인 조회들을 동시에 실행합니다. 틱 지연은 합이 아니라 가장 느린 호출에 의해 결정됩니다.
+
+    Args:
+        calls (dict): 이름 -> (함수, 인자...) 튜플
+        timeouts (dict): 이름 -> 타임아웃(초), 없으면 DEFAULT_TIMEOUT
+
+    Returns:
+        tuple: (values, errors, elapsed)
+            values (dict): 이름 -> 결과 (실패 시 None)
+            errors (dict): 이름 -> 예외 (실패한 호출만)
+            elapsed (float): 전체 소요 시간(초)
+    """
+    timeouts = timeouts or {}
+    names = list(calls)
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(call_with_timeout(*calls[name], timeout=timeouts.get(name, DEFAULT_TIMEOUT), name=name) for name in names),
+        return_exceptions=True,
+    )
+    values = {}
+    errors = {}
+    for name, result in zip(names, results):
+        if isinstance(result, BaseException):
+            if isinstance(result, asyncio.TimeoutError):
+                result = TimeoutError(f"{timeouts.get(name, DEFAULT_TIMEOUT)}초 타임아웃")
+            errors[name] = result
+            values[name] = None
+        else:
+            values[name] = result
+    elapsed = time.perf_counter() - start
+    metrics.observe("tick_fetch_seconds", elapsed)
+    return values, errors, elapsed
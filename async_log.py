@@ -0,0 +1,229 @@
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime
+from logging.handlers import QueueHandler
+import metrics
+
+# 로그 레벨 (DEBUG/INFO/WARNING/ERROR), 꺼진 레벨의 log.debug(...)는 레코드도 만들지 않음
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# JSON 줄 로그 파일 디렉터리 (빈 문자열이면 파일 기록 안 함), 파일 이름은 실행한 스크립트 이름
+LOG_DIR = os.getenv("LOG_DIR", "logs")
+# 콘솔에도 메시지를 출력할지 여부
+LOG_CONSOLE = os.getenv("LOG_CONSOLE", "1") == "1"
+# 파일이 이 크기를 넘으면 .1, .2 ...로 회전
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUPS = 5
+# 큐가 가득 차면 기다리지 않고 버림 (log_dropped_total 증가) - 로깅이 주문을 막지 않도록
+LOG_QUEUE_SIZE = 10000
+# 기록 스레드가 한 번에 모아 쓰는 최대 레코드 수
+BATCH_SIZE = 256
+
+# LogRecord 기본 속성 (extra로 넘긴 필드만 JSON에 따로 담기 위해 구분)
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {'message', 'asctime'}
+
+_lock = threading.Lock()
+_writer = None
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    레코드를 JSON 한 줄로 만듭니다.
+    {"ts", "level", "logger", "msg"} + extra로 넘긴 필드 (+ 예외가 있으면 "exc")
+    """
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """
+    레코드를 포맷하지 않은 채로 큐에 넣는 핸들러.
+    메시지 조립(% 인자 치환), JSON 직렬화, 예외 트레이스백 문자열화는 모두 기록 스레드에서 합니다.
+    (그래서 인자로 넘긴 dict/list는 로그를 남긴 뒤 수정하지 말 것)
+    """
+
+    dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _NonBlockingQueueHandler.dropped += 1
+            metrics.inc("log_dropped_total")
+
+
+class _BatchWriter(threading.Thread):
+    """큐에서 레코드를 모아 콘솔/파일에 한 번씩 쓰는 백그라운드 스레드"""
+
+    _STOP = object()
+
+    def __init__(self, records, path, console):
+        super().__init__(name="async-log-writer", daemon=True)
+        self.records = records
+        self.path = path
+        self.console = console
+        self.console_format = logging.Formatter("%(message)s")
+        self.json_format = JsonFormatter()
+        self.file = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.file = open(path, 'a', encoding='utf-8')
+
+    def run(self):
+        while True:
+            batch = [self.records.get()]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self.records.get_nowait())
+                except queue.Empty:
+                    break
+            stop = self._STOP in batch
+            if stop:
+                batch = batch[:batch.index(self._STOP)]
+            try:
+                self._write(batch)
+            except Exception as e:  # 로깅 실패로 스레드가 죽지 않도록
+                sys.stderr.write(f"❗ 로그 기록 오류: {e}\n")
+            if stop:
+                if self.file:
+                    self.file.close()
+                return
+
+    def _write(self, batch):
+        if not batch:
+            return
+        if self.console:
+            sys.stdout.write("".join(self.console_format.format(r) + "\n" for r in batch))
+            sys.stdout.flush()
+        if self.file:
+            self.file.write("".join(self.json_format.format(r) + "\n" for r in batch))
+            self.file.flush()
+            if self.file.tell() >= LOG_MAX_BYTES:
+                self._rotate()
+
+    def _rotate(self):
+        self.file.close()
+        for i in range(LOG_BACKUPS - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+        self.file = open(self.path, 'a', encoding='utf-8')
+
+    def stop(self, timeout=5):
+        self.records.put(self._STOP)
+        self.join(timeout)
+
+
+def default_path():
+    """LOG_DIR/<실행한 스크립트 이름>.jsonl (LOG_DIR이 비어 있으면 None)"""
+    if not LOG_DIR:
+        return None
+    script = os.path.splitext(os.path.basename(sys.argv[0] or ""))[0] or "bot"
+    return os.path.join(LOG_DIR, f"{script}.jsonl")
+
+
+def setup(path=None, level=LOG_LEVEL, console=LOG_CONSOLE):
+    """
+    루트 로거를 비동기 큐 기반으로 설정합니다. (여러 번 호출해도 한 번만 설정)
+    호출한 스레드는 레코드를 큐에 넣기만 하고, 콘솔/파일 출력은 기록 스레드가 묶어서 처리합니다.
+
+    Args:
+        path (str): JSON 줄 로그 파일 경로 (기본: default_path())
+        level (str): 로그 레벨
+        console (bool): 콘솔 출력 여부
+    """
+    global _writer
+    with _lock:
+        if _writer is not None:
+            return
+        records = queue.Queue(LOG_QUEUE_SIZE)
+        _writer = _BatchWriter(records, path or default_path(), console)
+        _writer.start()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_NonBlockingQueueHandler(records))
+        root.setLevel(level)
+        metrics.install_log_handler(root)
+        atexit.register(shutdown)
+
+
+def shutdown():
+    """큐에 남은 레코드를 모두 기록하고 기록 스레드를 멈춥니다. (종료 시 자동 호출)"""
+    global _writer
+    with _lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.stop()
+
+
+class LazyJson:
+    """
+    로그 인자로 넘기면 메시지를 실제로 조립할 때(기록 스레드에서, 레벨이 켜져 있을 때만) JSON 문자열로 바뀝니다.
+
+    사용 예:
+        log.debug("응답 JSON:\n%s", LazyJson(result_json))
+    """
+    __slots__ = ('value', 'indent')
+
+    def __init__(self, value, indent=4):
+        self.value = value
+        self.indent = indent
+
+    def __str__(self):
+        return json.dumps(self.value, indent=self.indent, ensure_ascii=False, default=str)
+
+
+def dropped():
+    """큐가 가득 차서 버린 레코드 수"""
+    return _NonBlockingQueueHandler.dropped
+
+
+def get_logger(name):
+    """setup()을 보장한 뒤 name 로거를 반환합니다."""
+    setup()
+    return logging.getLogger(name)
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    # 호출 측 지연: 동기 print 대비 (콘솔은 끄고 파일만 기록)
+    path = os.path.join(tempfile.mkdtemp(), "bench.jsonl")
+    setup(path, console=False)
+    log = get_logger("bench")
+    n = 5_000
+    order = {'uuid': 'C0101000000001', 'side': 'bid', 'price': '10000', 'state': 'wait'}
+    start = time.perf_counter()
+    for i in range(n):
+        log.info("주문 결과 %s", order, extra={'tick': i})
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    for i in range(n):
+        log.debug("꺼진 레벨 %s", order)
+    disabled = time.perf_counter() - start
+    shutdown()
+    with open(path, encoding='utf-8') as f:
+        lines = f.readlines()
+    print(f"⏱️ log.info: 호출당 {elapsed / n * 1e6:.2f} µs, 꺼진 log.debug: {disabled / n * 1e9:.0f} ns")
+    print(f"📄 {len(lines)}줄 기록, 큐 포화로 버림 {dropped()}줄: {lines[-1].strip()}")
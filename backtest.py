@@ -0,0 +1,163 @@
+import time
+import numpy as np
+import pandas as pd
+import strategy
+
+# yhgo_okno-gpt.py 메인 루프와 같은 매매 설정
+FIXED_BUY_AMOUNT = 10001
+DAILY_TRADES = 5
+MIN_KRW = 10001
+
+# 체결 금액 대비 수수료율 (빗썸 기본 수수료 0.25%)
+FEE_RATE = 0.0025
+INITIAL_KRW = 1_000_000
+
+
+def candle_days(index, n):
+    """봉 시각을 날짜 번호로 변환 (일일 매매 횟수 초기화 기준)"""
+    if isinstance(index, pd.DatetimeIndex):
+        return index.values.astype('datetime64[D]').astype(np.int64)
+    return np.zeros(n, dtype=np.int64)
+
+
+def simulate(close, day_ids, buy_mask, sell_mask, initial_krw=INITIAL_KRW, fee_rate=FEE_RATE,
+             buy_amount=FIXED_BUY_AMOUNT, daily_trades=DAILY_TRADES, buy_conds=None, sell_conds=None):
+    """
+    매수/매도 신호 배열로 메인 루프의 체결 로직을 재현합니다.
+    신호가 있는 봉만 순회하고, 잔고/평가금액 곡선은 누적합으로 한 번에 계산합니다.
+
+    - 매수: 신호 + 오늘 매수 횟수 < daily_trades + KRW 잔고 >= buy_amount 이면 종가로 buy_amount 만큼 매수
+    - 매도: 신호 + 보유 포지션 있음 + 종가 > MIN_KRW 이면 보유 수량 전량 종가로 매도
+    - 같은 봉에 두 신호가 모두 있으면 메인 루프처럼 매수를 먼저 처리
+
+    Returns:
+        dict: 'trades'(체결 리스트), 'krw_delta', 'btc_delta' (봉별 잔고 변화량)
+    """
+    n = len(close)
+    krw_delta = np.zeros(n)
+    btc_delta = np.zeros(n)
+    trades = []
+
+    krw = initial_krw
+    total_cost = 0.0
+    total_amount = 0.0
+    cumulative_buy_fee = 0.0
+    trades_today = 0
+    current_day = None
+
+    for i in np.flatnonzero(buy_mask | sell_mask):
+        price = close[i]
+        if day_ids[i] != current_day:
+            current_day = day_ids[i]
+            trades_today = 0
+
+        if buy_mask[i] and trades_today < daily_trades and buy_amount <= krw:
+            amount = buy_amount / price
+            fee = buy_amount * fee_rate
+            krw -= buy_amount + fee
+            krw_delta[i] -= buy_amount + fee
+            btc_delta[i] += amount
+            total_cost += price * amount
+            total_amount += amount
+            cumulative_buy_fee += fee
+            trades_today += 1
+            trades.append({
+                'index': int(i), 'side': 'buy', 'price': price, 'amount': amount, 'fee': fee,
+                'reasons': strategy.reasons_at(buy_conds, i) if buy_conds is not None else [],
+            })
+
+        if sell_mask[i] and total_amount > 0 and price > MIN_KRW:
+            proceeds = price * total_amount
+            fee = proceeds * fee_rate
+            profit = proceeds - total_cost - (cumulative_buy_fee + fee)
+            krw += proceeds - fee
+            krw_delta[i] += proceeds - fee
+            btc_delta[i] -= total_amount
+            trades.append({
+                'index': int(i), 'side': 'sell', 'price': price, 'amount': total_amount, 'fee': fee,
+                'profit': profit,
+                'profit_rate': profit / total_cost * 100 if total_cost else 0.0,
+                'average_buy_price': total_cost / total_amount,
+                'reasons': strategy.reasons_at(sell_conds, i) if sell_conds is not None else [],
+            })
+            total_cost = total_amount = cumulative_buy_fee = 0.0
+
+    return {'trades': trades, 'krw_delta': krw_delta, 'btc_delta': btc_delta}
+
+
+def summarize(close, result, initial_krw=INITIAL_KRW):
+    """
+    simulate() 결과로 평가금액 곡선과 성과 지표를 계산합니다.
+
+    Returns:
+        dict: 'pnl', 'return_pct', 'max_drawdown_pct', 'num_trades', 'win_rate', 'equity'
+    """
+    krw = initial_krw + np.cumsum(result['krw_delta'])
+    btc = np.cumsum(result['btc_delta'])
+    equity = krw + btc * close
+    peak = np.maximum.accumulate(equity)
+    drawdown = (peak - equity) / peak
+
+    profits = [t['profit'] for t in result['trades'] if t['side'] == 'sell']
+    pnl = float(equity[-1] - initial_krw) if len(equity) else 0.0
+    return {
+        'pnl': pnl,
+        'return_pct': pnl / initial_krw * 100,
+        'max_drawdown_pct': float(drawdown.max() * 100) if len(drawdown) else 0.0,
+        'num_trades': len(result['trades']),
+        'win_rate': sum(p > 0 for p in profits) / len(profits) * 100 if profits else 0.0,
+        'equity': equity,
+    }
+
+
+def run_backtest(df, params=None, fear_greed=None, initial_krw=INITIAL_KRW, fee_rate=FEE_RATE, ind=None):
+    """
+    should_buy()/should_sell()의 투표 규칙을 전체 봉 이력에 대해 백테스트합니다.
+    메인 루프는 10초마다 평가하지만 백테스트는 봉 마감(종가) 시점에 한 번씩 평가합니다.
+
+    Args:
+        df (pandas.DataFrame): 시간순 OHLCV 데이터 ('close' 컬럼 필요)
+        params (dict): strategy.DEFAULT_PARAMS 중 덮어쓸 값
+        fear_greed: 공포 탐욕 지수 (None, 상수, 또는 봉별 배열)
+        initial_krw (float): 시작 KRW 잔고
+        fee_rate (float): 수수료율
+        ind (dict): 미리 계산한 지표 (파라미터 탐색 시 재사용)
+
+    Returns:
+        dict: 'pnl', 'return_pct', 'max_drawdown_pct', 'num_trades', 'win_rate', 'trades'(DataFrame),
+              'equity'(numpy 배열)
+    """
+    close = df['close'].to_numpy(dtype=np.float64)
+    if ind is None:
+        ind = strategy.compute_indicators(close, params)
+    buy_mask, sell_mask, buy_conds, sell_conds = strategy.signals(ind, fear_greed, params)
+
+    result = simulate(close, candle_days(df.index, len(close)), buy_mask, sell_mask,
+                      initial_krw=initial_krw, fee_rate=fee_rate,
+                      buy_conds=buy_conds, sell_conds=sell_conds)
+
+    report = summarize(close, result, initial_krw)
+    trades = pd.DataFrame(result['trades'])
+    if not trades.empty:
+        trades.insert(0, 'time', df.index[trades['index'].to_numpy()])
+    report['trades'] = trades
+    return report
+
+
+if __name__ == "__main__":
+    from candle_store import CandleStore
+
+    store = CandleStore("KRW-BTC", "minute60")
+    store.refresh()
+    df = store.tail_frame(len(store))
+
+    start = time.perf_counter()
+    report = run_backtest(df)
+    elapsed = time.perf_counter() - start
+
+    print(f"📈 {len(df)}개 봉 백테스트 ({elapsed * 1000:.1f} ms)")
+    print(f"💰 손익: {report['pnl']:,.0f} KRW ({report['return_pct']:.2f}%)")
+    print(f"📉 최대 낙폭: {report['max_drawdown_pct']:.2f}%")
+    print(f"🔁 체결 수: {report['num_trades']}, 승률: {report['win_rate']:.1f}%")
+    if report['num_trades']:
+        print(report['trades'].tail(10).to_string())
@@ -0,0 +1,132 @@
+import time
+import threading
+from collections import namedtuple
+import metrics
+
+# 이 시간(초)보다 오래된 스냅샷은 다음 조회 때 다시 받아옴 (틱 시작 시 refresh()로 갱신하는 것이 기본)
+BALANCE_MAX_AGE = 5
+
+# 통화별 잔고
+# available: 주문 가능 수량 (/v1/accounts의 balance, python_bithumb.get_balance()와 같은 값)
+# locked: 미체결 주문에 묶인 수량, total: available + locked, avg_buy_price: 평균 매수가
+Balance = namedtuple('Balance', ['currency', 'available', 'locked', 'total', 'avg_buy_price'])
+
+_EMPTY = Balance(None, 0.0, 0.0, 0.0, 0.0)
+
+
+def parse_accounts(accounts):
+    """
+    get_balances() 응답을 통화 -> Balance dict로 바꿉니다.
+
+    Args:
+        accounts (list): [{'currency', 'balance', 'locked', 'avg_buy_price', ...}, ...]
+
+    Returns:
+        dict: 통화 -> Balance
+    """
+    balances = {}
+    for item in accounts:
+        available = float(item.get('balance') or 0)
+        locked = float(item.get('locked') or 0)
+        balances[item['currency']] = Balance(item['currency'], available, locked, available + locked,
+                                             float(item.get('avg_buy_price') or 0))
+    return balances
+
+
+class BalanceSnapshot:
+    """
+    전체 잔고를 get_balances() 한 번으로 받아 두고 통화별 주문 가능/묶인 수량을 제공하는 스냅샷.
+
+    python_bithumb의 get_balance(통화)는 호출마다 전체 계좌를 다시 받아오므로
+    틱 시작 시 refresh()를 한 번 부르고, 틱 안의 잔고 조회는 모두 이 스냅샷에서 읽습니다.
+    주문/체결 후에는 invalidate()를 불러 두면 다음 조회 때 한 번만 다시 받아옵니다.
+    여러 스레드가 동시에 갱신을 요청해도 실제 요청은 한 번만 나갑니다.
+    """
+
+    def __init__(self, bithumb, max_age=BALANCE_MAX_AGE, clock=time.monotonic):
+        self.bithumb = bithumb
+        self.max_age = max_age
+        self.clock = clock
+        self.balances = {}
+        self.fetched_at = None
+        self.fetches = 0
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """
+        잔고를 다시 받아옵니다. (다른 스레드가 받아오는 중이었다면 그 결과를 사용)
+
+        Returns:
+            dict: 통화 -> Balance
+        """
+        version = self._version
+        with self._lock:
+            if self._version != version:
+                return self.balances
+            with metrics.span("balance_snapshot"):
+                accounts = self.bithumb.get_balances()
+            self.balances = parse_accounts(accounts)
+            self.fetched_at = self.clock()
+            self.fetches += 1
+            self._version += 1
+            return self.balances
+
+    def invalidate(self):
+        """주문/체결 이후 호출 - 다음 조회 때 다시 받아옵니다."""
+        self.fetched_at = None
+
+    def stale(self):
+        return self.fetched_at is None or self.clock() - self.fetched_at > self.max_age
+
+    def get(self, currency):
+        """통화의 Balance (보유하지 않은 통화는 수량 0), 스냅샷이 오래되었으면 먼저 갱신"""
+        if self.stale():
+            self.refresh()
+        return self.balances.get(currency) or _EMPTY._replace(currency=currency)
+
+    def available(self, currency):
+        """주문 가능 수량"""
+        return self.get(currency).available
+
+    def locked(self, currency):
+        """미체결 주문에 묶인 수량"""
+        return self.get(currency).locked
+
+    def total(self, currency):
+        return self.get(currency).total
+
+    def available_map(self):
+        """통화 -> 주문 가능 수량 dict"""
+        if self.stale():
+            self.refresh()
+        return {currency: b.available for currency, b in self.balances.items()}
+
+
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    class _SlowAccount:
+        """응답에 20ms 걸리는 가짜 계좌"""
+        calls = 0
+
+        def get_balances(self):
+            _SlowAccount.calls += 1
+            time.sleep(0.02)
+            return [{'currency': 'KRW', 'balance': '1000000', 'locked': '20000', 'avg_buy_price': '0'},
+                    {'currency': 'BTC', 'balance': '0.0012', 'locked': '0', 'avg_buy_price': '95000000'}]
+
+    snapshot = BalanceSnapshot(_SlowAccount())
+    # 한 틱: 잔고 표시(KRW, BTC) + 매수 전 KRW 확인 + 매도 전 BTC 확인
+    snapshot.refresh()
+    values = [snapshot.available("KRW"), snapshot.available("BTC"), snapshot.available("KRW")]
+    snapshot.invalidate()   # 매수 주문 후
+    values.append(snapshot.available("BTC"))
+    print(f"📉 틱당 잔고 요청: get_balance() 방식 4회 -> 스냅샷 {_SlowAccount.calls}회, 값 {values}")
+    print(f"💰 KRW: {snapshot.get('KRW')}")
+
+    # 동시에 갱신을 요청해도 요청은 한 번
+    _SlowAccount.calls = 0
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda _: snapshot.refresh(), range(8)))
+    print(f"🔀 8개 스레드 동시 refresh(): 실제 요청 {_SlowAccount.calls}회")
@@ -0,0 +1,226 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import tracemalloc
+import importlib.util
+import numpy as np
+from candle_store import FIELDS
+from candle_buffer import CandleBuffer
+
+# 기준값 파일과 비교 허용치
+BASELINE_PATH = "bench_baseline.json"
+DEFAULT_TOLERANCE = 0.25     # p50이 기준보다 25% 넘게 느려지면 실패 (p99는 꼬리 잡음이 커서 2배 허용)
+NOISE_FLOOR_MS = 0.5         # 이보다 작은 차이는 측정 잡음으로 보고 무시
+DEFAULT_ITERATIONS = 200
+ALLOC_ITERATIONS = 20        # 할당량 측정은 tracemalloc 오버헤드가 커서 따로 적게 실행
+SIMULATOR_PORT = 8797
+
+
+def _load_trading_module(path="yhgo_okno-gpt.py"):
+    """하이픈이 들어간 스크립트 파일을 모듈로 불러옵니다. (main()은 실행하지 않음)"""
+    spec = importlib.util.spec_from_file_location("yhgo_okno_gpt", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def setup_environment(workdir, port=SIMULATOR_PORT, latency=0.0):
+    """
+    로컬 거래소 시뮬레이터를 띄우고, 매매 스크립트의 모든 외부 호출/파일이 시뮬레이터와 임시 디렉터리를 쓰도록 설정합니다.
+    (환경 변수는 스크립트를 불러오기 전에 설정해야 함)
+    """
+    url = f"http://127.0.0.1:{port}"
+    os.environ.update({
+        'SIMULATOR_URL': url,
+        'OPENAI_BASE_URL': url + "/v1",
+        'OPENAI_API_KEY': "sim",
+        'BITHUMB_ACCESS_KEY': "bench-access-key",
+        'BITHUMB_SECRET_KEY': "bench-secret-key-0123456789abcdef",
+        'CANDLE_DIR': os.path.join(workdir, "candles"),
+        'DECISION_CACHE_PATH': os.path.join(workdir, "decision_cache.json"),
+        'TRADE_LEDGER_PATH': os.path.join(workdir, "trade_ledger.db"),
+        'FEAR_GREED_PATH': os.path.join(workdir, "fear_greed.json"),
+        'FEAR_GREED_HISTORY_PATH': os.path.join(workdir, "fear_greed_history.json"),
+        'LOG_DIR': os.path.join(workdir, "logs"),
+        'LOG_CONSOLE': "0",
+        'RATE_LIMIT': "0",      # 주문 단계를 반복 측정하므로 요청 한도 대기는 제외
+    })
+    import exchange_simulator
+    exchange = exchange_simulator.build_exchange(["KRW-BTC"], krw=10**12, llm_decision="hold")
+    return exchange_simulator.start_background(exchange, port=port, latency=latency)
+
+
+def fixture_frame(path=None, rows=100, seed=0):
+    """
+    지표 단계용 고정 OHLCV 데이터.
+
+    Args:
+        path (str): get_ohlcv() 결과를 to_csv()로 저장한 파일 (없으면 seed로 만든 가상 데이터, 같은 seed면 항상 같은 값)
+    """
+    import pandas as pd
+    if path:
+        return pd.read_csv(path, index_col=0, parse_dates=True).tail(rows)
+    rng = np.random.default_rng(seed)
+    close = 100_000_000 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+    index = pd.date_range("2025-01-01", periods=rows, freq="h", name='candle_date_time_kst')
+    return pd.DataFrame({'open': close * 0.999, 'high': close * 1.005, 'low': close * 0.995, 'close': close,
+                         'volume': rng.uniform(1, 10, rows), 'value': close * 5}, index=index)
+
+
+def build_stages(bot, df):
+    """
+    단계 이름 -> 인자 없는 호출 함수. yhgo_okno-gpt.py 메인 루프의 각 단계와 한 틱 전체입니다.
+    """
+    fear_greed = bot.fetch_fear_and_greed()
+    # 고정 데이터로 채운 링 버퍼 (sync()를 반복하면 마지막 봉 보정만 일어나 틱 중간 갱신과 같은 경로)
+    view = {'time': df.index.values.astype('datetime64[ns]')}
+    view.update({field: df[field].to_numpy(dtype=np.float64) for field in FIELDS})
+    candles = CandleBuffer(len(df))
+    latest = candles.sync(view)
+    annotated = candles.to_frame(5, bot.AI_COLUMNS)
+    loop = asyncio.new_event_loop()
+
+    def ai_decision_uncached():
+        bot.decision_cache.entries.clear()
+        return bot.get_ai_decision(annotated, fear_greed)
+
+    async def full_tick():
+        inputs, errors, elapsed = await bot.gather_calls(bot.tick_calls(), bot.FETCH_TIMEOUTS)
+        tick_latest = bot.update_technical_indicators()
+        bot.should_buy(tick_latest, inputs['fear_greed'])
+        bot.should_sell(tick_latest, inputs['fear_greed'])
+        return bot.get_ai_decision(bot.candles.to_frame(5, bot.AI_COLUMNS), inputs['fear_greed'])
+
+    return {
+        'ohlcv_refresh': bot.candle_store.refresh,
+        'indicators_full': lambda: bot.get_technical_indicators(df.copy()),
+        'indicators_incremental': lambda: candles.sync(view),
+        'fear_greed': bot.fetch_fear_and_greed,
+        'check_balance': lambda: (bot.balances.refresh(), bot.check_balance()),
+        'signals': lambda: (bot.should_buy(latest, fear_greed), bot.should_sell(latest, fear_greed)),
+        'ai_decision_cached': lambda: bot.get_ai_decision(annotated, fear_greed),
+        'ai_decision_uncached': ai_decision_uncached,
+        'order_market_buy': lambda: bot.bithumb.buy_market_order(bot.SYMBOL, bot.FIXED_BUY_AMOUNT),
+        'full_tick': lambda: loop.run_until_complete(full_tick()),
+    }
+
+
+def measure(fn, iterations=DEFAULT_ITERATIONS, alloc_iterations=ALLOC_ITERATIONS, warmup=3):
+    """
+    fn을 반복 실행해 지연 백분위수(ms)와 호출당 할당량을 잽니다.
+
+    Returns:
+        dict: p50_ms, p99_ms, mean_ms, max_ms, alloc_kb(호출당 할당 바이트 / 1024), peak_kb
+    """
+    for _ in range(warmup):
+        fn()
+    samples = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter_ns()
+        fn()
+        samples[i] = (time.perf_counter_ns() - start) / 1e6
+
+    tracemalloc.start()
+    allocated = 0
+    peak = 0
+    for _ in range(alloc_iterations):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        snapshot_before = tracemalloc.take_snapshot()
+        fn()
+        snapshot_after = tracemalloc.take_snapshot()
+        allocated += sum(s.size_diff for s in snapshot_after.compare_to(snapshot_before, 'filename') if s.size_diff > 0)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+    return {
+        'p50_ms': float(np.percentile(samples, 50)),
+        'p99_ms': float(np.percentile(samples, 99)),
+        'mean_ms': float(samples.mean()),
+        'max_ms': float(samples.max()),
+        'alloc_kb': allocated / alloc_iterations / 1024,
+        'peak_kb': peak / 1024,
+    }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    기준값 대비 느려진 단계 목록을 반환합니다. (없으면 빈 리스트)
+    """
+    regressions = []
+    for stage, current in results.items():
+        base = baseline.get(stage)
+        if base is None:
+            continue
+        for key, allowed in (('p50_ms', tolerance), ('p99_ms', tolerance * 2)):
+            limit = base[key] * (1 + allowed)
+            if current[key] > limit and current[key] - base[key] > NOISE_FLOOR_MS:
+                regressions.append(f"{stage} {key}: {base[key]:.3f} -> {current[key]:.3f} ms (+{(current[key] / base[key] - 1) * 100:.0f}%)")
+    return regressions
+
+
+def print_table(results, baseline=None):
+    print(f"{'단계':<24}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'할당 KB':>10}{'피크 KB':>10}{'기준 p50':>10}")
+    for stage, r in results.items():
+        base = f"{baseline[stage]['p50_ms']:.3f}" if baseline and stage in baseline else "-"
+        print(f"{stage:<24}{r['p50_ms']:>10.3f}{r['p99_ms']:>10.3f}{r['max_ms']:>10.3f}"
+              f"{r['alloc_kb']:>10.1f}{r['peak_kb']:>10.1f}{base:>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="yhgo_okno-gpt.py 틱 단계별 벤치마크 (로컬 시뮬레이터 사용)")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--stages", default=None, help="쉼표 구분 단계 이름 (기본: 전체)")
+    parser.add_argument("--fixture", default=None, help="지표 단계에 쓸 OHLCV CSV (기본: 고정 seed 가상 데이터)")
+    parser.add_argument("--latency", type=float, default=0.0, help="시뮬레이터 요청당 지연 (초)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="결과를 기준값으로 저장")
+    parser.add_argument("--compare", action="store_true", help="기준값보다 느려졌으면 종료 코드 1")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--json", default=None, help="결과를 JSON 파일로 저장")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="bench_tick_")
+    server = setup_environment(workdir, latency=args.latency)
+    bot = _load_trading_module()
+    stages = build_stages(bot, fixture_frame(args.fixture))
+    if args.stages:
+        stages = {name: stages[name] for name in args.stages.split(",")}
+
+    results = {}
+    for name, fn in stages.items():
+        results[name] = measure(fn, args.iterations)
+    server.shutdown()
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_table(results, baseline)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 기준값 저장: {args.baseline}")
+    if args.compare:
+        if baseline is None:
+            print(f"❗ 기준값 파일이 없습니다: {args.baseline}")
+            return 1
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("❌ 성능 저하:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print("✅ 기준값 대비 성능 저하 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+import os
+import json
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import python_bithumb
+import metrics
+import rate_limiter
+from balance_snapshot import BalanceSnapshot
+
+# 계정별 기본 매수 금액 (원)
+BUY_AMOUNT_KRW = 10000
+# 잔고 사전 확인을 동시에 보낼 최대 요청 수
+PRECHECK_WORKERS = 32
+# 주문을 동시에 보낼 최대 요청 수 (계정별 한도는 rate_limiter가 따로 계산)
+ORDER_WORKERS = 16
+
+# 계정 설정
+# access_key/secret_key 대신 access_key_env/secret_key_env로 키가 들어 있는 환경 변수 이름을 줄 수 있음
+Account = namedtuple('Account', ['name', 'access_key', 'secret_key', 'amount'])
+
+# 계정별 실행 결과
+# status: 'ordered'(주문 요청 성공), 'dry_run'(확인만 함), 'insufficient'(잔고 부족),
+#         'precheck_failed'(잔고 조회 실패), 'order_failed'(주문 요청 실패)
+BuyResult = namedtuple('BuyResult', ['name', 'status', 'krw_available', 'amount', 'uuid', 'error', 'elapsed'])
+
+
+def load_accounts(path, default_amount=BUY_AMOUNT_KRW):
+    """
+    계정 목록 JSON 파일을 읽습니다.
+
+    Args:
+        path (str): [{"name", "access_key", "secret_key", "amount"(선택)}, ...] 형식의 JSON 파일
+        default_amount (int): amount가 없는 계정의 매수 금액
+
+    Returns:
+        list: Account 리스트
+    """
+    with open(path, encoding='utf-8') as f:
+        entries = json.load(f)
+    accounts = []
+    for i, entry in enumerate(entries):
+        access_key = entry.get('access_key') or os.getenv(entry.get('access_key_env', ''))
+        secret_key = entry.get('secret_key') or os.getenv(entry.get('secret_key_env', ''))
+        name = entry.get('name') or f"account-{i + 1}"
+        if not access_key or not secret_key:
+            raise ValueError(f"{name}: API 키가 없습니다.")
+        accounts.append(Account(name, access_key, secret_key, entry.get('amount', default_amount)))
+    return accounts
+
+
+class _AccountRun:
+    """한 계정의 클라이언트, 잔고 스냅샷, 진행 상태"""
+    __slots__ = ('account', 'bithumb', 'balances', 'krw_available', 'started')
+
+    def __init__(self, account):
+        self.account = account
+        self.bithumb = python_bithumb.Bithumb(account.access_key, account.secret_key)
+        self.balances = BalanceSnapshot(self.bithumb)
+        self.krw_available = None
+        self.started = time.perf_counter()
+
+    def result(self, status, uuid=None, error=None):
+        return BuyResult(self.account.name, status, self.krw_available, self.account.amount, uuid,
+                         error, time.perf_counter() - self.started)
+
+
+def _precheck(run):
+    """잔고를 받아 와 주문 가능 여부를 확인합니다. (주문할 수 없으면 BuyResult, 가능하면 None)"""
+    try:
+        with rate_limiter.account(run.account.name):
+            run.balances.refresh()
+        run.krw_available = run.balances.available("KRW")
+    except Exception as e:
+        return run.result('precheck_failed', error=str(e))
+    if run.krw_available < run.account.amount:
+        return run.result('insufficient')
+    return None
+
+
+def _submit(run, symbol):
+    try:
+        with rate_limiter.account(run.account.name), metrics.span("order", side="buy"):
+            order = run.bithumb.buy_market_order(symbol, run.account.amount)
+    except Exception as e:
+        metrics.inc("orders_total", side="buy", result="error")
+        return run.result('order_failed', error=str(e))
+    run.balances.invalidate()
+    metrics.inc("orders_total", side="buy", result="ok")
+    return run.result('ordered', uuid=order.get('uuid') if isinstance(order, dict) else None)
+
+
+def run_bulk_buy(accounts, symbol="KRW-BTC", precheck_workers=PRECHECK_WORKERS, order_workers=ORDER_WORKERS,
+                 dry_run=False):
+    """
+    여러 계정에서 시장가 매수를 한꺼번에 실행합니다.
+
+    1. 모든 계정의 잔고를 동시에 확인 (계정마다 get_balances() 한 번)
+    2. 잔고가 충분한 계정만 제한된 크기의 스레드 풀로 주문 제출
+    비공개/주문 요청은 계정별 rate_limiter 버킷으로 계산하므로 한 계정의 한도가 다른 계정을 막지 않습니다.
+    주문 POST는 재시도하지 않으므로 실패한 계정은 결과 보고서를 보고 다시 실행하면 됩니다.
+
+    Args:
+        accounts (list): Account 리스트
+        symbol (str): 매수할 마켓
+        dry_run (bool): True면 잔고 확인까지만 하고 주문하지 않음
+
+    Returns:
+        list: accounts와 같은 순서의 BuyResult 리스트
+    """
+    runs = [_AccountRun(account) for account in accounts]
+    with ThreadPoolExecutor(precheck_workers) as pool:
+        results = list(pool.map(_precheck, runs))
+
+    ready = [i for i, result in enumerate(results) if result is None]
+    if dry_run:
+        for i in ready:
+            results[i] = runs[i].result('dry_run')
+        return results
+    with ThreadPoolExecutor(order_workers) as pool:
+        for i, result in zip(ready, pool.map(lambda run: _submit(run, symbol), [runs[i] for i in ready])):
+            results[i] = result
+    return results
+
+
+def summarize(results):
+    """
+    결과 보고서 요약.
+
+    Returns:
+        dict: {'accounts', 'status': {상태: 계정 수}, 'ordered_krw', 'max_elapsed'}
+    """
+    return {
+        'accounts': len(results),
+        'status': dict(Counter(r.status for r in results)),
+        'ordered_krw': sum(r.amount for r in results if r.status == 'ordered'),
+        'max_elapsed': max((r.elapsed for r in results), default=0.0),
+    }
+
+
+def write_report(results, path):
+    """계정별 결과와 요약을 JSON 파일로 저장합니다."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'summary': summarize(results), 'results': [r._asdict() for r in results]},
+                  f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    import tempfile
+    import http_transport
+    import exchange_simulator
+
+    # 요청당 50ms 지연 시뮬레이터에서 200개 계정 순차 실행 vs 일괄 실행
+    server = exchange_simulator.start_background(exchange_simulator.build_exchange(["KRW-BTC"], krw=10**9),
+                                                 port=8798, latency=0.05)
+    http_transport.SIMULATOR_URL = server.url
+    http_transport.patch_python_bithumb()
+    accounts = [Account(f"sub-{i:03d}", f"access-{i}", f"secret-key-{i:04d}-0123456789abcdef", BUY_AMOUNT_KRW)
+                for i in range(200)]
+
+    start = time.perf_counter()
+    for account in accounts[:20]:
+        run_bulk_buy([account], precheck_workers=1, order_workers=1)
+    sequential = (time.perf_counter() - start) / 20 * len(accounts)
+
+    start = time.perf_counter()
+    results = run_bulk_buy(accounts)
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+    report = os.path.join(tempfile.mkdtemp(), "bulk_report.json")
+    write_report(results, report)
+    print(f"⏱️ 200개 계정: 순차 약 {sequential:.1f}초 -> 일괄 {elapsed:.2f}초")
+    print(f"📋 {summarize(results)} ({report})")
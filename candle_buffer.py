@@ -0,0 +1,178 @@
+import numpy as np
+import pandas as pd
+from candle_store import FIELDS
+from indicator_engine import IncrementalIndicators, INDICATOR_COLUMNS
+
+# 틱마다 보관하는 기본 봉 수 (tail_frame(100)과 같은 창)
+DEFAULT_CAPACITY = 100
+
+COLUMNS = FIELDS + tuple(INDICATOR_COLUMNS)
+
+
+class CandleBuffer:
+    """
+    최근 capacity개 봉의 OHLCV와 지표를 컬럼별 NumPy 배열에 담아 두는 고정 크기 링 버퍼.
+
+    배열을 미리 2 * capacity 크기로 잡고 행을 i와 i + capacity 두 곳에 함께 써 두므로,
+    마지막 n개(n <= capacity) 행은 언제나 한 덩어리 슬라이스로 복사 없이 읽을 수 있습니다.
+    틱마다 DataFrame을 만들지 않고 sync()로 새/수정된 봉만 반영하며(지표는 IncrementalIndicators로 O(1) 갱신),
+    pandas 변환은 AI 프롬프트/리포트용 to_frame()에서만 합니다.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, engine=None):
+        self.capacity = capacity
+        self.engine = engine or IncrementalIndicators()
+        self.times = np.zeros(2 * capacity, dtype=np.int64)     # 봉 시각 (ns, KST)
+        self.columns = {name: np.full(2 * capacity, np.nan) for name in COLUMNS}
+        self.count = 0      # 지금까지 추가된 봉 수
+        self._latest = dict.fromkeys(COLUMNS, np.nan)
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def _slot(self, back=0):
+        """마지막에서 back번째 전 행의 위치 (두 번째 사본 쪽)"""
+        return (self.count - 1 - back) % self.capacity + self.capacity
+
+    def _write(self, slot, t, view, row, values):
+        first = slot - self.capacity
+        self.times[first] = self.times[slot] = t
+        latest = self._latest
+        for field in FIELDS:
+            x = float(view[field][row])
+            self.columns[field][first] = self.columns[field][slot] = x
+            latest[field] = x
+        for name in INDICATOR_COLUMNS:
+            x = values[name]
+            self.columns[name][first] = self.columns[name][slot] = x
+            latest[name] = x
+
+    def append(self, t, view, row):
+        """
+        새 봉 하나를 추가합니다. (가장 오래된 봉은 덮어씀)
+
+        Args:
+            t (int): 봉 시각 (ns)
+            view (dict): 필드별 배열 (CandleStore.tail() 형식)
+            row (int): view에서 읽을 행
+        """
+        values = self.engine.update(view['close'][row], t)
+        self.count += 1
+        self._write(self._slot(), t, view, row, values)
+
+    def revise(self, view, row):
+        """진행 중인 마지막 봉의 가격을 수정합니다."""
+        values = self.engine.revise(view['close'][row])
+        self._write(self._slot(), self.times[self._slot()], view, row, values)
+
+    def sync(self, view):
+        """
+        CandleStore.tail() 결과와 버퍼를 맞춥니다. 이미 본 봉은 건너뛰고,
+        마지막으로 본 봉은 보정한 뒤 새 봉만 추가합니다. (틱당 보통 봉 0~1개만 처리)
+
+        Args:
+            view (dict): 'time'(datetime64[ns]) 및 FIELDS 컬럼별 배열
+
+        Returns:
+            dict: 마지막 봉의 가격/지표 (latest())
+        """
+        times = np.asarray(view['time']).view(np.int64)
+        start = 0
+        if self.count:
+            last = self.times[self._slot()]
+            pos = int(np.searchsorted(times, last))
+            if pos < len(times) and times[pos] == last:
+                self.revise(view, pos)
+                start = pos + 1
+            else:
+                start = pos
+        for row in range(start, len(times)):
+            self.append(int(times[row]), view, row)
+        return self._latest
+
+    def latest(self):
+        """
+        마지막 봉의 가격/지표 dict (should_buy()/should_sell()에서 df.iloc[-1] 대신 사용).
+        sync()마다 같은 dict를 갱신하므로 보관하려면 복사할 것.
+        """
+        return self._latest
+
+    def last_time(self):
+        """마지막 봉 시각 (pd.Timestamp, 비어 있으면 None)"""
+        return pd.Timestamp(int(self.times[self._slot()])) if self.count else None
+
+    def column(self, name, n=None):
+        """
+        마지막 n개(기본: 전체) 값의 읽기 전용 뷰 (복사 없음, 오래된 봉부터).
+
+        Args:
+            name (str): 'time', FIELDS 또는 INDICATOR_COLUMNS 중 하나
+        """
+        n = len(self) if n is None else min(n, len(self))
+        end = self._slot() + 1
+        array = self.times.view('datetime64[ns]') if name == 'time' else self.columns[name]
+        view = array[end - n:end]
+        view.flags.writeable = False
+        return view
+
+    def to_frame(self, n=None, columns=COLUMNS):
+        """
+        마지막 n개 봉을 candle_date_time_kst 인덱스의 DataFrame으로 만듭니다. (AI 프롬프트/리포트용 복사본)
+        """
+        index = pd.DatetimeIndex(self.column('time', n), name='candle_date_time_kst')
+        return pd.DataFrame({name: self.column(name, n) for name in columns}, index=index)
+
+
+if __name__ == "__main__":
+    import time
+    import tracemalloc
+    import ta
+
+    # 봉 500개 + 진행 중인 봉의 가격 갱신 1,000번: 틱마다 DataFrame + 지표 열 7개 vs 링 버퍼
+    rng = np.random.default_rng(0)
+    rows = 600
+    close = 100_000_000 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+    view = {'time': pd.date_range("2026-01-01", periods=rows, freq="h").values.astype('datetime64[ns]'),
+            'open': close * 0.999, 'high': close * 1.005, 'low': close * 0.995, 'close': close,
+            'volume': rng.uniform(1, 10, rows), 'value': close * 5}
+
+    def frame_tick(end):
+        df = pd.DataFrame({f: view[f][end - 100:end] for f in FIELDS},
+                          index=pd.DatetimeIndex(view['time'][end - 100:end]))
+        df['MA5'] = ta.trend.sma_indicator(df['close'], window=5)
+        df['MA20'] = ta.trend.sma_indicator(df['close'], window=20)
+        df['RSI'] = ta.momentum.rsi(df['close'], window=14)
+        macd = ta.trend.MACD(df['close'], window_slow=26, window_fast=12, window_sign=9)
+        df['MACD'] = macd.macd()
+        df['MACD_Signal'] = macd.macd_signal()
+        bollinger = ta.volatility.BollingerBands(df['close'], window=20, window_dev=2)
+        df['Upper_BB'] = bollinger.bollinger_hband()
+        df['Lower_BB'] = bollinger.bollinger_lband()
+        latest = df.iloc[-1]
+        return latest['MA5'] > latest['MA20']
+
+    buffer = CandleBuffer()
+    buffer.sync({k: v[:500] for k, v in view.items()})
+
+    def buffer_tick(end):
+        latest = buffer.sync({k: v[end - 100:end] for k, v in view.items()})
+        return latest['MA5'] > latest['MA20']
+
+    for name, fn in (("DataFrame", frame_tick), ("CandleBuffer", buffer_tick)):
+        ends = [501 + i // 10 for i in range(1000)]
+        start = time.perf_counter()
+        for end in ends:
+            fn(end)
+        elapsed = (time.perf_counter() - start) / len(ends)
+        tracemalloc.start()
+        fn(ends[-1])
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"⏱️ {name}: 틱당 {elapsed * 1e6:.0f} µs, 피크 할당 {peak / 1024:.1f} KB")
+
+    reference = CandleBuffer(capacity=rows)
+    reference.sync(view)
+    df = reference.to_frame()
+    expected = ta.momentum.rsi(df['close'], window=14).to_numpy()
+    print(f"✅ 링 버퍼 {len(buffer)}행, RSI 최대 오차 {np.nanmax(np.abs(buffer.column('RSI') - expected[-100:])):.2e}")
+    print(buffer.to_frame(3, ('close', 'MA5', 'MA20', 'RSI')))
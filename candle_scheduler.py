@@ -0,0 +1,159 @@
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime
+
+log = logging.getLogger(__name__)
+
+# 빗썸 봉 경계는 KST 기준 (일봉은 KST 00:00 시작)
+KST_OFFSET = 9 * 3600
+
+# 봉 마감 직후 거래소가 봉을 확정할 시간을 주기 위한 여유 (초)
+SETTLE_SECONDS = 2
+
+# 가격 임계값 감시 주기 (초)
+PRICE_POLL_SECONDS = 10
+
+_UNIT_SECONDS = {'m': 60, 'h': 3600, 'd': 86400, 'w': 7 * 86400}
+
+
+def interval_seconds(interval):
+    """
+    INTERVAL 문자열을 봉 길이(초)로 변환합니다.
+    "1h", "30m", "24h" 같은 표기와 python_bithumb의 "minute60", "day", "week" 표기를 모두 받습니다.
+    """
+    if interval == "day":
+        return 86400
+    if interval == "week":
+        return 7 * 86400
+    if interval.startswith("minute"):
+        return int(interval.replace("minute", "") or 1) * 60
+    unit = interval[-1]
+    if unit in _UNIT_SECONDS and interval[:-1].isdigit():
+        return int(interval[:-1]) * _UNIT_SECONDS[unit]
+    raise ValueError(f"지원하지 않는 INTERVAL 입니다: {interval}")
+
+
+def next_boundary(now, period):
+    """now(epoch 초) 이후 처음 오는 KST 기준 봉 경계 시각(epoch 초)"""
+    local = now + KST_OFFSET
+    return (local // period + 1) * period - KST_OFFSET
+
+
+def _level(value):
+    # NaN(지표 워밍업 구간)은 임계값 없음으로 취급
+    if value is None or value != value:
+        return None
+    return float(value)
+
+
+def fingerprint(*inputs):
+    """평가 입력값들의 해시 (입력이 바뀌었는지 비교용)"""
+    return hashlib.blake2b(repr(inputs).encode(), digest_size=16).hexdigest()
+
+
+class CandleScheduler:
+    """
+    고정 주기 time.sleep() 대신 INTERVAL 봉 경계에 정확히 깨어나는 스케줄러.
+
+    봉 마감 외에도 price_fn이 주어지면 봉 중간에 가격이 임계값(예: 볼린저 밴드 상/하단)을
+    넘어서는 순간 깨어납니다. changed()로 직전 평가와 입력이 같으면 평가를 건너뛸 수 있습니다.
+    """
+
+    def __init__(self, interval, price_fn=None, poll_seconds=PRICE_POLL_SECONDS,
+                 settle_seconds=SETTLE_SECONDS, clock=time.time, period=None):
+        self.interval = interval
+        # 봉 데이터를 받아오는 쪽의 실제 봉 길이(예: CandleStore.period)를 주면 그 주기로 깨어남
+        self.period = period or interval_seconds(interval)
+        self.price_fn = price_fn
+        self.poll_seconds = poll_seconds     # 초, 또는 매번 주기를 돌려주는 함수 (예: 실시간 피드 연결 여부에 따라)
+        self.settle_seconds = settle_seconds
+        self.clock = clock
+        self.lower = None
+        self.upper = None
+        self._last_side = 0
+        self._last_fingerprint = None
+
+    def set_price_triggers(self, lower=None, upper=None):
+        """
+        봉 중간 평가를 일으킬 가격 임계값을 설정합니다. (가격이 lower 아래 / upper 위로 넘어갈 때)
+        """
+        self.lower = _level(lower)
+        self.upper = _level(upper)
+
+    def _side(self, price):
+        if self.lower is not None and price < self.lower:
+            return -1
+        if self.upper is not None and price > self.upper:
+            return 1
+        return 0
+
+    def _watching_price(self):
+        return self.price_fn is not None and (self.lower is not None or self.upper is not None)
+
+    def _check(self, deadline):
+        """
+        깨어날 이유가 있으면 (이유, 0), 없으면 (None, 다음 확인까지 대기 시간)을 반환합니다.
+        """
+        now = self.clock()
+        if now >= deadline:
+            return 'candle', 0
+        if self._watching_price():
+            try:
+                price = self.price_fn()
+            except Exception as e:
+                log.error("❗ 가격 감시 오류: %s", e)
+                price = None
+            if price is not None:
+                side = self._side(price)
+                crossed = side != 0 and side != self._last_side
+                self._last_side = side
+                if crossed:
+                    return ('price_below' if side < 0 else 'price_above'), 0
+            poll = self.poll_seconds() if callable(self.poll_seconds) else self.poll_seconds
+            return None, min(deadline - now, poll)
+        return None, deadline - now
+
+    def _deadline(self):
+        return next_boundary(self.clock(), self.period) + self.settle_seconds
+
+    def upcoming(self):
+        """다음 봉 경계 평가 시각 (datetime, 로컬 시간)"""
+        return datetime.fromtimestamp(self._deadline())
+
+    async def wait(self):
+        """
+        다음 봉 경계 또는 가격 임계값 돌파까지 대기합니다.
+
+        Returns:
+            str: 'candle', 'price_below', 'price_above' 중 하나
+        """
+        deadline = self._deadline()
+        while True:
+            if self._watching_price():
+                reason, delay = await asyncio.to_thread(self._check, deadline)
+            else:
+                reason, delay = self._check(deadline)
+            if reason:
+                return reason
+            await asyncio.sleep(delay)
+
+    def wait_blocking(self):
+        """wait()의 동기 버전 (asyncio를 쓰지 않는 스크립트용)"""
+        deadline = self._deadline()
+        while True:
+            reason, delay = self._check(deadline)
+            if reason:
+                return reason
+            time.sleep(delay)
+
+    def changed(self, *inputs):
+        """
+        입력이 직전 호출과 다르면 True를 반환하고 기록합니다. 같으면 평가를 건너뛰어도 됩니다.
+        """
+        current = fingerprint(*inputs)
+        if current == self._last_fingerprint:
+            return False
+        self._last_fingerprint = current
+        return True
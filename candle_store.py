@@ -0,0 +1,196 @@
+import os
+import json
+import time
+import threading
+import numpy as np
+import pandas as pd
+import python_bithumb
+
+# 봉 데이터 저장 위치 (심볼/인터벌별 하위 디렉터리)
+CANDLE_DIR = os.getenv("CANDLE_DIR", "candles")
+
+# 저장 컬럼 (get_ohlcv() 결과의 컬럼 이름과 동일)
+FIELDS = ('open', 'high', 'low', 'close', 'volume', 'value')
+
+# 저장소가 비어 있을 때 처음 받아올 봉 개수
+INITIAL_COUNT = 200
+# 오래 꺼져 있었을 때 한 번에 채울 최대 봉 개수
+MAX_BACKFILL = 2000
+# 파일을 늘릴 때 단위 (행 수)
+CHUNK_ROWS = 4096
+
+# 빗썸 봉 시각(candle_date_time_kst)은 KST 기준
+KST_OFFSET = 9 * 3600
+
+
+def candle_seconds(interval):
+    """
+    python_bithumb.get_ohlcv()가 실제로 요청하는 봉 길이(초)를 반환합니다.
+    get_ohlcv()는 "minuteN", "day", "week", "month"만 구분하고 나머지("1h" 등)는 일봉으로 요청합니다.
+    """
+    if interval == "week":
+        return 7 * 86400
+    if interval == "month":
+        return 28 * 86400   # 누락 봉 수 계산용이므로 가장 짧은 달 기준
+    if interval.startswith("minute"):
+        try:
+            return int(interval.replace("minute", "")) * 60
+        except ValueError:
+            return 60
+    return 86400
+
+
+class CandleStore:
+    """
+    심볼/인터벌별 OHLCV 봉을 컬럼별 메모리 맵 파일로 보관하는 추가 전용 저장소.
+
+    refresh()는 마지막 저장 봉 이후의 봉만 받아와 진행 중인 봉을 덮어쓰고 새 봉을 이어 붙이며,
+    tail()은 복사 없이 메모리 맵의 마지막 N행 뷰를 반환합니다.
+    재시작 시 디스크의 봉을 그대로 사용하므로 전체 시리즈를 다시 받지 않습니다.
+
+    틱 타임아웃으로 버려진 refresh() 스레드가 계속 돌 수 있으므로, 반영(merge)과 읽기(tail)는 잠금으로 묶고
+    refresh()는 이전 조회가 끝나지 않았으면 새로 조회하지 않습니다.
+    """
+
+    def __init__(self, symbol, interval, root=CANDLE_DIR):
+        self.symbol = symbol
+        self.interval = interval
+        self.period = candle_seconds(interval)
+        self.path = os.path.join(root, f"{symbol}_{interval}")
+        os.makedirs(self.path, exist_ok=True)
+        self.meta_path = os.path.join(self.path, "meta.json")
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+
+        self.count = 0
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path) as f:
+                self.count = json.load(f)['count']
+        self.columns = {}
+        self._map(max(CHUNK_ROWS, self._capacity_for(self.count)))
+
+    def _capacity_for(self, rows):
+        return -(-rows // CHUNK_ROWS) * CHUNK_ROWS
+
+    def _map(self, capacity):
+        """컬럼 파일을 capacity 행 크기로 맞추고 메모리 맵을 (다시) 엽니다."""
+        dtypes = {'time': np.int64}
+        dtypes.update({field: np.float64 for field in FIELDS})
+        for name, dtype in dtypes.items():
+            file_path = os.path.join(self.path, f"{name}.bin")
+            size = capacity * np.dtype(dtype).itemsize
+            with open(file_path, 'ab') as f:
+                if f.tell() < size:
+                    f.truncate(size)
+            self.columns[name] = np.memmap(file_path, dtype=dtype, mode='r+', shape=(capacity,))
+        self.capacity = capacity
+
+    def _ensure_capacity(self, rows):
+        if rows > self.capacity:
+            self.flush()
+            self._map(self._capacity_for(rows))
+
+    @property
+    def last_time(self):
+        """마지막 저장 봉의 시각 (ns, KST 기준), 비어 있으면 None"""
+        return int(self.columns['time'][self.count - 1]) if self.count else None
+
+    def _missing_count(self):
+        """마지막 저장 봉 이후 받아와야 할 봉 개수 (진행 중이던 봉 포함)"""
+        if not self.count:
+            return INITIAL_COUNT
+        last_epoch = self.last_time / 1e9 - KST_OFFSET
+        missing = int((time.time() - last_epoch) // self.period) + 1
+        return max(1, min(missing, MAX_BACKFILL))
+
+    def merge(self, df):
+        """
+        get_ohlcv() 결과를 저장소에 반영합니다.
+        마지막 저장 봉과 같은 시각이면 덮어쓰고(진행 중인 봉 보정), 이후 시각의 봉만 추가합니다.
+
+        Returns:
+            int: 새로 추가된 봉 개수
+        """
+        if df is None or df.empty:
+            return 0
+        with self._lock:
+            return self._merge(df)
+
+    def _merge(self, df):
+        times = df.index.values.astype('datetime64[ns]').astype(np.int64)
+        last = self.last_time
+        if last is not None:
+            patch = np.flatnonzero(times == last)
+            if patch.size:
+                row = patch[-1]
+                for field in FIELDS:
+                    self.columns[field][self.count - 1] = df[field].iat[row]
+            new = times > last
+        else:
+            new = np.ones(len(times), dtype=bool)
+
+        added = int(new.sum())
+        if added:
+            start, end = self.count, self.count + added
+            self._ensure_capacity(end)
+            self.columns['time'][start:end] = times[new]
+            for field in FIELDS:
+                self.columns[field][start:end] = df[field].to_numpy(dtype=np.float64)[new]
+            self.count = end
+        self.flush()
+        return added
+
+    def refresh(self, fetch=python_bithumb.get_ohlcv):
+        """
+        마지막 저장 봉 이후의 봉만 빗썸에서 받아와 반영합니다.
+
+        Returns:
+            int: 새로 추가된 봉 개수 (이전 refresh()가 아직 진행 중이면 조회하지 않고 0)
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return 0
+        try:
+            with self._lock:
+                count = self._missing_count()
+            df = fetch(self.symbol, self.interval, count=count)
+            return self.merge(df)
+        finally:
+            self._refresh_lock.release()
+
+    def tail(self, n):
+        """
+        마지막 n개 봉을 복사 없이 반환합니다.
+
+        Returns:
+            dict: 'time'(datetime64[ns]) 및 FIELDS 컬럼별 numpy 뷰
+        """
+        with self._lock:
+            start = max(0, self.count - n)
+            view = {name: col[start:self.count] for name, col in self.columns.items()}
+        view['time'] = view['time'].view('datetime64[ns]')
+        return view
+
+    def tail_frame(self, n):
+        """마지막 n개 봉을 get_ohlcv()와 같은 형태의 DataFrame으로 반환합니다."""
+        view = self.tail(n)
+        index = pd.DatetimeIndex(view.pop('time'), name='candle_date_time_kst')
+        return pd.DataFrame(view, index=index, copy=False)
+
+    def flush(self):
+        """메모리 맵을 디스크에 쓰고 봉 개수를 기록합니다. (데이터를 먼저 쓰고 개수를 나중에 기록)"""
+        for col in self.columns.values():
+            col.flush()
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'symbol': self.symbol, 'interval': self.interval, 'count': self.count}, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def __len__(self):
+        return self.count
+
+
+if __name__ == "__main__":
+    store = CandleStore("KRW-BTC", "minute60")
+    added = store.refresh()
+    print(f"✅ {store.symbol} {store.interval}: 새 봉 {added}개, 저장된 봉 {len(store)}개")
+    print(store.tail_frame(5))
@@ -0,0 +1,114 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+log = logging.getLogger(__name__)
+
+# 캐시 파일 경로 및 기본 설정
+DECISION_CACHE_PATH = os.getenv("DECISION_CACHE_PATH", "decision_cache.json")
+DEFAULT_TTL = 3600          # 초
+DEFAULT_MAX_ENTRIES = 1000
+# 지표 값을 이 유효숫자로 반올림해서 키를 만듦 (미세한 부동소수점 차이로 캐시가 깨지지 않도록)
+SIGNIFICANT_DIGITS = 6
+
+
+def _round(value, digits):
+    if isinstance(value, float):
+        if value != value:
+            return "nan"
+        return f"{value:.{digits}g}"
+    return str(value)
+
+
+def make_key(frame, fear_greed, prompt_version, digits=SIGNIFICANT_DIGITS):
+    """
+    AI 판단 입력(지표 tail, 공포 탐욕 지수, 프롬프트 버전)의 내용 기반 캐시 키를 만듭니다.
+
+    Args:
+        frame (pandas.DataFrame): 프롬프트에 들어가는 행/컬럼만 잘라낸 데이터
+        fear_greed: 공포 탐욕 지수
+        prompt_version (str): 프롬프트가 바뀌면 함께 바꿔 이전 판단을 무효화
+        digits (int): 반올림할 유효숫자
+
+    Returns:
+        str: sha256 16진수 문자열
+    """
+    h = hashlib.sha256()
+    h.update(prompt_version.encode())
+    h.update(b"\0")
+    h.update(",".join(map(str, frame.columns)).encode())
+    for index, row in zip(frame.index, frame.itertuples(index=False)):
+        h.update(b"\n")
+        h.update(str(index).encode())
+        for value in row:
+            h.update(b",")
+            h.update(_round(value, digits).encode())
+    h.update(b"\0")
+    h.update(str(fear_greed).encode())
+    return h.hexdigest()
+
+
+class DecisionCache:
+    """
+    AI 판단 결과를 입력 해시로 보관하는 TTL + LRU 캐시. 디스크(JSON)에 저장되어 재시작 후에도 재사용됩니다.
+    """
+
+    def __init__(self, path=DECISION_CACHE_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()   # key -> (저장 시각, 판단)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            log.warning("❗ 판단 캐시 로드 실패: %s", e)
+            return
+        now = time.time()
+        for key, (saved_at, decision) in stored.items():
+            if now - saved_at < self.ttl:
+                self.entries[key] = (saved_at, decision)
+
+    def get(self, key):
+        """유효한 캐시 판단을 반환하고, 없거나 만료되었으면 None을 반환합니다."""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None or time.time() - entry[0] >= self.ttl:
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, decision):
+        """판단을 저장하고 디스크에 기록합니다. 최대 개수를 넘으면 가장 오래 안 쓴 항목부터 제거합니다."""
+        with self._lock:
+            self.entries[key] = (time.time(), decision)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        self.save()
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            snapshot = dict(self.entries)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,592 @@
+import json
+import math
+import base64
+import hashlib
+import logging
+import time
+import uuid
+import random
+import argparse
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, urlencode, unquote
+import numpy as np
+from candle_store import CandleStore, CANDLE_DIR
+from order_book import OrderBook
+
+log = logging.getLogger(__name__)
+
+# 빗썸 봉 경계는 KST 기준
+KST_OFFSET = 9 * 3600
+KST = timezone(timedelta(hours=9))
+
+DEFAULT_PORT = 8765
+FEE_RATE = 0.0025
+INITIAL_KRW = 1_000_000
+# 가상 가격 경로 기본값 (1분 해상도, 일봉 200개 워밍업이 가능하도록 과거 210일 + 재생용 30일)
+SYNTHETIC_STEP = 60
+SYNTHETIC_DAYS = 210
+SYNTHETIC_FUTURE_DAYS = 30
+# 녹화 봉 재생 시 재생 시작 전에 쌓아 둘 봉 수 (지표 워밍업)
+REPLAY_WARMUP = 200
+# 가상 호가창 단계 수와 단계별 잔량 (KRW 기준)
+BOOK_LEVELS = 30
+LEVEL_DEPTH_KRW = 5_000_000
+
+
+class SimulatorError(Exception):
+    """API 오류 응답으로 바뀌는 예외 (status, name, message)"""
+
+    def __init__(self, status, name, message):
+        super().__init__(message)
+        self.status = status
+        self.name = name
+
+
+class PricePath:
+    """
+    고정 간격(step 초) OHLCV 배열로 된 가격 경로. 요청한 봉 길이로 묶어 get_ohlcv() 응답을 만듭니다.
+    """
+
+    def __init__(self, market, start, step, opens, highs, lows, closes, volumes, replay_start=None):
+        self.market = market
+        self.start = start
+        self.replay_start = start if replay_start is None else replay_start   # 재생을 시작할 시각
+        self.step = step
+        self.open = np.asarray(opens, dtype=np.float64)
+        self.high = np.asarray(highs, dtype=np.float64)
+        self.low = np.asarray(lows, dtype=np.float64)
+        self.close = np.asarray(closes, dtype=np.float64)
+        self.volume = np.asarray(volumes, dtype=np.float64)
+
+    @classmethod
+    def synthetic(cls, market, now, price=100_000_000, step=SYNTHETIC_STEP, days=SYNTHETIC_DAYS,
+                  future_days=SYNTHETIC_FUTURE_DAYS, volatility=0.0008, seed=0):
+        """now(epoch 초) 이전 days일과 이후 future_days일을 덮는 가상 가격 경로 (기하 브라운 운동)"""
+        n = int((days + future_days) * 86400 // step)
+        rng = np.random.default_rng(seed)
+        close = price * np.exp(np.cumsum(rng.normal(0, volatility, n)))
+        opens = np.concatenate([[price], close[:-1]])
+        spread = np.abs(rng.normal(0, volatility / 2, n)) * close
+        high = np.maximum(opens, close) + spread
+        low = np.minimum(opens, close) - spread
+        volume = rng.uniform(0.01, 1.0, n)
+        start = now - days * 86400
+        start -= (start + KST_OFFSET) % step
+        return cls(market, start, step, opens, high, low, close, volume, replay_start=now)
+
+    @classmethod
+    def from_store(cls, market, interval, root=CANDLE_DIR):
+        """CandleStore에 저장된(녹화된) 봉을 가격 경로로 사용합니다."""
+        store = CandleStore(market, interval, root)
+        view = store.tail(len(store))
+        if len(view['close']) < 2:
+            raise ValueError(f"{market} {interval} 저장된 봉이 부족합니다.")
+        times = view['time'].astype('int64') // 10**9 - KST_OFFSET   # KST 벽시계 -> epoch 초
+        step = int(np.median(np.diff(times)))
+        start = int(times[0])
+        replay_start = start + min(REPLAY_WARMUP, len(times) - 1) * step
+        return cls(market, start, step, view['open'], view['high'], view['low'], view['close'], view['volume'],
+                   replay_start=replay_start)
+
+    @property
+    def end(self):
+        return self.start + len(self.close) * self.step
+
+    def _row(self, t):
+        return min(max(int((t - self.start) // self.step), 0), len(self.close) - 1)
+
+    def price_at(self, t):
+        """t 시점 가격 (해당 구간의 시가 -> 종가 선형 보간)"""
+        i = self._row(t)
+        frac = min(max((t - self.start - i * self.step) / self.step, 0.0), 1.0)
+        return float(self.open[i] + (self.close[i] - self.open[i]) * frac)
+
+    def candles(self, period, now, count=200, to=None):
+        """
+        t=now 기준(진행 중인 봉 포함) period초 봉을 최신순 dict 리스트로 만듭니다. (빗썸 /v1/candles 응답 형태)
+        to(KST 문자열)가 있으면 그 시각 이전 봉만 반환합니다.
+        """
+        if period % self.step:
+            raise SimulatorError(400, "invalid_parameter", f"봉 길이 {period}초는 경로 간격 {self.step}초의 배수여야 합니다.")
+        end_t = now
+        if to:
+            to_t = datetime.fromisoformat(to.replace(" ", "T")).replace(tzinfo=KST).timestamp()
+            end_t = min(now, to_t - 1)
+        hi = self._row(end_t) + 1
+        k = period // self.step
+        lo = max(0, hi - (count + 1) * k)
+        if hi <= lo:
+            return []
+        times = self.start + np.arange(lo, hi) * self.step
+        buckets = (times + KST_OFFSET) // period
+        _, first = np.unique(buckets, return_index=True)
+        last = np.append(first[1:], hi - lo) - 1
+        close = self.close[lo:hi].copy()
+        if end_t < self.start + hi * self.step:
+            close[-1] = self.price_at(end_t)   # 진행 중인 구간은 현재가까지만
+        highs = np.maximum.reduceat(np.maximum(self.high[lo:hi], close), first)
+        lows = np.minimum.reduceat(np.minimum(self.low[lo:hi], close), first)
+        volumes = np.add.reduceat(self.volume[lo:hi], first)
+        rows = []
+        for j in range(len(first) - 1, max(len(first) - 1 - count, -1), -1):
+            bucket_start = buckets[first[j]] * period - KST_OFFSET
+            kst = datetime.fromtimestamp(bucket_start, KST)
+            utc = datetime.fromtimestamp(bucket_start, timezone.utc)
+            rows.append({
+                'market': self.market,
+                'candle_date_time_utc': utc.strftime("%Y-%m-%dT%H:%M:%S"),
+                'candle_date_time_kst': kst.strftime("%Y-%m-%dT%H:%M:%S"),
+                'opening_price': float(self.open[lo + first[j]]),
+                'high_price': float(highs[j]),
+                'low_price': float(lows[j]),
+                'trade_price': float(close[last[j]]),
+                'timestamp': int(bucket_start * 1000),
+                'candle_acc_trade_price': float(volumes[j] * close[last[j]]),
+                'candle_acc_trade_volume': float(volumes[j]),
+            })
+        return rows
+
+
+class SimulatedExchange:
+    """
+    가격 경로를 speed배속으로 재생하며 잔고/주문을 흉내 내는 가상 거래소.
+    시장가 주문은 가상 호가창(OrderBook)을 먹어 들어가는 가격으로 즉시 체결되고,
+    지정가 주문은 이후 요청 시점의 가격이 지정가를 넘어서면 체결됩니다.
+    """
+
+    def __init__(self, paths, krw=INITIAL_KRW, fee_rate=FEE_RATE, speed=1.0, llm_decision="hold",
+                 clock=time.time):
+        self.paths = {path.market: path for path in paths}
+        self.fee_rate = fee_rate
+        self.speed = speed
+        self.llm_decision = llm_decision
+        self.clock = clock
+        self._wall_start = clock()
+        self._sim_start = min(path.replay_start for path in paths)
+        self.accounts = {'KRW': [float(krw), 0.0]}
+        self.orders = OrderedDict()
+        self._lock = threading.Lock()
+
+    def now(self):
+        """시뮬레이션 시각 (epoch 초)"""
+        return self._sim_start + (self.clock() - self._wall_start) * self.speed
+
+    def path(self, market):
+        path = self.paths.get(market)
+        if path is None:
+            raise SimulatorError(404, "market_not_found", f"{market} 마켓이 없습니다.")
+        return path
+
+    def price(self, market):
+        return self.path(market).price_at(self.now())
+
+    def orderbook(self, market):
+        """현재가 주변 BOOK_LEVELS단계 가상 호가창 (get_orderbook() 응답 형태)"""
+        price = self.price(market)
+        tick = 10 ** max(int(math.log10(price)) - 4, 0)
+        best_ask = (math.floor(price / tick) + 1) * tick
+        best_bid = math.floor(price / tick) * tick
+        rng = random.Random(f"{market}:{int(self.now())}")
+        units = []
+        for i in range(BOOK_LEVELS):
+            ask, bid = best_ask + i * tick, best_bid - i * tick
+            units.append({
+                'ask_price': ask, 'bid_price': bid,
+                'ask_size': round(LEVEL_DEPTH_KRW / ask * rng.uniform(0.2, 1.8), 8),
+                'bid_size': round(LEVEL_DEPTH_KRW / bid * rng.uniform(0.2, 1.8), 8),
+            })
+        return {
+            'market': market,
+            'timestamp': int(self.now() * 1000),
+            'total_ask_size': sum(u['ask_size'] for u in units),
+            'total_bid_size': sum(u['bid_size'] for u in units),
+            'orderbook_units': units,
+        }
+
+    def _account(self, currency):
+        return self.accounts.setdefault(currency, [0.0, 0.0])
+
+    def accounts_json(self):
+        with self._lock:
+            self._match_limits()
+            return [{'currency': c, 'balance': f"{b:.8f}", 'locked': f"{l:.8f}", 'avg_buy_price': "0",
+                     'avg_buy_price_modified': False, 'unit_currency': "KRW"}
+                    for c, (b, l) in self.accounts.items()]
+
+    def _fill(self, order, price, volume, krw):
+        volume = math.floor(volume * 1e8) / 1e8   # 빗썸 수량 소수점 8자리
+        fee = krw * self.fee_rate
+        base = self._account(order['market'].split("-", 1)[1])
+        quote = self._account('KRW')
+        if order['side'] == 'bid':
+            quote[1] -= order['_reserved']
+            quote[0] += order['_reserved'] - krw - fee
+            base[0] += volume
+        else:
+            base[1] -= order['_reserved']
+            base[0] += order['_reserved'] - volume
+            quote[0] += krw - fee
+        order.update(state='done', executed_volume=f"{volume:.8f}", executed_funds=f"{krw:.8f}", remaining_volume="0",
+                     paid_fee=f"{fee:.8f}", remaining_fee="0", locked="0", trades_count=1)
+        order['trades'] = [{'market': order['market'], 'uuid': str(uuid.uuid4()), 'price': f"{price:.8f}",
+                            'volume': f"{volume:.8f}", 'funds': f"{krw:.8f}", 'side': order['side'],
+                            'created_at': order['created_at']}]
+
+    def place_order(self, body):
+        """POST /v1/orders"""
+        market, side, ord_type = body.get('market'), body.get('side'), body.get('ord_type')
+        path = self.path(market)
+        book = OrderBook.from_orderbook(self.orderbook(market))
+        with self._lock:
+            self._match_limits()
+            order = {
+                'uuid': str(uuid.uuid4()), 'side': side, 'ord_type': ord_type, 'price': body.get('price'),
+                'state': 'wait', 'market': market,
+                'created_at': datetime.fromtimestamp(self.now(), KST).isoformat(timespec='seconds'),
+                'volume': body.get('volume'), 'remaining_volume': body.get('volume'), 'reserved_fee': "0",
+                'remaining_fee': "0", 'paid_fee': "0", 'locked': "0", 'executed_volume': "0",
+                'executed_funds': "0", 'trades_count': 0,
+            }
+            base = self._account(market.split("-", 1)[1])
+            quote = self._account('KRW')
+            if side == 'bid':
+                krw = float(body['price']) if ord_type == 'price' else float(body['price']) * float(body['volume'])
+                if krw * (1 + self.fee_rate) > quote[0]:
+                    raise SimulatorError(400, "insufficient_funds_bid", "주문 가능 금액이 부족합니다.")
+                order['_reserved'] = krw * (1 + self.fee_rate)
+                quote[0] -= order['_reserved']
+                quote[1] += order['_reserved']
+            elif side == 'ask':
+                volume = float(body['volume'])
+                if volume > base[0] + 1e-8:
+                    raise SimulatorError(400, "insufficient_funds_ask", "주문 가능 수량이 부족합니다.")
+                order['_reserved'] = volume
+                base[0] -= volume
+                base[1] += volume
+            else:
+                raise SimulatorError(400, "invalid_side", f"알 수 없는 side: {side}")
+
+            if ord_type == 'price':
+                fill = book.expected_buy(float(body['price']))
+                self._fill(order, fill.average_price, fill.volume, fill.krw)
+            elif ord_type == 'market':
+                fill = book.expected_sell(float(body['volume']))
+                self._fill(order, fill.average_price, fill.volume, fill.krw)
+            elif ord_type != 'limit':
+                raise SimulatorError(400, "invalid_ord_type", f"알 수 없는 ord_type: {ord_type}")
+            order['_path'] = path
+            self.orders[order['uuid']] = order
+            self._match_limits()
+            return self._public(order, trades=False)
+
+    def _match_limits(self):
+        """대기 중인 지정가 주문 중 현재가가 지정가를 넘어선 주문을 체결합니다. (잠금 상태에서 호출)"""
+        now = self.now()
+        for order in self.orders.values():
+            if order['state'] != 'wait':
+                continue
+            price, limit = order['_path'].price_at(now), float(order['price'])
+            if (order['side'] == 'bid' and price <= limit) or (order['side'] == 'ask' and price >= limit):
+                volume = float(order['volume'])
+                self._fill(order, limit, volume, limit * volume)
+
+    def _public(self, order, trades=True):
+        result = {k: v for k, v in order.items() if not k.startswith('_') and k != 'trades'}
+        if trades:
+            result['trades'] = order.get('trades', [])
+        return result
+
+    def get_order(self, order_uuid):
+        """GET /v1/order"""
+        with self._lock:
+            self._match_limits()
+            order = self.orders.get(order_uuid)
+            if order is None:
+                raise SimulatorError(404, "order_not_found", "주문을 찾을 수 없습니다.")
+            return self._public(order)
+
+    def list_orders(self, market=None, states=None, page=1, limit=100, order_by='desc'):
+        """GET /v1/orders"""
+        with self._lock:
+            self._match_limits()
+            orders = [o for o in self.orders.values()
+                      if (market is None or o['market'] == market) and (not states or o['state'] in states)]
+        if order_by == 'desc':
+            orders.reverse()
+        start = (page - 1) * limit
+        return [self._public(o, trades=False) for o in orders[start:start + limit]]
+
+    def cancel_order(self, order_uuid):
+        """DELETE /v1/order"""
+        with self._lock:
+            self._match_limits()
+            order = self.orders.get(order_uuid)
+            if order is None:
+                raise SimulatorError(404, "order_not_found", "주문을 찾을 수 없습니다.")
+            if order['state'] != 'wait':
+                raise SimulatorError(400, "order_not_cancellable", "취소할 수 없는 주문입니다.")
+            account = self._account('KRW' if order['side'] == 'bid' else order['market'].split("-", 1)[1])
+            account[0] += order['_reserved']
+            account[1] -= order['_reserved']
+            order['state'] = 'cancel'
+            return self._public(order, trades=False)
+
+    def order_chance(self, market):
+        """GET /v1/orders/chance"""
+        base = market.split("-", 1)[1]
+        accounts = {a['currency']: a for a in self.accounts_json()}
+        empty = {'currency': base, 'balance': "0", 'locked': "0"}
+        return {
+            'bid_fee': str(self.fee_rate), 'ask_fee': str(self.fee_rate),
+            'market': {'id': market, 'bid': {'currency': 'KRW', 'min_total': "5000"},
+                       'ask': {'currency': base, 'min_total': "5000"}, 'state': 'active'},
+            'bid_account': accounts.get('KRW'), 'ask_account': accounts.get(base, empty),
+        }
+
+    def fear_greed(self, limit=1):
+        """alternative.me /fng/ 응답 (시뮬레이션 시각 기준 하루 단위로 천천히 변하는 값)"""
+        day = int(self.now() // 86400)
+        data = []
+        for d in range(day, day - max(limit, 1), -1):
+            value = int(50 + 40 * math.sin(d / 7))
+            label = ("Extreme Fear" if value < 25 else "Fear" if value < 45 else
+                     "Neutral" if value <= 55 else "Greed" if value <= 75 else "Extreme Greed")
+            data.append({'value': str(value), 'value_classification': label, 'timestamp': str(d * 86400),
+                         'time_until_update': str(int(86400 - self.now() % 86400)) if d == day else None})
+        return {'name': "Fear and Greed Index", 'data': data, 'metadata': {'error': None}}
+
+    def chat_completion(self, body):
+        """OpenAI /v1/chat/completions 대체 응답 (llm_decision 고정 판단)"""
+        content = json.dumps({'decision': self.llm_decision, 'reason': "exchange simulator stub"})
+        prompt_chars = sum(len(str(m.get('content', ''))) for m in body.get('messages', []))
+        return {
+            'id': f"chatcmpl-sim-{uuid.uuid4().hex[:12]}", 'object': "chat.completion", 'created': int(time.time()),
+            'model': body.get('model', "simulator"),
+            'choices': [{'index': 0, 'finish_reason': "stop",
+                         'message': {'role': "assistant", 'content': content}}],
+            'usage': {'prompt_tokens': prompt_chars // 4, 'completion_tokens': len(content) // 4,
+                      'total_tokens': (prompt_chars + len(content)) // 4},
+        }
+
+
+def _minutes_period(path):
+    try:
+        return int(path.rsplit("/", 1)[1]) * 60
+    except ValueError:
+        raise SimulatorError(400, "invalid_parameter", "잘못된 분봉 단위입니다.")
+
+
+class SimulatorHandler(BaseHTTPRequestHandler):
+    """빗썸/alternative.me/OpenAI와 같은 경로를 처리하는 요청 핸들러 (server.exchange 사용)"""
+
+    protocol_version = "HTTP/1.1"   # keep-alive (http_transport 커넥션 풀 재사용)
+    # 헤더와 본문을 따로 쓰므로 Nagle을 끄지 않으면 keep-alive 요청마다 지연 ACK(~40ms)만큼 멈춤
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if not raw:
+            return {}
+        if "json" in (self.headers.get("Content-Type") or ""):
+            return json.loads(raw)
+        return {k: v[0] for k, v in parse_qs(raw.decode()).items()}
+
+    def _require_auth(self, query=""):
+        """
+        인증 헤더를 확인합니다. JWT의 query_hash는 받은 쿼리 문자열의 SHA-512와 같아야 합니다. (POST는 본문을 urlencode한 값)
+        requests가 전송 시 states[]의 대괄호를 %5B%5D로 바꾸므로 빗썸처럼 디코딩한 쿼리(states[]=done)와 비교합니다.
+        (이스케이프된 문자열을 서명하면 거절)
+        """
+        authorization = self.headers.get("Authorization") or ""
+        if not authorization.startswith("Bearer ") and not self.headers.get("Api-Key"):
+            raise SimulatorError(401, "invalid_access_key", "인증 정보가 없습니다.")
+        if not authorization.startswith("Bearer "):
+            return
+        try:
+            segment = authorization[7:].split(".")[1]
+            payload = json.loads(base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4)))
+        except (IndexError, ValueError):
+            raise SimulatorError(401, "invalid_jwt", "JWT 형식이 올바르지 않습니다.")
+        signed = payload.get('query_hash')
+        if (signed or query) and signed != hashlib.sha512(query.encode()).hexdigest():
+            raise SimulatorError(401, "invalid_query_payload", "query_hash가 요청 쿼리와 일치하지 않습니다.")
+
+    def _route(self, method):
+        url = urlparse(self.path)
+        path = url.path.rstrip("/") or "/"
+        query = parse_qs(url.query)
+        q = {k: v[0] for k, v in query.items()}
+        ex = self.server.exchange
+
+        if method == "GET":
+            if path == "/v1/ticker":
+                markets = q.get('markets', "").split(",")
+                return [{'market': m, 'trade_price': ex.price(m), 'timestamp': int(ex.now() * 1000)} for m in markets if m]
+            if path == "/v1/orderbook":
+                return [ex.orderbook(m) for m in q.get('markets', "").split(",") if m]
+            if path == "/v1/market/all":
+                return [{'market': m, 'korean_name': m, 'english_name': m} for m in ex.paths]
+            if path.startswith("/v1/candles/"):
+                period = {'days': 86400, 'weeks': 7 * 86400}.get(path.rsplit("/", 1)[1]) or _minutes_period(path)
+                return ex.path(q.get('market')).candles(period, ex.now(), int(q.get('count', 200)), q.get('to'))
+            if path == "/fng":
+                # limit=0은 전체 이력 (가상 가격 경로 기간만큼)
+                return ex.fear_greed(int(q.get('limit', 1) or 0) or SYNTHETIC_DAYS)
+            if path == "/sim/stats":
+                return self.server.stats_json()
+            self._require_auth(unquote(url.query))
+            if path == "/v1/accounts":
+                return ex.accounts_json()
+            if path == "/v1/order":
+                return ex.get_order(q.get('uuid'))
+            if path == "/v1/orders":
+                states = query.get('states[]') or ([q['state']] if 'state' in q else None)
+                return ex.list_orders(q.get('market'), states, int(q.get('page', 1)), int(q.get('limit', 100)),
+                                      q.get('order_by', 'desc'))
+            if path == "/v1/orders/chance":
+                return ex.order_chance(q.get('market'))
+        elif method == "POST":
+            body = self._body()
+            if path == "/v1/chat/completions":
+                return ex.chat_completion(body)
+            self._require_auth(urlencode(body))
+            if path == "/v1/orders":
+                return ex.place_order(body)
+            if path == "/info/order_detail":
+                # 레거시 API: 주문 한 건 상세 (order_id가 없으면 최근 주문)
+                orders = ex.list_orders(limit=1)
+                order = ex.get_order(body['order_id']) if body.get('order_id') else (orders[0] if orders else None)
+                return {'status': "0000", 'data': order}
+        elif method == "DELETE":
+            self._require_auth(unquote(url.query))
+            if path == "/v1/order":
+                return ex.cancel_order(q.get('uuid'))
+        raise SimulatorError(404, "not_found", f"{method} {path} 경로가 없습니다.")
+
+    def _handle(self, method):
+        start = time.perf_counter()
+        server = self.server
+        route = urlparse(self.path).path
+        try:
+            if server.latency or server.jitter:
+                time.sleep(server.latency + random.uniform(0, server.jitter))
+            if server.error_rate and not route.startswith("/sim") and random.random() < server.error_rate:
+                status = random.choice((429, 500, 503))
+                self._body() if method == "POST" else None
+                self._send(status, {'error': {'name': "injected_error", 'message': f"시뮬레이터 주입 오류 {status}"}})
+            else:
+                self._send(200 if method != "POST" or route != "/v1/orders" else 201, self._route(method))
+                status = 200
+        except SimulatorError as e:
+            status = e.status
+            self._send(e.status, {'error': {'name': e.name, 'message': str(e)}})
+        except Exception as e:
+            status = 500
+            self._send(500, {'error': {'name': "server_error", 'message': str(e)}})
+        server.record(method, route, status, time.perf_counter() - start)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+
+class SimulatorServer(ThreadingHTTPServer):
+    """요청별 지연/오류 주입과 경로별 호출 통계를 가진 시뮬레이터 HTTP 서버"""
+
+    daemon_threads = True
+
+    def __init__(self, exchange, host="127.0.0.1", port=DEFAULT_PORT, latency=0.0, jitter=0.0, error_rate=0.0):
+        super().__init__((host, port), SimulatorHandler)
+        self.exchange = exchange
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.stats = {}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record(self, method, route, status, elapsed):
+        key = f"{method} {route}"
+        with self._stats_lock:
+            entry = self.stats.setdefault(key, {'count': 0, 'errors': 0, 'total_seconds': 0.0})
+            entry['count'] += 1
+            entry['errors'] += status >= 400
+            entry['total_seconds'] += elapsed
+
+    def stats_json(self):
+        with self._stats_lock:
+            return {key: dict(value, avg_ms=value['total_seconds'] / value['count'] * 1000)
+                    for key, value in self.stats.items()}
+
+
+def start_background(exchange, **kwargs):
+    """시뮬레이터를 백그라운드 스레드에서 띄우고 서버 객체를 반환합니다. (server.url로 접속, server.shutdown()으로 종료)"""
+    server = SimulatorServer(exchange, **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def build_exchange(markets, interval=None, speed=1.0, krw=INITIAL_KRW, llm_decision="hold", seed=0):
+    """
+    마켓별 가격 경로로 SimulatedExchange를 만듭니다.
+    interval이 주어지고 CandleStore에 저장된 봉이 있으면 그 봉을 재생하고, 없으면 가상 경로를 만듭니다.
+    """
+    now = time.time()
+    paths = []
+    for i, market in enumerate(markets):
+        path = None
+        if interval:
+            try:
+                path = PricePath.from_store(market, interval)
+            except (ValueError, OSError) as e:
+                log.warning("❗ %s 녹화 봉 사용 불가, 가상 경로 사용: %s", market, e)
+        paths.append(path or PricePath.synthetic(market, now, seed=seed + i))
+    return SimulatedExchange(paths, krw=krw, speed=speed, llm_decision=llm_decision)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="빗썸/공포 탐욕 지수/OpenAI 로컬 시뮬레이터")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--markets", default="KRW-BTC", help="쉼표 구분 마켓 목록")
+    parser.add_argument("--replay", default=None, help="CandleStore에 녹화된 봉 인터벌 (예: minute60)")
+    parser.add_argument("--speed", type=float, default=1.0, help="재생 배속")
+    parser.add_argument("--latency", type=float, default=0.0, help="요청당 고정 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="요청당 추가 무작위 지연 최대값 (초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="429/5xx 주입 비율 (0~1)")
+    parser.add_argument("--krw", type=float, default=INITIAL_KRW, help="시작 KRW 잔고")
+    parser.add_argument("--llm-decision", default="hold", choices=["buy", "sell", "hold"])
+    args = parser.parse_args()
+
+    exchange = build_exchange(args.markets.split(","), args.replay, args.speed, args.krw, args.llm_decision)
+    server = SimulatorServer(exchange, args.host, args.port, args.latency, args.jitter, args.error_rate)
+    print(f"🧪 거래소 시뮬레이터 실행: {server.url} ({args.speed}배속, 지연 {args.latency}s, 오류율 {args.error_rate})")
+    print(f"   SIMULATOR_URL={server.url} OPENAI_BASE_URL={server.url}/v1 OPENAI_API_KEY=sim python yhgo_okno-gpt.py")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
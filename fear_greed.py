@@ -0,0 +1,251 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import namedtuple
+import numpy as np
+import http_transport
+import metrics
+
+log = logging.getLogger(__name__)
+
+FNG_URL = "https://api.alternative.me/fng/"
+# 마지막 값과 다음 갱신 시각을 저장하는 파일 (재시작 후 바로 사용)
+FEAR_GREED_PATH = os.getenv("FEAR_GREED_PATH", "fear_greed.json")
+# limit=0 전체 이력을 저장하는 파일 (백테스트용)
+FEAR_GREED_HISTORY_PATH = os.getenv("FEAR_GREED_HISTORY_PATH", "fear_greed_history.json")
+FETCH_TIMEOUT = 10
+# 원본 갱신 시각(time_until_update)이 지난 뒤 이만큼 더 기다렸다가 조회 (초)
+UPDATE_SETTLE = 60
+# time_until_update가 없을 때의 갱신 주기, 조회 실패 시 재시도 간격 (초)
+DEFAULT_REFRESH = 3600
+RETRY_SECONDS = 300
+# 이보다 오래된 값은 조회 실패가 이어져도 쓰지 않음 (지수는 하루 한 번 바뀜)
+MAX_STALE = 3 * 86400
+# 저장된 이력이 이보다 오래되었으면 다시 받아옴
+HISTORY_MAX_AGE = 86400
+
+# value: 지수 (0~100), value_classification: 'Fear' 등, timestamp: 지수 기준일 (UTC 자정, epoch 초)
+# fetched_at: 받아온 시각, next_update: 다음에 조회할 시각 (epoch 초)
+Reading = namedtuple('Reading', ['value', 'value_classification', 'timestamp', 'fetched_at', 'next_update'])
+
+
+def _fetch(limit):
+    response = http_transport.get(FNG_URL, params={'limit': limit}, timeout=FETCH_TIMEOUT)
+    response.raise_for_status()
+    return response.json()['data']
+
+
+class FearGreedIndex:
+    """
+    하루에 한 번 바뀌는 공포 탐욕 지수를 원본 갱신 일정에 맞춰서만 받아오는 캐시.
+
+    - current()/value()는 네트워크를 기다리지 않고 저장된 값을 바로 반환합니다.
+      (처음 실행해 저장된 값이 없을 때만 한 번 직접 조회)
+    - 응답의 time_until_update가 지나면 백그라운드에서 한 번만 다시 받아오고, 그동안은 이전 값을 계속 씁니다.
+    - 조회가 실패하면 이전 값을 유지하고 RETRY_SECONDS 뒤 다시 시도합니다. (MAX_STALE보다 오래된 값은 None)
+    - 마지막 값은 파일에 저장되어 재시작 후에도 갱신 시각 전까지는 조회하지 않습니다.
+    """
+
+    def __init__(self, path=FEAR_GREED_PATH, history_path=FEAR_GREED_HISTORY_PATH, fetch=_fetch, clock=time.time):
+        self.path = path
+        self.history_path = history_path
+        self.fetch = fetch
+        self.clock = clock
+        self.reading = None
+        self.fetches = 0
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._thread = None
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                self.reading = Reading(**json.load(f))
+        except (OSError, ValueError, TypeError) as e:
+            log.warning("❗ 공포 탐욕 지수 캐시 로드 실패: %s", e)
+
+    def _save(self, reading):
+        if not self.path:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(reading._asdict(), f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def refresh(self):
+        """
+        지금 바로 최신 값을 받아옵니다. (실패하면 이전 값을 유지하고 다음 시도 시각만 미룸)
+
+        Returns:
+            Reading: 최신 값 (한 번도 받아오지 못했으면 None)
+        """
+        now = self.clock()
+        try:
+            with metrics.span("fear_greed"):
+                item = self.fetch(1)[0]
+            self.fetches += 1
+            until = item.get('time_until_update')
+            delay = int(until) + UPDATE_SETTLE if until else DEFAULT_REFRESH
+            reading = Reading(int(item['value']), item.get('value_classification'), int(item['timestamp']),
+                              now, now + delay)
+            self._save(reading)
+            metrics.inc("fear_greed_refresh_total", result="ok")
+        except Exception as e:
+            metrics.inc("fear_greed_refresh_total", result="error")
+            log.warning("❗ 공포 탐욕 지수 조회 실패 (이전 값 사용, %s초 후 재시도): %s", RETRY_SECONDS, e)
+            if self.reading is None:
+                return None
+            reading = self.reading._replace(next_update=now + RETRY_SECONDS)
+        self.reading = reading
+        return reading
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        finally:
+            self._refreshing = False
+
+    def current(self):
+        """
+        캐시된 최신 값. 갱신 시각이 지났으면 백그라운드 갱신을 시작하고 이전 값을 바로 반환합니다.
+
+        Returns:
+            Reading: (값이 없거나 MAX_STALE보다 오래되었으면 None)
+        """
+        reading = self.reading
+        if reading is None:
+            with self._lock:
+                reading = self.reading or self.refresh()
+            if reading is None:
+                return None
+        now = self.clock()
+        if now >= reading.next_update:
+            with self._lock:
+                if not self._refreshing:
+                    self._refreshing = True
+                    threading.Thread(target=self._refresh_in_background, name="fear-greed-refresh", daemon=True).start()
+        if now - reading.fetched_at > MAX_STALE:
+            return None
+        return reading
+
+    def value(self):
+        """지수 값 (없으면 None) - 기존 fetch_fear_and_greed()와 같은 반환값"""
+        reading = self.current()
+        return reading.value if reading else None
+
+    def start(self):
+        """갱신 시각마다 미리 받아 두는 백그라운드 스레드를 시작합니다. (tick에서 갱신 지연을 겪지 않도록)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="fear-greed", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            reading = self.reading
+            if reading is not None:
+                time.sleep(max(reading.next_update - self.clock(), 1))
+            # current()와 같은 진행 중 표시를 써서 갱신 시각마다 한 번만 조회 (조회 중에는 잠금을 잡지 않음)
+            with self._lock:
+                busy = self._refreshing
+                self._refreshing = True
+            if not busy:
+                self._refresh_in_background()
+            if self.reading is None:
+                time.sleep(RETRY_SECONDS)
+
+    def history(self, max_age=HISTORY_MAX_AGE):
+        """
+        전체 일별 이력 (limit=0). 저장된 이력이 max_age보다 오래되었을 때만 다시 받아옵니다.
+
+        Returns:
+            list: (지수 기준일 epoch 초, 값) 튜플 리스트 (오래된 날부터)
+        """
+        stored = None
+        if self.history_path and os.path.exists(self.history_path):
+            try:
+                with open(self.history_path, encoding='utf-8') as f:
+                    stored = json.load(f)
+            except (OSError, ValueError) as e:
+                log.warning("❗ 공포 탐욕 지수 이력 로드 실패: %s", e)
+        if stored is None or self.clock() - stored['fetched_at'] > max_age:
+            try:
+                data = self.fetch(0)
+                stored = {'fetched_at': self.clock(),
+                          'data': sorted((int(item['timestamp']), int(item['value'])) for item in data)}
+                if self.history_path:
+                    tmp_path = self.history_path + ".tmp"
+                    with open(tmp_path, 'w', encoding='utf-8') as f:
+                        json.dump(stored, f)
+                    os.replace(tmp_path, self.history_path)
+            except Exception as e:
+                if stored is None:
+                    raise
+                log.warning("❗ 공포 탐욕 지수 이력 조회 실패 (저장된 이력 사용): %s", e)
+        return [tuple(item) for item in stored['data']]
+
+
+def align(index, history):
+    """
+    봉 인덱스(KST)마다 그 시점에 공개되어 있던 공포 탐욕 지수를 배열로 만듭니다.
+    backtest.run_backtest()/param_sweep.run_sweep()의 fear_greed 인자(봉별 배열)로 쓸 수 있습니다.
+
+    Args:
+        index (pd.DatetimeIndex): candle_date_time_kst 인덱스 (시간대 없는 KST)
+        history (list): FearGreedIndex.history() 결과
+
+    Returns:
+        np.ndarray: 봉별 지수 (이력 이전 구간은 NaN)
+    """
+    days = np.array([t for t, _ in history], dtype=np.int64)
+    values = np.array([v for _, v in history], dtype=np.float64)
+    seconds = np.asarray(index, dtype='datetime64[s]').astype(np.int64) - 9 * 3600     # KST -> UTC epoch 초
+    pos = np.searchsorted(days, seconds, side='right') - 1
+    return np.where(pos >= 0, values[np.maximum(pos, 0)], np.nan)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """프로세스 전체에서 공유하는 FearGreedIndex"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = FearGreedIndex()
+    return _index
+
+
+if __name__ == "__main__":
+    import tempfile
+    import pandas as pd
+    import exchange_simulator
+
+    # 10초 틱으로 이틀(17,280번) 동안 실제 조회 횟수와 틱당 지연
+    server = exchange_simulator.start_background(exchange_simulator.build_exchange(["KRW-BTC"]), port=8793, latency=0.2)
+    http_transport.SIMULATOR_URL = server.url
+    workdir = tempfile.mkdtemp()
+    clock = [time.time()]
+    index = FearGreedIndex(os.path.join(workdir, "fng.json"), os.path.join(workdir, "fng_history.json"),
+                           clock=lambda: clock[0])
+    start = time.perf_counter()
+    ticks = 2 * 86400 // 10
+    for _ in range(ticks):
+        index.value()
+        clock[0] += 10
+    elapsed = time.perf_counter() - start
+    time.sleep(0.5)
+    print(f"⏱️ 틱 {ticks}번: 조회 {index.fetches}회, 틱당 {elapsed / ticks * 1000:.3f} ms (요청당 지연 200 ms)")
+    print(f"📌 현재 값: {index.current()}")
+
+    history = index.history()
+    candles = pd.date_range(end=pd.Timestamp.now().floor("h"), periods=48, freq="h")
+    print(f"📚 이력 {len(history)}일, 봉별 정렬 예: {align(candles, history)[[0, 23, 24, 47]]}")
+    server.shutdown()
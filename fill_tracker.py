@@ -0,0 +1,229 @@
+import time
+import heapq
+import sqlite3
+import logging
+import threading
+from collections import namedtuple
+import metrics
+
+log = logging.getLogger(__name__)
+
+# 주문 조회 간격 (초): 첫 조회는 POLL_INITIAL 뒤, 체결이 끝나지 않았으면 POLL_BACKOFF배씩 늘려 POLL_MAX까지
+POLL_INITIAL = 0.2
+POLL_BACKOFF = 2
+POLL_MAX = 10
+# 이 시간(초)이 지나도 끝나지 않은 주문은 추적을 포기 (지정가 주문을 오래 걸어 둘 때는 늘릴 것)
+FILL_TIMEOUT = 24 * 60 * 60
+
+# 더 이상 체결이 일어나지 않는 주문 상태 (시장가 매수는 남은 금액이 취소되어 'cancel'로 끝나기도 함)
+TERMINAL_STATES = ('done', 'cancel')
+
+# 실제 체결 결과
+# price: 체결 내역(trades) 기준 평균 체결가, volume: 체결 수량, funds: 체결 금액, fee: 실제 낸 수수료
+Fill = namedtuple('Fill', ['uuid', 'market', 'side', 'state', 'price', 'volume', 'funds', 'fee'])
+
+
+def parse_fill(order):
+    """
+    get_order() 응답에서 실제 체결 결과를 계산합니다.
+
+    Args:
+        order (dict): 빗썸 /v1/order 응답 (trades 포함)
+
+    Returns:
+        Fill: 체결이 없으면 volume 0
+    """
+    trades = order.get('trades') or []
+    if trades:
+        volume = sum(float(t['volume']) for t in trades)
+        funds = sum(float(t['funds']) for t in trades)
+    else:
+        volume = float(order.get('executed_volume') or 0)
+        funds = volume * float(order.get('price') or 0)
+    price = funds / volume if volume else 0.0
+    return Fill(order.get('uuid'), order.get('market'), order.get('side'), order.get('state'),
+                price, volume, funds, float(order.get('paid_fee') or 0))
+
+
+class _Pending:
+    __slots__ = ('uuid', 'symbol', 'on_fill', 'interval', 'started', 'deadline', 'done', 'fill')
+
+    def __init__(self, uuid, symbol, on_fill, interval, started, deadline):
+        self.uuid = uuid
+        self.symbol = symbol
+        self.on_fill = on_fill
+        self.interval = interval
+        self.started = started
+        self.deadline = deadline
+        self.done = threading.Event()
+        self.fill = None
+
+
+class FillTracker:
+    """
+    주문 ID를 끝날 때까지 따라가며 실제 체결가/수량/수수료를 원장에 반영하는 추적기.
+
+    주문 응답은 접수 확인일 뿐이므로 주문 직후에는 track()만 부르고,
+    백그라운드 스레드가 get_order()를 점점 긴 간격으로 조회하다가 주문이 끝나면
+    - 체결 내역 기준 평균가/수량/실제 수수료로 ledger.record_buy()/record_sell() (order_uuid로 중복 반영 방지)
+    - balances.invalidate()
+    - on_fill(fill, realized) 콜백 (realized: 매수는 갱신된 Position, 매도는 record_sell() 결과, 원장 없으면 None)
+    을 차례로 실행합니다.
+    """
+
+    def __init__(self, bithumb, ledger=None, balances=None, on_fill=None, poll_initial=POLL_INITIAL,
+                 poll_backoff=POLL_BACKOFF, poll_max=POLL_MAX, timeout=FILL_TIMEOUT, clock=time.monotonic):
+        self.bithumb = bithumb
+        self.ledger = ledger
+        self.balances = balances
+        self.on_fill = on_fill
+        self.poll_initial = poll_initial
+        self.poll_backoff = poll_backoff
+        self.poll_max = poll_max
+        self.timeout = timeout
+        self.clock = clock
+        self.polls = 0
+        self._pending = {}      # uuid -> _Pending
+        self._schedule = []     # (다음 조회 시각, uuid) 힙
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def track(self, order, symbol=None, on_fill=None):
+        """
+        주문 응답을 추적 대상에 올립니다. (바로 반환)
+
+        Args:
+            order (dict): buy_market_order()/sell_market_order() 등의 응답 (uuid 필요)
+            symbol (str): 원장에 기록할 심볼 (기본: 주문의 market)
+            on_fill (callable): 이 주문에만 쓸 콜백 (기본: 생성자의 on_fill)
+
+        Returns:
+            str: 주문 uuid
+        """
+        uuid = order.get('uuid') if isinstance(order, dict) else None
+        if not uuid:
+            raise ValueError(f"주문 uuid가 없습니다: {order}")
+        complete = order.get('state') in TERMINAL_STATES and 'trades' in order
+        with self._cond:
+            if uuid in self._pending:
+                return uuid
+            now = self.clock()
+            entry = self._pending[uuid] = _Pending(uuid, symbol or order.get('market'), on_fill or self.on_fill,
+                                                   self.poll_initial, now, now + self.timeout)
+            if not complete:
+                heapq.heappush(self._schedule, (now + self.poll_initial, uuid))
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="fill-tracker", daemon=True)
+                    self._thread.start()
+                self._cond.notify()
+        if complete:
+            # 응답에 이미 끝난 체결 내역이 있으면 조회 없이 바로 반영
+            self._complete(entry, order)
+        return uuid
+
+    def wait(self, uuid, timeout=None):
+        """
+        주문이 끝날 때까지 기다립니다.
+
+        Returns:
+            Fill: 체결 결과 (추적 중이 아니거나 시간 초과면 None)
+        """
+        entry = self._pending.get(uuid)
+        if entry is None or not entry.done.wait(timeout):
+            return None
+        return entry.fill
+
+    def pending(self):
+        """아직 끝나지 않은 주문 수"""
+        return sum(1 for entry in list(self._pending.values()) if not entry.done.is_set())
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._schedule or self._schedule[0][0] > self.clock():
+                    self._cond.wait(self._schedule[0][0] - self.clock() if self._schedule else None)
+                _, uuid = heapq.heappop(self._schedule)
+                entry = self._pending[uuid]
+            self._poll(entry)
+
+    def _poll(self, entry):
+        self.polls += 1
+        try:
+            with metrics.span("fill_poll"):
+                order = self.bithumb.get_order(entry.uuid)
+        except Exception as e:
+            metrics.inc("errors_total", source="fill_tracker")
+            log.warning("❗ 주문 %s 조회 실패: %s", entry.uuid, e)
+            order = None
+        if order and order.get('state') in TERMINAL_STATES:
+            self._complete(entry, order)
+            return
+        now = self.clock()
+        if now >= entry.deadline:
+            log.warning("❗ 주문 %s 체결 추적 시간 초과 (%s초) - 추적 중단", entry.uuid, self.timeout)
+            metrics.inc("fills_total", side="unknown", state="timeout")
+            self._finish(entry)
+            return
+        entry.interval = min(entry.interval * self.poll_backoff, self.poll_max)
+        with self._cond:
+            heapq.heappush(self._schedule, (now + entry.interval, entry.uuid))
+
+    def _complete(self, entry, order):
+        fill = parse_fill(order)
+        entry.fill = fill
+        realized = None
+        try:
+            if self.ledger is not None and fill.volume > 0:
+                if fill.side == 'bid':
+                    realized = self.ledger.record_buy(entry.symbol, fill.price, fill.volume, fill.fee, order_uuid=fill.uuid)
+                else:
+                    realized = self.ledger.record_sell(entry.symbol, fill.price, fill.volume, fill.fee, order_uuid=fill.uuid)
+        except sqlite3.IntegrityError:
+            log.info("ℹ️ 주문 %s는 이미 원장에 기록되어 있습니다.", fill.uuid)
+        if self.balances is not None:
+            self.balances.invalidate()
+        metrics.inc("fills_total", side=fill.side, state=fill.state)
+        metrics.observe("fill_latency_seconds", self.clock() - entry.started)
+        if entry.on_fill is not None:
+            try:
+                entry.on_fill(fill, realized)
+            except Exception as e:
+                log.error("❗ 체결 콜백 오류: %s", e, exc_info=True)
+        self._finish(entry)
+
+    def _finish(self, entry):
+        entry.done.set()
+        with self._cond:
+            # 끝난 주문은 wait()가 결과를 읽을 수 있도록 잠시 남겨 두고, 오래된 것부터 정리
+            finished = [uuid for uuid, e in self._pending.items() if e.done.is_set()]
+            for uuid in finished[:-100]:
+                del self._pending[uuid]
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import http_transport
+    import python_bithumb
+    import exchange_simulator
+    from trade_ledger import TradeLedger
+
+    # 시뮬레이터에 시장가 매수/매도 후 예상가가 아닌 실제 체결가로 원장 기록
+    server = exchange_simulator.start_background(exchange_simulator.build_exchange(["KRW-BTC"], krw=10**9),
+                                                 port=8795, latency=0.02)
+    http_transport.SIMULATOR_URL = server.url
+    http_transport.patch_python_bithumb()
+    bithumb = python_bithumb.Bithumb("demo-access", "demo-secret-key-0123456789abcdef")
+    ledger = TradeLedger(os.path.join(tempfile.mkdtemp(), "ledger.db"))
+    tracker = FillTracker(bithumb, ledger, on_fill=lambda fill, realized: print(f"✅ 체결: {fill}"))
+
+    start = time.perf_counter()
+    buy = tracker.track(bithumb.buy_market_order("KRW-BTC", 1_000_000))
+    fill = tracker.wait(buy, timeout=5)
+    print(f"⏱️ 매수 체결 확인 {(time.perf_counter() - start) * 1000:.0f} ms, 조회 {tracker.polls}회")
+    tracker.track(bithumb.sell_market_order("KRW-BTC", fill.volume))
+    tracker.wait(tracker.track(bithumb.buy_market_order("KRW-BTC", 10_000)), timeout=5)
+    time.sleep(0.5)
+    server.shutdown()
+    position = ledger.position("KRW-BTC")
+    print(f"📒 원장: 수량 {position.amount:.8f} BTC, 실현 손익 {position.realized_pnl:.2f} KRW, 매수 수수료 {position.buy_fee:.2f} KRW")
@@ -0,0 +1,194 @@
+import os
+import threading
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import metrics
+import rate_limiter
+
+try:
+    import httpx
+    import h2  # noqa: F401  (httpx의 HTTP/2 지원에 필요)
+except ImportError:
+    httpx = None
+
+# 호스트별 keep-alive 커넥션 풀 크기
+HOST_POOL_SIZES = {
+    'api.bithumb.com': 20,
+    'api.alternative.me': 2,
+    'api.openai.com': 4,
+}
+DEFAULT_POOL_SIZE = 10
+
+# 기본 타임아웃 (연결, 읽기) 초
+DEFAULT_TIMEOUT = (3.05, 10)
+
+# 재시도: 멱등 요청(GET/DELETE)만 지수 백오프로 재시도 (주문 POST는 중복 체결 위험으로 재시도 안 함)
+# 서명된(Authorization 헤더가 있는) 요청은 같은 JWT(같은 nonce)를 다시 보내면 거절되므로 연결 실패만 재시도하고,
+# 429/5xx 재시도는 rate_limiter와 호출하는 쪽(잔고 스냅샷, 체결 추적기의 다음 조회 등)에 맡김
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.3
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# USE_HTTP2=1 이고 httpx[http2]가 설치되어 있으면 HTTP/2 사용
+USE_HTTP2 = os.getenv("USE_HTTP2", "0") == "1" and httpx is not None
+
+# 설정하면 HOST_POOL_SIZES의 호스트로 가는 요청을 로컬 거래소 시뮬레이터로 보냄 (exchange_simulator.py)
+SIMULATOR_URL = os.getenv("SIMULATOR_URL")
+
+_lock = threading.Lock()
+_sessions = {}
+_http2_client = None
+
+
+def _retry(signed=False):
+    if signed:
+        # 요청이 서버에 닿지 않은 연결 실패만 재시도
+        return Retry(total=RETRY_TOTAL, connect=RETRY_TOTAL, read=0, status=0, other=0,
+                     backoff_factor=RETRY_BACKOFF, raise_on_status=False)
+    return Retry(
+        total=RETRY_TOTAL,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=frozenset({'GET', 'DELETE'}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+def get_session(signed=False):
+    """
+    프로세스 전체에서 공유하는 requests.Session을 반환합니다.
+    호스트별 커넥션 풀을 재사용하므로 매 요청마다 TCP/TLS 연결을 새로 맺지 않습니다.
+
+    Args:
+        signed (bool): True면 서명된 요청용 세션 (429/5xx 응답을 어댑터에서 재시도하지 않음)
+    """
+    session = _sessions.get(signed)
+    if session is None:
+        with _lock:
+            session = _sessions.get(signed)
+            if session is None:
+                session = requests.Session()
+                default = HTTPAdapter(pool_connections=len(HOST_POOL_SIZES) + 1,
+                                      pool_maxsize=DEFAULT_POOL_SIZE, max_retries=_retry(signed))
+                session.mount("https://", default)
+                session.mount("http://", default)
+                for host, size in HOST_POOL_SIZES.items():
+                    session.mount(f"https://{host}", HTTPAdapter(pool_connections=1, pool_maxsize=size,
+                                                                 max_retries=_retry(signed)))
+                _sessions[signed] = session
+    return session
+
+
+def get_http2_client():
+    """HTTP/2 클라이언트 (httpx[http2] 미설치 시 None)"""
+    global _http2_client
+    if httpx is None:
+        return None
+    if _http2_client is None:
+        with _lock:
+            if _http2_client is None:
+                limits = httpx.Limits(max_connections=sum(HOST_POOL_SIZES.values()),
+                                      max_keepalive_connections=DEFAULT_POOL_SIZE)
+                transport = httpx.HTTPTransport(http2=True, retries=RETRY_TOTAL, limits=limits)
+                _http2_client = httpx.Client(transport=transport, timeout=DEFAULT_TIMEOUT[1])
+    return _http2_client
+
+
+def _target(url):
+    if SIMULATOR_URL:
+        for host in HOST_POOL_SIZES:
+            prefix = f"https://{host}"
+            if url.startswith(prefix):
+                return SIMULATOR_URL.rstrip("/") + url[len(prefix):]
+    return url
+
+
+def request(method, url, **kwargs):
+    """
+    공유 커넥션 풀로 요청을 보냅니다. timeout을 주지 않으면 DEFAULT_TIMEOUT을 사용합니다.
+    (메트릭이 켜져 있으면 호스트/메서드별 http_request span으로 기록)
+    빗썸 요청은 rate_limiter로 종류별(시세/계좌/주문) 요청 한도를 지키며, 한도가 빠듯하면 주문이 먼저 나갑니다.
+    """
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    endpoint_class = rate_limiter.classify(method, url) if rate_limiter.RATE_LIMIT_ENABLED else None
+    account = rate_limiter.current_account()
+    if endpoint_class:
+        rate_limiter.get_limiter().acquire(endpoint_class, account=account)
+    with metrics.span("http_request", host=urlsplit(url).hostname, method=method):
+        url = _target(url)
+        if USE_HTTP2:
+            response = _Http2Shim().request(method, url, **kwargs)
+        else:
+            signed = 'Authorization' in (kwargs.get('headers') or {})
+            response = get_session(signed).request(method, url, **kwargs)
+    if endpoint_class and response.status_code == 429:
+        retry_after = response.headers.get('Retry-After', '')
+        seconds = float(retry_after) if retry_after.replace('.', '', 1).isdigit() else rate_limiter.DEFAULT_PENALTY
+        rate_limiter.get_limiter().penalize(endpoint_class, seconds, account=account)
+    return response
+
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request('POST', url, **kwargs)
+
+
+def delete(url, **kwargs):
+    return request('DELETE', url, **kwargs)
+
+
+class _Http2Shim:
+    """requests 스타일 호출을 httpx HTTP/2 클라이언트로 전달합니다."""
+
+    def request(self, method, url, params=None, data=None, headers=None, timeout=None, **kwargs):
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        content = None
+        if isinstance(data, (str, bytes)):
+            content, data = data, None
+        return get_http2_client().request(method, url, params=params, data=data, content=content,
+                                          headers=headers, timeout=timeout, **kwargs)
+
+
+class _RequestsModuleShim:
+    """python_bithumb 내부의 requests.get/request/delete 호출을 공유 풀로 돌리는 대체 모듈 객체"""
+
+    def __getattr__(self, name):
+        # 예외 클래스 등 나머지 속성은 원래 requests 모듈의 것을 그대로 사용
+        return getattr(requests, name)
+
+    request = staticmethod(request)
+    get = staticmethod(get)
+    post = staticmethod(post)
+    delete = staticmethod(delete)
+
+
+def patch_python_bithumb():
+    """
+    python_bithumb의 공개/비공개 API가 모듈 수준 requests 대신 공유 커넥션 풀을 쓰도록 연결합니다.
+    (라이브러리는 호출마다 requests.get()으로 새 연결을 맺음)
+    """
+    import python_bithumb.public_api
+    import python_bithumb.private_api
+    shim = _RequestsModuleShim()
+    python_bithumb.public_api.requests = shim
+    python_bithumb.private_api.requests = shim
+
+
+if __name__ == "__main__":
+    import time
+
+    # 매번 새 연결 vs 공유 풀 비교
+    url = "https://api.bithumb.com/v1/ticker?markets=KRW-BTC"
+    for name, fn in [("requests.get", lambda: requests.get(url, timeout=DEFAULT_TIMEOUT)), ("http_transport.get", lambda: get(url))]:
+        fn()
+        start = time.perf_counter()
+        for _ in range(10):
+            fn()
+        print(f"⏱️ {name}: 요청당 {(time.perf_counter() - start) / 10 * 1000:.1f} ms")
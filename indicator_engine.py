@@ -0,0 +1,332 @@
+import math
+from collections import deque
+
+# ta 기반 get_technical_indicators()와 동일한 지표 이름
+INDICATOR_COLUMNS = ['MA5', 'MA20', 'RSI', 'MACD', 'MACD_Signal', 'Upper_BB', 'Lower_BB']
+
+# ta 결과와 비교할 때 사용하는 허용 오차 (상대 오차)
+TOLERANCE = 1e-9
+
+# 누적 합계의 부동소수점 오차를 없애기 위해 확정 봉 N개마다 윈도우를 다시 합산
+RESYNC_EVERY = 1000
+
+NAN = float('nan')
+
+
+class _Ema:
+    """
+    pandas ewm(adjust=False, min_periods=n)과 같은 방식으로 동작하는 EMA 상태.
+    확정된 값(value, count)만 보관하고, 진행 중인 봉은 peek()로 계산만 합니다.
+    """
+    __slots__ = ('alpha', 'min_periods', 'value', 'count')
+
+    def __init__(self, alpha, min_periods):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = NAN
+        self.count = 0
+
+    def peek(self, x):
+        if self.count == 0:
+            return x
+        return self.value + self.alpha * (x - self.value)
+
+    def commit(self, x):
+        self.value = self.peek(x)
+        self.count += 1
+
+    def ready(self):
+        # 진행 중인 봉까지 포함했을 때 min_periods를 만족하는지 여부
+        return self.count + 1 >= self.min_periods
+
+
+class _RollingWindow:
+    """
+    이동평균/볼린저 밴드용 롤링 합계 상태.
+    기준값(anchor)을 뺀 값으로 합과 제곱합을 유지해 큰 가격대(KRW)에서도 분산이 정확합니다.
+    """
+    __slots__ = ('window', 'values', 'anchor', 'sum', 'sumsq', 'commits')
+
+    def __init__(self, window):
+        self.window = window
+        # 진행 중인 봉 1개를 더해 window가 되도록 확정 봉은 window - 1개만 보관
+        self.values = deque(maxlen=window - 1)
+        self.anchor = None
+        self.sum = 0.0
+        self.sumsq = 0.0
+        self.commits = 0
+
+    def commit(self, x):
+        if self.anchor is None:
+            self.anchor = x
+        if self.values.maxlen == 0:
+            return
+        if len(self.values) == self.values.maxlen:
+            old = self.values[0] - self.anchor
+            self.sum -= old
+            self.sumsq -= old * old
+        self.values.append(x)
+        d = x - self.anchor
+        self.sum += d
+        self.sumsq += d * d
+        self.commits += 1
+        if self.commits % RESYNC_EVERY == 0:
+            self._resync()
+
+    def _resync(self):
+        # 기준값을 최근 가격으로 옮기고 합계를 새로 계산 (O(window), 드물게 실행)
+        self.anchor = self.values[-1]
+        self.sum = 0.0
+        self.sumsq = 0.0
+        for v in self.values:
+            d = v - self.anchor
+            self.sum += d
+            self.sumsq += d * d
+
+    def ready(self):
+        return len(self.values) + 1 >= self.window
+
+    def mean(self, x):
+        if not self.ready():
+            return NAN
+        anchor = x if self.anchor is None else self.anchor
+        return anchor + (self.sum + x - anchor) / self.window
+
+    def std(self, x):
+        # ta BollingerBands와 동일하게 모집단 표준편차(ddof=0)
+        if not self.ready():
+            return NAN
+        anchor = x if self.anchor is None else self.anchor
+        d = x - anchor
+        n = self.window
+        m = (self.sum + d) / n
+        var = (self.sumsq + d * d) / n - m * m
+        return math.sqrt(var) if var > 0 else 0.0
+
+
+class IncrementalIndicators:
+    """
+    get_technical_indicators()의 지표(MA5, MA20, RSI, MACD, MACD_Signal, Upper_BB, Lower_BB)를
+    봉 하나가 추가/수정될 때마다 O(1)로 갱신하는 증분 지표 엔진.
+
+    확정된 봉까지의 상태만 저장하고 마지막(진행 중인) 봉은 별도로 들고 있으므로,
+    같은 봉의 종가가 바뀌어도 revise()로 상태를 되돌리는 비용 없이 다시 계산할 수 있습니다.
+    같은 종가 시퀀스를 처음부터 넣으면 ta 라이브러리 결과와 TOLERANCE 이내로 일치합니다.
+    """
+
+    def __init__(self, ma_fast=5, ma_slow=20, rsi_window=14,
+                 macd_fast=12, macd_slow=26, macd_sign=9,
+                 bb_window=20, bb_dev=2, history=5):
+        self.ma_fast = _RollingWindow(ma_fast)
+        self.ma_slow = _RollingWindow(ma_slow)
+        self.bb = self.ma_slow if bb_window == ma_slow else _RollingWindow(bb_window)
+        self.bb_dev = bb_dev
+
+        self.rsi_window = rsi_window
+        self.rsi_up = _Ema(1 / rsi_window, rsi_window)
+        self.rsi_down = _Ema(1 / rsi_window, rsi_window)
+
+        self.ema_fast = _Ema(2 / (macd_fast + 1), macd_fast)
+        self.ema_slow = _Ema(2 / (macd_slow + 1), macd_slow)
+        self.macd_signal = _Ema(2 / (macd_sign + 1), macd_sign)
+
+        self.prev_close = None   # 마지막 확정 봉의 종가
+        self.last_close = None   # 진행 중인 봉의 종가
+        self.last_index = None   # 진행 중인 봉의 인덱스 (sync()에서 사용)
+        self.latest = dict.fromkeys(INDICATOR_COLUMNS, NAN)
+        # AI 프롬프트(df.tail())에 쓰이는 최근 지표 행 (index, values)
+        self.recent = deque(maxlen=history)
+
+    def _commit(self, x):
+        """진행 중이던 봉을 확정 상태로 반영합니다."""
+        windows = [self.ma_fast, self.ma_slow]
+        if self.bb is not self.ma_slow:
+            windows.append(self.bb)
+        for w in windows:
+            w.commit(x)
+
+        up, down = self._rsi_moves(x)
+        self.rsi_up.commit(up)
+        self.rsi_down.commit(down)
+
+        if self.ema_slow.ready():
+            self.macd_signal.commit(self.ema_fast.peek(x) - self.ema_slow.peek(x))
+        self.ema_fast.commit(x)
+        self.ema_slow.commit(x)
+        self.prev_close = x
+
+    def _rsi_moves(self, x):
+        # ta는 첫 diff(NaN)를 0으로 채워 EMA 시드로 사용
+        if self.prev_close is None:
+            return 0.0, 0.0
+        d = x - self.prev_close
+        return (d if d > 0 else 0.0), (-d if d < 0 else 0.0)
+
+    def _compute(self, x):
+        """확정 상태 + 진행 중인 봉 종가 x로 지표 값을 계산합니다. (상태 변경 없음)"""
+        values = self.latest
+        values['MA5'] = self.ma_fast.mean(x)
+        values['MA20'] = self.ma_slow.mean(x)
+
+        if self.rsi_up.ready():
+            up, down = self._rsi_moves(x)
+            avg_up = self.rsi_up.peek(up)
+            avg_down = self.rsi_down.peek(down)
+            values['RSI'] = 100.0 if avg_down == 0 else 100.0 - 100.0 / (1.0 + avg_up / avg_down)
+        else:
+            values['RSI'] = NAN
+
+        if self.ema_slow.ready():
+            macd = self.ema_fast.peek(x) - self.ema_slow.peek(x)
+            values['MACD'] = macd
+            values['MACD_Signal'] = self.macd_signal.peek(macd) if self.macd_signal.ready() else NAN
+        else:
+            values['MACD'] = NAN
+            values['MACD_Signal'] = NAN
+
+        mid = self.bb.mean(x)
+        std = self.bb.std(x)
+        values['Upper_BB'] = mid + self.bb_dev * std
+        values['Lower_BB'] = mid - self.bb_dev * std
+        return values
+
+    def update(self, close, index=None):
+        """
+        새 봉을 추가합니다. 직전 봉은 마지막으로 받은 종가로 확정됩니다.
+
+        Args:
+            close (float): 새 봉의 (현재) 종가
+            index: 봉 식별자 (예: 봉 시작 시각), 선택
+
+        Returns:
+            dict: 최신 지표 값 (워밍업 구간은 NaN)
+        """
+        if self.last_close is not None:
+            self._commit(self.last_close)
+        self.last_close = float(close)
+        self.last_index = index
+        values = self._compute(self.last_close)
+        self.recent.append((index, dict(values)))
+        return values
+
+    def revise(self, close):
+        """
+        진행 중인 봉의 종가를 수정합니다. (같은 봉에 대한 틱 갱신)
+
+        Returns:
+            dict: 최신 지표 값
+        """
+        if self.last_close is None:
+            return self.update(close)
+        self.last_close = float(close)
+        values = self._compute(self.last_close)
+        self.recent[-1] = (self.last_index, dict(values))
+        return values
+
+    def sync(self, df):
+        """
+        get_ohlcv() 결과 DataFrame과 엔진 상태를 맞춥니다.
+        이미 본 봉은 건너뛰고, 마지막으로 본 봉은 종가를 보정한 뒤 새 봉만 추가합니다.
+
+        Args:
+            df (pandas.DataFrame): 시간순으로 정렬되고 'close' 컬럼이 있는 OHLCV 데이터
+
+        Returns:
+            dict: 최신 지표 값
+        """
+        closes = df['close'].to_numpy()
+        index = df.index
+        start = 0
+        if self.last_index is not None:
+            pos = index.searchsorted(self.last_index)
+            if pos < len(index) and index[pos] == self.last_index:
+                self.revise(closes[pos])
+                start = pos + 1
+            else:
+                # 마지막으로 본 봉이 응답 범위 밖이면 새 봉만 이어 붙임
+                start = pos
+        for i in range(start, len(closes)):
+            self.update(closes[i], index[i])
+        return self.latest
+
+    def annotate(self, df, rows=None):
+        """
+        df의 마지막 행들에 엔진이 보관 중인 최근 지표 값을 붙인 복사본을 반환합니다.
+        should_buy()/should_sell()/get_ai_decision()에 그대로 넘길 수 있습니다.
+
+        Args:
+            df (pandas.DataFrame): sync()에 사용한 OHLCV 데이터
+            rows (int): 반환할 행 수 (기본값: 보관 중인 지표 행 수)
+        """
+        rows = min(rows or len(self.recent), len(self.recent), len(df))
+        tail = df.tail(rows).copy()
+        recent = list(self.recent)[-rows:]
+        for col in INDICATOR_COLUMNS:
+            tail[col] = [values[col] for _, values in recent]
+        return tail
+
+
+def verify_against_ta(df, engine=None, rtol=TOLERANCE):
+    """
+    증분 엔진 결과가 ta 기반 계산과 허용 오차 안에서 일치하는지 확인합니다.
+
+    Returns:
+        dict: 지표별 최대 상대 오차
+    """
+    import numpy as np
+    import ta
+
+    engine = engine or IncrementalIndicators(history=len(df))
+    expected = {
+        'MA5': ta.trend.sma_indicator(df['close'], window=5),
+        'MA20': ta.trend.sma_indicator(df['close'], window=20),
+        'RSI': ta.momentum.rsi(df['close'], window=14),
+    }
+    macd = ta.trend.MACD(df['close'], window_slow=26, window_fast=12, window_sign=9)
+    expected['MACD'] = macd.macd()
+    expected['MACD_Signal'] = macd.macd_signal()
+    bollinger = ta.volatility.BollingerBands(df['close'], window=20, window_dev=2)
+    expected['Upper_BB'] = bollinger.bollinger_hband()
+    expected['Lower_BB'] = bollinger.bollinger_lband()
+
+    actual = {col: [] for col in INDICATOR_COLUMNS}
+    for close in df['close'].to_numpy():
+        values = engine.update(close)
+        for col in INDICATOR_COLUMNS:
+            actual[col].append(values[col])
+
+    errors = {}
+    for col in INDICATOR_COLUMNS:
+        a = np.asarray(actual[col], dtype=float)
+        e = expected[col].to_numpy(dtype=float)
+        if not np.array_equal(np.isnan(a), np.isnan(e)):
+            raise AssertionError(f"{col}: 워밍업(NaN) 구간이 ta 결과와 다릅니다.")
+        mask = ~np.isnan(e)
+        scale = np.maximum(np.abs(e[mask]), np.abs(df['close'].to_numpy()[mask]) * 1e-6)
+        err = float(np.max(np.abs(a[mask] - e[mask]) / scale)) if mask.any() else 0.0
+        if err > rtol:
+            raise AssertionError(f"{col}: 상대 오차 {err:.3e} > {rtol:.0e}")
+        errors[col] = err
+    return errors
+
+
+if __name__ == "__main__":
+    import time
+    import numpy as np
+    import pandas as pd
+
+    # 랜덤워크 가격으로 ta 결과와 비교 및 갱신 속도 측정
+    rng = np.random.default_rng(0)
+    closes = 100_000_000 * np.exp(np.cumsum(rng.normal(0, 0.01, 5000)))
+    df = pd.DataFrame({'close': closes}, index=pd.date_range("2024-01-01", periods=len(closes), freq="h"))
+
+    for col, err in verify_against_ta(df).items():
+        print(f"✅ {col}: 최대 상대 오차 {err:.2e}")
+
+    engine = IncrementalIndicators()
+    engine.sync(df)
+    start = time.perf_counter()
+    for close in closes[-1000:]:
+        engine.revise(close)
+    elapsed = (time.perf_counter() - start) / 1000
+    print(f"⏱️ 틱당 갱신 시간: {elapsed * 1e6:.1f} µs")
@@ -0,0 +1,293 @@
+import os
+import json
+import time
+import logging
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+log = logging.getLogger(__name__)
+
+# METRICS_ENABLED=1일 때만 기록 (꺼져 있으면 span/inc/observe는 플래그 확인 한 번으로 끝남)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0") == "1"
+# 설정하면 /metrics(Prometheus 텍스트), /metrics.json을 이 포트로 노출
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+# 설정하면 METRICS_DUMP_SECONDS마다 JSON 스냅샷을 이 파일에 저장
+METRICS_DUMP_PATH = os.getenv("METRICS_DUMP_PATH")
+METRICS_DUMP_SECONDS = 60
+
+# 메트릭 이름 접두사
+PREFIX = "bitcoin_bot_"
+# 지연 히스토그램 버킷 (초)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_enabled = METRICS_ENABLED
+_lock = threading.Lock()
+_counters = {}      # (이름, 라벨 튜플) -> 값
+_histograms = {}    # (이름, 라벨 튜플) -> [버킷별 개수 리스트, 합계, 개수]
+
+
+def enabled():
+    return _enabled
+
+
+def enable(flag=True):
+    """코드에서 기록을 켜거나 끕니다. (기본값은 METRICS_ENABLED 환경 변수)"""
+    global _enabled
+    _enabled = flag
+
+
+def reset():
+    """기록된 값을 모두 지웁니다."""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items())) if labels else ()
+
+
+def inc(name, value=1, **labels):
+    """
+    카운터를 증가시킵니다.
+
+    Args:
+        name (str): 메트릭 이름 (접두사 제외, 예: 'orders_total')
+        value (float): 증가량
+        **labels: 라벨 (예: side='buy')
+    """
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, value, **labels):
+    """히스토그램에 값 하나(초 단위 지연 등)를 기록합니다."""
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    i = bisect_left(LATENCY_BUCKETS, value)
+    with _lock:
+        entry = _histograms.get(key)
+        if entry is None:
+            entry = _histograms[key] = [[0] * (len(LATENCY_BUCKETS) + 1), 0.0, 0]
+        entry[0][i] += 1
+        entry[1] += value
+        entry[2] += 1
+
+
+class _Span:
+    __slots__ = ('name', 'labels', 'start')
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe("span_duration_seconds", time.perf_counter() - self.start, span=self.name, **self.labels)
+        if exc_type is not None:
+            inc("span_errors_total", span=self.name, error=exc_type.__name__, **self.labels)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name, **labels):
+    """
+    with 블록의 소요 시간을 span_duration_seconds{span=name} 히스토그램에 기록합니다.
+    블록에서 예외가 나면 span_errors_total도 증가시킵니다. (예외는 그대로 전달)
+    꺼져 있으면 공유 no-op 객체를 반환합니다.
+
+    사용 예:
+        with metrics.span("ai_decision", model="gpt-4o-mini"):
+            response = openai_client.chat.completions.create(...)
+    """
+    if not _enabled:
+        return _NOOP_SPAN
+    return _Span(name, labels)
+
+
+def timed(name, **labels):
+    """함수 호출 전체를 span으로 감싸는 데코레이터"""
+    def decorator(fn):
+        def wrapper(*args, **kwargs):
+            with span(name, **labels):
+                return fn(*args, **kwargs)
+        wrapper.__name__ = fn.__name__
+        wrapper.__doc__ = fn.__doc__
+        return wrapper
+    return decorator
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=None):
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def render_prometheus():
+    """Prometheus 텍스트 노출 형식 문자열"""
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((key, (list(b), s, c)) for key, (b, s, c) in _histograms.items())
+    lines = []
+    typed = set()
+    for (name, labels), value in counters:
+        metric = PREFIX + name
+        if metric not in typed:
+            typed.add(metric)
+            lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric}{_format_labels(labels)} {value}")
+    for (name, labels), (buckets, total, count) in histograms:
+        metric = PREFIX + name
+        if metric not in typed:
+            typed.add(metric)
+            lines.append(f"# TYPE {metric} histogram")
+        cumulative = 0
+        for bound, n in zip(LATENCY_BUCKETS, buckets):
+            cumulative += n
+            lines.append(f"{metric}_bucket{_format_labels(labels, ('le', bound))} {cumulative}")
+        lines.append(f"{metric}_bucket{_format_labels(labels, ('le', '+Inf'))} {count}")
+        lines.append(f"{metric}_sum{_format_labels(labels)} {total}")
+        lines.append(f"{metric}_count{_format_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def _quantile(buckets, count, q):
+    """버킷 경계 기준 근사 분위수 (초)"""
+    target = q * count
+    cumulative = 0
+    for bound, n in zip(LATENCY_BUCKETS, buckets):
+        cumulative += n
+        if cumulative >= target:
+            return bound
+    return None   # 마지막 버킷(+Inf)
+
+
+def snapshot():
+    """
+    JSON으로 저장할 수 있는 현재 값.
+
+    Returns:
+        dict: {'time', 'counters': [{name, labels, value}], 'histograms': [{name, labels, count, sum, p50, p99}]}
+    """
+    with _lock:
+        counters = [{'name': name, 'labels': dict(labels), 'value': value} for (name, labels), value in _counters.items()]
+        histograms = [{'name': name, 'labels': dict(labels), 'count': count, 'sum': total,
+                       'p50': _quantile(buckets, count, 0.5), 'p99': _quantile(buckets, count, 0.99)}
+                      for (name, labels), (buckets, total, count) in _histograms.items()]
+    return {'time': time.time(), 'counters': counters, 'histograms': histograms}
+
+
+def dump_json(path=METRICS_DUMP_PATH):
+    """snapshot()을 파일에 저장합니다. (임시 파일에 쓴 뒤 교체)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot(), f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            body, content_type = render_prometheus().encode(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body, content_type = json.dumps(snapshot(), ensure_ascii=False).encode(), "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _dump_loop(path, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            dump_json(path)
+        except OSError as e:
+            log.error("❗ 메트릭 저장 오류: %s", e)
+
+
+def start_exporter(port=METRICS_PORT, dump_path=METRICS_DUMP_PATH, interval=METRICS_DUMP_SECONDS):
+    """
+    기록이 켜져 있으면 /metrics HTTP 서버와 주기적 JSON 저장을 백그라운드 스레드로 시작합니다.
+    (port가 0이고 dump_path가 없으면 아무것도 하지 않음)
+
+    Returns:
+        ThreadingHTTPServer: HTTP 서버 (시작하지 않았으면 None)
+    """
+    if not _enabled:
+        return None
+    server = None
+    if port:
+        server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        log.info("📈 메트릭 노출: http://localhost:%s/metrics", port)
+    if dump_path:
+        threading.Thread(target=_dump_loop, args=(dump_path, interval), daemon=True).start()
+    return server
+
+
+class MetricsLogHandler(logging.Handler):
+    """logging 레코드 수를 레벨/로거별 log_records_total 카운터로 기록하는 핸들러"""
+
+    def emit(self, record):
+        inc("log_records_total", level=record.levelname, logger=record.name)
+
+
+def install_log_handler(logger=None):
+    """logger(기본: 루트 로거)에 MetricsLogHandler를 붙입니다. (이미 있으면 그대로)"""
+    logger = logger or logging.getLogger()
+    if not any(isinstance(h, MetricsLogHandler) for h in logger.handlers):
+        logger.addHandler(MetricsLogHandler())
+    return logger
+
+
+if __name__ == "__main__":
+    # 꺼져 있을 때와 켜져 있을 때의 span 오버헤드
+    n = 200_000
+    for flag in (False, True):
+        enable(flag)
+        start = time.perf_counter()
+        for _ in range(n):
+            with span("noop", stage="bench"):
+                pass
+        print(f"⏱️ span (enabled={flag}): {(time.perf_counter() - start) / n * 1e9:.0f} ns")
+    inc("orders_total", side="buy", result="ok")
+    try:
+        with span("demo"):
+            raise ValueError("예시 오류")
+    except ValueError:
+        pass
+    print(render_prometheus())
@@ -0,0 +1,167 @@
+import time
+import numpy as np
+import python_bithumb
+from concurrent.futures import ThreadPoolExecutor
+from candle_store import CandleStore, candle_seconds, CANDLE_DIR
+from candle_scheduler import next_boundary, SETTLE_SECONDS
+from indicator_engine import IncrementalIndicators
+from strategy import with_defaults, signals, reasons_at
+
+# /v1/ticker 한 번에 넣을 마켓 수 (쉼표로 묶어 요청)
+TICKER_BATCH = 50
+# 봉 갱신 시 동시에 보낼 최대 요청 수
+CANDLE_WORKERS = 8
+# 지표 엔진을 맞출 때 읽는 봉 수
+WARMUP_ROWS = 100
+
+# strategy.signals()가 받는 지표 키 -> IncrementalIndicators.latest 키
+_SIGNAL_KEYS = {
+    'MA_fast': 'MA5', 'MA_slow': 'MA20', 'RSI': 'RSI', 'MACD': 'MACD',
+    'MACD_Signal': 'MACD_Signal', 'Upper_BB': 'Upper_BB', 'Lower_BB': 'Lower_BB',
+}
+
+
+def krw_markets(limit=None):
+    """빗썸 KRW 마켓 목록 (limit이 있으면 앞에서부터 limit개)"""
+    markets = [m['market'] for m in python_bithumb.get_market_all() if m['market'].startswith("KRW-")]
+    return markets[:limit] if limit else markets
+
+
+def batch_prices(markets, batch=TICKER_BATCH):
+    """
+    여러 마켓의 현재가를 batch개씩 묶어 조회합니다. (마켓 N개 -> 요청 ceil(N/batch)번)
+
+    Returns:
+        dict: 마켓 -> 현재가
+    """
+    prices = {}
+    for start in range(0, len(markets), batch):
+        chunk = markets[start:start + batch]
+        result = python_bithumb.get_current_price(chunk)
+        if isinstance(result, dict):
+            prices.update(result)
+        elif result is not None:
+            # 응답이 한 건이면 python_bithumb은 float만 반환
+            prices[chunk[0]] = result
+    return prices
+
+
+class MultiSymbolEngine:
+    """
+    한 프로세스에서 여러 마켓을 함께 평가하는 엔진.
+
+    - 봉은 실제 봉 경계가 지났을 때만 마켓별로 (동시에) 갱신하고, 그 사이에는
+      묶음 현재가 조회 결과로 진행 중인 봉의 종가만 보정합니다.
+    - 모든 마켓의 최신 지표를 길이 N 배열로 모아 strategy.signals()로 한 번에 평가합니다.
+    """
+
+    def __init__(self, symbols, interval, params=None, candle_workers=CANDLE_WORKERS,
+                 fetch=python_bithumb.get_ohlcv, clock=time.time, root=CANDLE_DIR):
+        self.symbols = list(symbols)
+        self.interval = interval
+        self.params = with_defaults(params)
+        p = self.params
+        self.stores = [CandleStore(symbol, interval, root) for symbol in self.symbols]
+        self.engines = [
+            IncrementalIndicators(ma_fast=p['ma_fast'], ma_slow=p['ma_slow'],
+                                  bb_window=p['bb_window'], bb_dev=p['bb_dev'])
+            for _ in self.symbols
+        ]
+        self.period = candle_seconds(interval)
+        self.candle_workers = candle_workers
+        self.fetch = fetch
+        self.clock = clock
+        self._next_refresh = 0
+        self._stale = set()   # 이번 봉 구간에 아직 갱신하지 못한 마켓 인덱스
+
+    def _refresh_one(self, i):
+        store = self.stores[i]
+        store.refresh(self.fetch)
+        df = store.tail_frame(WARMUP_ROWS)
+        if not df.empty:
+            self.engines[i].sync(df)
+
+    def refresh_candles(self, force=False):
+        """
+        봉 경계가 지났으면 모든 마켓의 봉 저장소와 지표 엔진을 갱신합니다.
+        실패한 마켓만 다음 호출에서 다시 시도합니다.
+
+        Returns:
+            dict: 실패한 마켓 -> 예외 (갱신할 것이 없었으면 빈 dict)
+        """
+        now = self.clock()
+        if force or now >= self._next_refresh:
+            self._stale = set(range(len(self.symbols)))
+            self._next_refresh = next_boundary(now, self.period) + SETTLE_SECONDS
+        if not self._stale:
+            return {}
+        errors = {}
+
+        def run(i):
+            try:
+                self._refresh_one(i)
+            except Exception as e:
+                errors[i] = e
+
+        with ThreadPoolExecutor(max_workers=self.candle_workers) as executor:
+            list(executor.map(run, sorted(self._stale)))
+        self._stale = set(errors)
+        return {self.symbols[i]: e for i, e in errors.items()}
+
+    def apply_prices(self, prices):
+        """묶음 현재가로 각 마켓의 진행 중인 봉 종가를 보정합니다."""
+        for symbol, engine in zip(self.symbols, self.engines):
+            price = prices.get(symbol)
+            if price is not None and engine.last_close is not None:
+                engine.revise(price)
+
+    def snapshot(self):
+        """모든 마켓의 최신 지표를 strategy.signals()가 받는 길이 N 배열 dict로 모읍니다."""
+        n = len(self.engines)
+        nan = float('nan')
+        ind = {'close': np.fromiter((nan if e.last_close is None else e.last_close for e in self.engines),
+                                    dtype=np.float64, count=n)}
+        for key, column in _SIGNAL_KEYS.items():
+            ind[key] = np.fromiter((e.latest[column] for e in self.engines), dtype=np.float64, count=n)
+        return ind
+
+    def evaluate(self, fear_greed):
+        """
+        모든 마켓의 매수/매도 조건을 한 번에 평가합니다.
+
+        Returns:
+            tuple: (buys, sells, ind)
+                buys, sells (list): (마켓 인덱스, 사유 번호 리스트)
+                ind (dict): snapshot() 결과
+        """
+        ind = self.snapshot()
+        buy_mask, sell_mask, buy_conds, sell_conds = signals(ind, fear_greed, self.params)
+        buys = [(i, reasons_at(buy_conds, i)) for i in np.flatnonzero(buy_mask)]
+        sells = [(i, reasons_at(sell_conds, i)) for i in np.flatnonzero(sell_mask)]
+        return buys, sells, ind
+
+
+if __name__ == "__main__":
+    import tempfile
+    import pandas as pd
+
+    # 가상 봉으로 마켓 수별 평가 시간 측정 (네트워크 없음)
+    rng = np.random.default_rng(0)
+
+    def fake_ohlcv(symbol, interval, count=200, **kwargs):
+        close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+        index = pd.date_range(end=pd.Timestamp.now().floor('D'), periods=count, freq='D', name='candle_date_time_kst')
+        return pd.DataFrame({'open': close, 'high': close, 'low': close, 'close': close,
+                             'volume': 1.0, 'value': close}, index=index)
+
+    for n in (10, 100, 300):
+        symbols = [f"KRW-T{i}" for i in range(n)]
+        engine = MultiSymbolEngine(symbols, "day", fetch=fake_ohlcv, root=tempfile.mkdtemp())
+        engine.refresh_candles()
+        prices = {s: float(p) for s, p in zip(symbols, rng.uniform(900, 1100, n))}
+        start = time.perf_counter()
+        for _ in range(100):
+            engine.apply_prices(prices)
+            buys, sells, _ = engine.evaluate(50)
+        elapsed = (time.perf_counter() - start) / 100
+        print(f"⏱️ {n}개 마켓: 틱당 평가 {elapsed * 1000:.2f} ms (매수 {len(buys)}, 매도 {len(sells)})")
@@ -5,27 +5,53 @@
  AI가 "hold" 결정을 3회 이상 연속으로 내릴 경우, 10,000원 상당의 비트코인을 매수한 후 프로그램이 종료되는 로직
  '''
 import os
+import json
+import time
 from dotenv import load_dotenv
 load_dotenv()
 import python_bithumb
-import requests
+import http_transport
+from bithumb_auth import sign_python_bithumb
+from openai import OpenAI
+from candle_scheduler import CandleScheduler
+from decision_cache import DecisionCache, make_key
+from prompt_codec import PromptEncoder
+from async_log import get_logger
+from balance_snapshot import BalanceSnapshot
+from fear_greed import get_index
+
+# python_bithumb 호출도 공유 커넥션 풀 사용
+http_transport.patch_python_bithumb()
+log = get_logger("mvp")
+
+# 반복마다 새로 만들지 않고 프로그램 전체에서 재사용하는 클라이언트
+client = OpenAI()
+bithumb = sign_python_bithumb(python_bithumb.Bithumb(os.getenv("BITHUMB_ACCESS_KEY"), os.getenv("BITHUMB_SECRET_KEY")))
+# KRW/BTC 잔고를 get_balances() 한 번으로 조회
+balances = BalanceSnapshot(bithumb)
+
+# 30일 OHLCV를 df.to_json() 대신 컬럼 지향 고정 소수점 텍스트로 압축 (토큰 예산 이내)
+prompt_encoder = PromptEncoder()
+
+# 공포 탐욕 지수는 하루 한 번 바뀌므로 캐시에서 읽고 원본 갱신 시각이 지났을 때만 다시 조회
+fear_greed_index = get_index()
 
 # 연속 'hold' 결정 카운터 변수 초기화
 consecutive_hold_count = 0
+# 'hold'가 이어지는 동안에는 다음 일봉까지 기다리지 않고 이 간격(초)으로 다시 판단 (기존 10초 주기와 같은 "약 30초 안에 3회" 기준 유지)
+HOLD_RECHECK_SECONDS = 10
 
-def ai_trading():
-    global consecutive_hold_count # 전역 변수 사용 선언
-
-    # 1. 빗썸 차트 데이터 가져오기 (30일 일봉)
-    df = python_bithumb.get_ohlcv("KRW-BTC", interval="day", count=30)
-    # 공포 탐욕지수 가져오기
-    fearAndGreed = requests.get("https://api.alternative.me/fng/").json()['data'][0]
-    print(fearAndGreed)
+# ai_trading()은 일봉을 사용하므로 일봉 경계(KST 00:00)마다 한 번만 평가
+scheduler = CandleScheduler("day")
 
-    # 2. AI에게 데이터 제공하고 판단 받기
-    from openai import OpenAI
-    client = OpenAI()
+# AI 판단 캐시 (프롬프트를 바꾸면 PROMPT_VERSION도 올릴 것)
+PROMPT_VERSION = "mvp-v2"
+decision_cache = DecisionCache()
 
+def ask_ai(chart_text, fearAndGreed):
+    """
+    AI에게 차트 데이터(압축 텍스트)와 공포 탐욕 지수를 보내 매수/매도/보유 판단(JSON)을 받습니다.
+    """
     response = client.chat.completions.create(
         model="gpt-4o-mini",
         messages=[
@@ -63,8 +89,9 @@ def ai_trading():
                     "content": [
                         {
                             "type": "text",
-                            "text": f"""30일간의 OHLCV 데이터: {df.to_json()},
-                                                공포 탐욕 지수: {fearAndGreed}"""
+                            "text": f"""30일간의 OHLCV 데이터 (컬럼별, 쉼표 구분):
+{chart_text}
+공포 탐욕 지수: {fearAndGreed['value']} ({fearAndGreed['value_classification']})"""
                         }
                     ]
                 }
@@ -74,20 +101,51 @@ def ai_trading():
             }
         )
     result = response.choices[0].message.content
+    return json.loads(result)
+
+def ai_trading():
+    global consecutive_hold_count # 전역 변수 사용 선언
+
+    # 1. 빗썸 차트 데이터 가져오기 (30일 일봉)
+    df = python_bithumb.get_ohlcv("KRW-BTC", interval="day", count=30)
+    # 공포 탐욕지수 가져오기
+    reading = fear_greed_index.current()
+    if reading is None:
+        log.error("공포 탐욕 지수 없음 (조회 실패) - 이번 평가 건너뜀")
+        return
+    fearAndGreed = {'value': str(reading.value), 'value_classification': reading.value_classification}
+    log.info("공포 탐욕 지수: %s", fearAndGreed)
+    chart_text = prompt_encoder.encode(df)
+
+    # 차트 데이터와 공포 탐욕 지수가 직전 평가와 같으면 AI 호출 생략
+    # (연속 hold 확인 중에는 입력이 같아도 매번 다시 물어봄)
+    holding = consecutive_hold_count > 0
+    if not scheduler.changed(chart_text, fearAndGreed.get('value')) and not holding:
+        log.info("### 입력 변화 없음 - AI 판단 생략 ###")
+        return
+
+    # 2. AI에게 데이터 제공하고 판단 받기 (같은 입력이면 캐시된 판단 재사용)
+    cache_key = make_key(df[['open', 'high', 'low', 'close', 'volume']], fearAndGreed.get('value'), PROMPT_VERSION)
+    result = None if holding else decision_cache.get(cache_key)
+    if result is None:
+        result = ask_ai(chart_text, fearAndGreed)
+        # decision/reason이 올바른 응답만 캐시 (잘못된 응답은 다음 평가 때 다시 물어봄)
+        if result.get("decision") not in ("buy", "sell", "hold"):
+            log.error("❗ AI 응답 형식 오류 - 이번 평가 건너뜀: %s", result)
+            return
+        result.setdefault("reason", "")
+        decision_cache.put(cache_key, result)
+    else:
+        log.info("### 캐시된 AI 판단 사용 ###")
 
     # 3. AI의 판단에 따라 실제로 자동매매 진행하기
-    import json
-    result = json.loads(result)
-    access = os.getenv("BITHUMB_ACCESS_KEY")
-    secret = os.getenv("BITHUMB_SECRET_KEY")
-    bithumb = python_bithumb.Bithumb(access, secret)
-
-    my_krw = bithumb.get_balance("KRW")
-    print(f"내 원화 잔고: {my_krw} KRW")
-    my_btc = bithumb.get_balance("BTC")
-    print(f"내 비트코인 잔고: {my_btc} BTC")
-    print("### AI 결정: ", result["decision"].upper(), "###")
-    print(f"### 사유: {result['reason']} ###")
+    balances.refresh()
+    my_krw = balances.available("KRW")
+    log.info(f"내 원화 잔고: {my_krw} KRW")
+    my_btc = balances.available("BTC")
+    log.info(f"내 비트코인 잔고: {my_btc} BTC")
+    log.info("### AI 결정: %s ###", result["decision"].upper())
+    log.info(f"### 사유: {result['reason']} ###")
 
     decision = result["decision"] # AI 결정 변수 저장
 
@@ -96,39 +154,41 @@ def ai_trading():
         if my_krw > 10000:
             buy_amount_krw = 10000  # 한번에 구매할 원화 금액
             current_price = python_bithumb.get_current_price("KRW-BTC")
-            print("### 매수 주문 실행 ###")
+            log.info("### 매수 주문 실행 ###")
             bithumb.buy_market_order("KRW-BTC", buy_amount_krw) # [수정 후 코드] 매수 금액(KRW)으로 주문
-            print(f"### {buy_amount_krw} KRW  매수 주문 완료 ###")
+            log.info(f"### {buy_amount_krw} KRW  매수 주문 완료 ###")
         else:
-            print("### 매수 실패: 원화 잔고 부족 (10,000원 미만) ###")
+            log.info("### 매수 실패: 원화 잔고 부족 (10,000원 미만) ###")
 
     elif decision == "sell":
         consecutive_hold_count = 0 # 'buy' 또는 'sell' 시 카운터 초기화
         current_price = python_bithumb.get_current_price("KRW-BTC")
         if my_btc * current_price > 10000:
-            print("### 매도 주문 실행 ###")
+            log.info("### 매도 주문 실행 ###")
             bithumb.sell_market_order("KRW-BTC", my_btc)
         else:
-            print("### 매도 실패: 비트코인 잔고 부족 (10000원 미만) ###")
+            log.info("### 매도 실패: 비트코인 잔고 부족 (10000원 미만) ###")
 
     elif decision == "hold":
         consecutive_hold_count += 1 # 'hold' 시 카운터 증가
-        print(f"### 현재 포지션 유지 (연속 Hold: {consecutive_hold_count}회) ###")
+        log.info(f"### 현재 포지션 유지 (연속 Hold: {consecutive_hold_count}회) ###")
         if consecutive_hold_count >= 3: # 연속 3회 이상 'hold' 인 경우 매수 후 종료
             if my_krw > 10000:
                 buy_amount_krw = 10000  # 한번에 구매할 원화 금액
                 current_price = python_bithumb.get_current_price("KRW-BTC")
-                print("### !!! 연속 3회 HOLD 발생 !!! 매수 주문 후 프로그램 종료 ###") # 종료 안내 메시지 변경
+                log.info("### !!! 연속 3회 HOLD 발생 !!! 매수 주문 후 프로그램 종료 ###") # 종료 안내 메시지 변경
                 bithumb.buy_market_order("KRW-BTC", buy_amount_krw) # [수정 후 코드] 매수 금액(KRW)으로 주문
-                print(f"### {buy_amount_krw} KRW  매수 주문 완료 ###") # 매수 주문 완료 메시지 변경
-                print("### 프로그램 종료 ###")
+                log.info(f"### {buy_amount_krw} KRW  매수 주문 완료 ###") # 매수 주문 완료 메시지 변경
+                log.info("### 프로그램 종료 ###")
                 exit() # 프로그램 종료
             else:
-                print("### 매수 실패: 원화 잔고 부족 (10,000원 미만), 프로그램 종료 ###") # 종료 안내 메시지 변경
+                log.info("### 매수 실패: 원화 잔고 부족 (10,000원 미만), 프로그램 종료 ###") # 종료 안내 메시지 변경
                 exit() # 프로그램 종료
 
 
-import time
 while True:
-    time.sleep(10)
-    ai_trading()
\ No newline at end of file
+    ai_trading()
+    if consecutive_hold_count > 0:
+        time.sleep(HOLD_RECHECK_SECONDS)
+    else:
+        scheduler.wait_blocking()
\ No newline at end of file
@@ -1,11 +1,21 @@
 import os
+import argparse
 from dotenv import load_dotenv
 load_dotenv()
 import python_bithumb
-import logging
+import http_transport
+import metrics
+import bulk_buy
+from fill_tracker import FillTracker
+from async_log import get_logger
 
-# 로깅 설정
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+http_transport.patch_python_bithumb() # 공유 커넥션 풀 사용
+
+# 로깅 설정 (비동기 큐 기반, 콘솔 + logs/olny-buy.jsonl, 레벨별 건수는 메트릭 log_records_total로도 기록)
+log = get_logger("olny-buy")
+
+# 주문 후 체결 확인을 기다리는 최대 시간 (초)
+FILL_WAIT_SECONDS = 10
 
 def buy_bitcoin_once_10000():
     """
@@ -17,7 +27,7 @@ def buy_bitcoin_once_10000():
         access_key = os.getenv("BITHUMB_ACCESS_KEY")
         secret_key = os.getenv("BITHUMB_SECRET_KEY")
         if not access_key or not secret_key:
-            logging.error("API 키를 환경 변수에서 찾을 수 없습니다. BITHUMB_ACCESS_KEY 및 BITHUMB_SECRET_KEY 환경 변수를 설정해주세요.")
+            log.error("API 키를 환경 변수에서 찾을 수 없습니다. BITHUMB_ACCESS_KEY 및 BITHUMB_SECRET_KEY 환경 변수를 설정해주세요.")
             return
 
         bithumb = python_bithumb.Bithumb(access_key, secret_key)
@@ -26,36 +36,97 @@ def buy_bitcoin_once_10000():
         try:
             krw_balance_str = bithumb.get_balance("KRW")
             krw_balance = krw_balance_str # 수정된 코드: 직접 할당 (float으로 반환될 경우)
-            logging.info(f"내 원화 잔고: {krw_balance} KRW")
+            log.info(f"내 원화 잔고: {krw_balance} KRW")
         except Exception as e:
-            logging.error(f"원화 잔고 조회 실패: {e}")
+            log.error(f"원화 잔고 조회 실패: {e}")
             return
 
         buy_amount_krw = 10000  # 매수할 금액 (10,000원)
 
         # 매수 로직
         if krw_balance >= buy_amount_krw:
-            logging.info(f"### {buy_amount_krw}원 매수 주문 실행 ###")
+            log.info(f"### {buy_amount_krw}원 매수 주문 실행 ###")
             try:
-                order_result = bithumb.buy_market_order("KRW-BTC", buy_amount_krw)
-                logging.info(f"### 매수 주문 결과: {order_result} ###") # 주문 결과 전체 로깅
+                with metrics.span("order", side="buy"):
+                    order_result = bithumb.buy_market_order("KRW-BTC", buy_amount_krw)
+                log.info("### 매수 주문 결과: %s ###", order_result, extra={'order': order_result}) # 주문 결과 전체 로깅 (문자열 조립은 기록 스레드에서)
+
+                log.info("### 비트코인 매수 주문 요청 성공 ###")
 
-                # 주문 성공 여부 간략하게 출력 (status 코드 확인 X)
-                logging.info("### 비트코인 매수 주문 요청 성공 ###") # 요청 성공으로 간주 (실제 체결 성공은 별도 확인 필요)
+                # 주문 요청 성공은 체결 확인이 아니므로 주문이 끝날 때까지 조회해 실제 체결 결과 확인
+                tracker = FillTracker(bithumb)
+                fill = tracker.wait(tracker.track(order_result), timeout=FILL_WAIT_SECONDS)
+                if fill is None:
+                    log.warning(f"### {FILL_WAIT_SECONDS}초 안에 체결 확인 실패 - 거래 내역을 직접 확인하세요 ###")
+                elif fill.volume > 0:
+                    log.info("### 매수 체결: 평균 체결가 %.0f KRW, 수량 %.8f BTC, 수수료 %s KRW ###",
+                             fill.price, fill.volume, fill.fee, extra={'fill': fill._asdict()})
+                else:
+                    log.warning(f"### 주문이 체결 없이 종료되었습니다 ({fill.state}) ###")
 
 
             except Exception as e:
-                logging.error(f"### 매수 주문 실행 중 오류 발생: {e} ###") # 일반적인 매수 주문 실행 오류 메시지
-                logging.error(f"오류 내용: {e}") # 발생한 예외 객체 내용 상세 출력
+                log.error(f"### 매수 주문 실행 중 오류 발생: {e} ###") # 일반적인 매수 주문 실행 오류 메시지
+                log.error(f"오류 내용: {e}") # 발생한 예외 객체 내용 상세 출력
         else:
-            logging.warning(f"### 매수 실패: 원화 잔고 부족 ({buy_amount_krw}원 미만) ###")
+            log.warning(f"### 매수 실패: 원화 잔고 부족 ({buy_amount_krw}원 미만) ###")
 
     except Exception as e: # 함수 전체 예외 처리
-        logging.error(f"### buy_bitcoin_once_10000 함수 실행 중 예기치 않은 오류 발생: {e} ###")
+        log.error(f"### buy_bitcoin_once_10000 함수 실행 중 예기치 않은 오류 발생: {e} ###")
+
+    finally:
+        log.info("### 프로그램 종료 ###") # 프로그램 종료 로그 메시지 명확화
+        if metrics.enabled() and metrics.METRICS_DUMP_PATH:
+            metrics.dump_json() # 한 번 실행하고 끝나는 스크립트이므로 종료 시 스냅샷 저장
+
+
+def buy_bitcoin_bulk(accounts_path, amount=bulk_buy.BUY_AMOUNT_KRW, workers=bulk_buy.ORDER_WORKERS,
+                     dry_run=False, report_path=None):
+    """
+    계정 목록 파일의 모든 계정에서 한꺼번에 비트코인을 매수하는 함수. (잔고 동시 확인 -> 주문 일괄 제출)
+
+    Args:
+        accounts_path (str): 계정 목록 JSON 파일 (bulk_buy.load_accounts 참고)
+        amount (int): amount를 지정하지 않은 계정의 매수 금액
+        workers (int): 동시에 보낼 최대 주문 수
+        dry_run (bool): True면 잔고 확인까지만 실행
+        report_path (str): 결과 보고서 JSON 저장 경로
+    """
+    try:
+        accounts = bulk_buy.load_accounts(accounts_path, amount)
+        log.info(f"### {len(accounts)}개 계정 일괄 매수 시작{' (확인만)' if dry_run else ''} ###")
+        results = bulk_buy.run_bulk_buy(accounts, order_workers=workers, dry_run=dry_run)
+        for r in results:
+            line = f"  - {r.name}: {r.status} (원화 잔고 {r.krw_available} KRW, 금액 {r.amount}원, {r.elapsed:.2f}초)"
+            if r.error:
+                log.error(f"{line} 오류: {r.error}")
+            else:
+                log.info(line, extra={'result': r._asdict()})
+        summary = bulk_buy.summarize(results)
+        log.info(f"### 일괄 매수 결과: {summary['status']}, 주문 금액 합계 {summary['ordered_krw']}원, "
+                 f"최장 {summary['max_elapsed']:.2f}초 ###", extra={'summary': summary})
+        if report_path:
+            bulk_buy.write_report(results, report_path)
+            log.info(f"### 결과 보고서 저장: {report_path} ###")
+
+    except Exception as e: # 계정 목록 오류 등
+        log.error(f"### buy_bitcoin_bulk 함수 실행 중 예기치 않은 오류 발생: {e} ###")
 
     finally:
-        logging.info("### 프로그램 종료 ###") # 프로그램 종료 로그 메시지 명확화
+        log.info("### 프로그램 종료 ###")
+        if metrics.enabled() and metrics.METRICS_DUMP_PATH:
+            metrics.dump_json()
 
 
 if __name__ == "__main__":
-    buy_bitcoin_once_10000() # 1회 매수 함수 호출
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="비트코인 1회 매수 (--accounts를 주면 여러 계정 일괄 매수)")
+    parser.add_argument("--accounts", default=None, help="계정 목록 JSON 파일")
+    parser.add_argument("--amount", type=int, default=bulk_buy.BUY_AMOUNT_KRW, help="계정별 기본 매수 금액 (원)")
+    parser.add_argument("--workers", type=int, default=bulk_buy.ORDER_WORKERS, help="동시에 보낼 최대 주문 수")
+    parser.add_argument("--dry-run", action="store_true", help="잔고 확인까지만 실행")
+    parser.add_argument("--report", default=None, help="결과 보고서 JSON 저장 경로")
+    args = parser.parse_args()
+    if args.accounts:
+        buy_bitcoin_bulk(args.accounts, args.amount, args.workers, args.dry_run, args.report)
+    else:
+        buy_bitcoin_once_10000() # 1회 매수 함수 호출
\ No newline at end of file
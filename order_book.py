@@ -0,0 +1,212 @@
+from bisect import bisect_left
+from collections import namedtuple
+
+# expected_buy()/expected_sell() 결과
+# average_price: 체결 평균가, volume: 체결 수량, krw: 체결 금액, worst_price: 마지막으로 닿는 호가,
+# filled: 호가 잔량 안에서 모두 체결되는지 여부
+Fill = namedtuple('Fill', ['average_price', 'volume', 'krw', 'worst_price', 'filled'])
+
+
+class _Side:
+    """
+    한쪽 호가를 가격 정렬 배열 두 개(가격, 잔량)로 보관합니다.
+    매수 호가는 가격을 음수로 저장해 두 쪽 모두 인덱스 0이 최우선 호가가 되도록 합니다.
+    """
+    __slots__ = ('sign', 'keys', 'sizes')
+
+    def __init__(self, sign):
+        self.sign = sign
+        self.keys = []
+        self.sizes = []
+
+    def set(self, price, size):
+        """가격 레벨의 잔량을 설정합니다. (size <= 0이면 레벨 삭제) 위치 탐색 O(log n)"""
+        key = self.sign * price
+        i = bisect_left(self.keys, key)
+        exists = i < len(self.keys) and self.keys[i] == key
+        if size > 0:
+            if exists:
+                self.sizes[i] = size
+            else:
+                self.keys.insert(i, key)
+                self.sizes.insert(i, size)
+        elif exists:
+            del self.keys[i]
+            del self.sizes[i]
+
+    def replace(self, levels):
+        """(가격, 잔량) 목록으로 전체를 교체합니다. (스냅샷 메시지)"""
+        pairs = sorted((self.sign * p, s) for p, s in levels if s > 0)
+        self.keys = [k for k, _ in pairs]
+        self.sizes = [s for _, s in pairs]
+
+    def best(self):
+        return self.sign * self.keys[0] if self.keys else None
+
+    def level(self, i):
+        return self.sign * self.keys[i], self.sizes[i]
+
+    def __len__(self):
+        return len(self.keys)
+
+
+class OrderBook:
+    """
+    최우선 호가/누적 잔량/예상 체결가를 빠르게 조회하기 위한 로컬 호가창.
+
+    python_bithumb.get_orderbook() 결과나 WebSocket orderbook 메시지의 orderbook_units로 채우고,
+    레벨 단위 갱신(set_level)도 O(log n) 탐색으로 처리합니다.
+    """
+    __slots__ = ('market', 'timestamp', 'asks', 'bids')
+
+    def __init__(self, market=None):
+        self.market = market
+        self.timestamp = None
+        self.asks = _Side(1)
+        self.bids = _Side(-1)
+
+    @classmethod
+    def from_orderbook(cls, orderbook):
+        """get_orderbook() 형태의 dict로 호가창을 만듭니다."""
+        book = cls(orderbook.get('market'))
+        book.replace(orderbook.get('orderbook_units', []), orderbook.get('timestamp'))
+        return book
+
+    def replace(self, units, timestamp=None):
+        """orderbook_units 스냅샷으로 양쪽 호가를 교체합니다."""
+        self.asks.replace((float(u['ask_price']), float(u['ask_size'])) for u in units)
+        self.bids.replace((float(u['bid_price']), float(u['bid_size'])) for u in units)
+        self.timestamp = timestamp
+
+    def set_level(self, side, price, size):
+        """
+        한 가격 레벨을 갱신합니다.
+
+        Args:
+            side (str): 'ask' 또는 'bid'
+            price (float): 호가
+            size (float): 잔량 (0이면 삭제)
+        """
+        (self.asks if side == 'ask' else self.bids).set(float(price), float(size))
+
+    def best_ask(self):
+        return self.asks.best()
+
+    def best_bid(self):
+        return self.bids.best()
+
+    def spread(self):
+        ask, bid = self.best_ask(), self.best_bid()
+        return ask - bid if ask is not None and bid is not None else None
+
+    def mid(self):
+        ask, bid = self.best_ask(), self.best_bid()
+        return (ask + bid) / 2 if ask is not None and bid is not None else None
+
+    def depth(self, side, levels=None):
+        """
+        최우선 호가부터 levels개 레벨의 누적 잔량과 누적 금액을 반환합니다.
+
+        Returns:
+            tuple: (누적 수량, 누적 금액 KRW)
+        """
+        book_side = self.asks if side == 'ask' else self.bids
+        n = len(book_side) if levels is None else min(levels, len(book_side))
+        volume = krw = 0.0
+        for i in range(n):
+            price, size = book_side.level(i)
+            volume += size
+            krw += price * size
+        return volume, krw
+
+    def expected_buy(self, krw):
+        """
+        krw만큼 시장가 매수할 때 매도 호가를 차례로 먹어 들어가는 예상 체결 결과.
+
+        Returns:
+            Fill: 호가 잔량이 모자라면 filled=False (가능한 만큼의 결과)
+        """
+        remaining = krw
+        volume = 0.0
+        price = None
+        for i in range(len(self.asks)):
+            price, size = self.asks.level(i)
+            cost = price * size
+            if cost >= remaining:
+                volume += remaining / price
+                remaining = 0.0
+                break
+            volume += size
+            remaining -= cost
+        spent = krw - remaining
+        return Fill(spent / volume if volume else None, volume, spent, price, remaining <= 0)
+
+    def expected_sell(self, volume):
+        """
+        volume만큼 시장가 매도할 때 매수 호가를 차례로 먹어 들어가는 예상 체결 결과.
+
+        Returns:
+            Fill: 호가 잔량이 모자라면 filled=False (가능한 만큼의 결과)
+        """
+        remaining = volume
+        proceeds = 0.0
+        price = None
+        for i in range(len(self.bids)):
+            price, size = self.bids.level(i)
+            take = size if size < remaining else remaining
+            proceeds += price * take
+            remaining -= take
+            if remaining <= 0:
+                break
+        sold = volume - remaining
+        return Fill(proceeds / sold if sold else None, sold, proceeds, price, remaining <= 0)
+
+    def slippage(self, fill, side='ask'):
+        """최우선 호가 대비 예상 평균 체결가의 불리한 정도 (비율, 예: 0.002 = 0.2%)"""
+        best = self.best_ask() if side == 'ask' else self.best_bid()
+        if best is None or fill.average_price is None:
+            return None
+        return (fill.average_price - best) / best if side == 'ask' else (best - fill.average_price) / best
+
+    def to_units(self, levels=None):
+        """get_orderbook()의 orderbook_units 형태로 최우선 호가부터 levels개를 반환합니다."""
+        n = max(len(self.asks), len(self.bids))
+        if levels is not None:
+            n = min(n, levels)
+        units = []
+        for i in range(n):
+            ask_price, ask_size = self.asks.level(i) if i < len(self.asks) else (None, 0.0)
+            bid_price, bid_size = self.bids.level(i) if i < len(self.bids) else (None, 0.0)
+            units.append({'ask_price': ask_price, 'bid_price': bid_price, 'ask_size': ask_size, 'bid_size': bid_size})
+        return units
+
+    def to_dict(self, levels=None):
+        """python_bithumb.get_orderbook()과 같은 형태의 dict"""
+        return {
+            'market': self.market,
+            'timestamp': self.timestamp,
+            'total_ask_size': sum(self.asks.sizes),
+            'total_bid_size': sum(self.bids.sizes),
+            'orderbook_units': self.to_units(levels),
+        }
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    # 30단계 호가에서 레벨 갱신 / 예상 체결가 조회 속도
+    book = OrderBook("KRW-BTC")
+    mid = 100_000_000
+    book.replace([{'ask_price': mid + 1000 * (i + 1), 'bid_price': mid - 1000 * (i + 1),
+                   'ask_size': random.uniform(0.001, 0.05), 'bid_size': random.uniform(0.001, 0.05)} for i in range(30)])
+    n = 100_000
+    start = time.perf_counter()
+    for _ in range(n):
+        book.set_level('ask', mid + 1000 * random.randint(1, 40), random.choice((0, random.uniform(0.001, 0.05))))
+    print(f"⏱️ set_level: {(time.perf_counter() - start) / n * 1e6:.2f} µs")
+    start = time.perf_counter()
+    for _ in range(n):
+        fill = book.expected_buy(1_000_000)
+    print(f"⏱️ expected_buy(1,000,000 KRW): {(time.perf_counter() - start) / n * 1e6:.2f} µs")
+    print(f"📖 최우선 매도 {book.best_ask():,.0f}, 예상 평균 {fill.average_price:,.0f}, 슬리피지 {book.slippage(fill) * 100:.3f}%")
@@ -0,0 +1,188 @@
+import os
+import time
+import random
+import itertools
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import strategy
+import backtest
+
+# 탐색 공간 예시 (strategy.DEFAULT_PARAMS의 키와 동일)
+DEFAULT_SPACE = {
+    'ma_fast': [3, 5, 8],
+    'ma_slow': [20, 30, 60],
+    'rsi_buy': [25, 30, 35, 40],
+    'rsi_sell': [60, 65, 70, 75],
+    'bb_window': [20],
+    'bb_dev': [1.5, 2, 2.5],
+    'fg_buy': [20, 30],
+    'fg_sell': [70, 80],
+    'buy_votes': [2, 3, 4],
+    'sell_votes': [2, 3],
+}
+
+# 공포 탐욕 지수 시계열이 있을 때만 의미가 있는 파라미터
+FEAR_GREED_KEYS = ('fg_buy', 'fg_sell')
+
+RESULTS_PATH = "sweep_results.csv"
+
+# 워커 프로세스 전역 상태 (공유 메모리 뷰 및 지표 캐시)
+_shared = {}
+_indicator_cache = {}
+
+
+def grid(space):
+    """탐색 공간의 모든 조합을 생성합니다."""
+    keys = list(space)
+    for values in itertools.product(*(space[k] for k in keys)):
+        yield dict(zip(keys, values))
+
+
+def sample(space, n, seed=None):
+    """탐색 공간에서 n개의 조합을 무작위로 뽑습니다. (중복 제외)"""
+    rng = random.Random(seed)
+    total = 1
+    for values in space.values():
+        total *= len(values)
+    seen = set()
+    while len(seen) < min(n, total):
+        params = {k: rng.choice(v) for k, v in space.items()}
+        key = tuple(params.values())
+        if key not in seen:
+            seen.add(key)
+            yield params
+
+
+def drop_fear_greed(candidates):
+    """
+    공포 탐욕 지수 없이 탐색할 때 FEAR_GREED_KEYS를 빼고, 그 때문에 같아진 조합을 하나만 남깁니다.
+    (지수가 없으면 fg_buy/fg_sell은 결과에 영향이 없어 같은 백테스트를 반복하게 됨)
+    """
+    seen = set()
+    for params in candidates:
+        params = {k: v for k, v in params.items() if k not in FEAR_GREED_KEYS}
+        key = tuple(sorted(params.items()))
+        if key not in seen:
+            seen.add(key)
+            yield params
+
+
+def _share(arrays):
+    """numpy 배열들을 공유 메모리에 복사하고 (블록 목록, 워커 전달용 명세)를 반환합니다."""
+    blocks = []
+    spec = {}
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[:] = arr
+        blocks.append(shm)
+        spec[name] = (shm.name, arr.shape, arr.dtype.str)
+    return blocks, spec
+
+
+def _attach(spec):
+    """워커 초기화: 공유 메모리 블록에 붙어 복사 없이 numpy 뷰를 만듭니다."""
+    for name, (shm_name, shape, dtype) in spec.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _shared[name] = (shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf))
+
+
+def _indicators(params):
+    # RSI/MACD는 고정이므로 이동평균/볼린저 설정이 같으면 지표를 재사용
+    key = (params['ma_fast'], params['ma_slow'], params['bb_window'], params['bb_dev'])
+    ind = _indicator_cache.get(key)
+    if ind is None:
+        ind = strategy.compute_indicators(_shared['close'][1], params)
+        _indicator_cache[key] = ind
+    return ind
+
+
+def evaluate(params, initial_krw=backtest.INITIAL_KRW, fee_rate=backtest.FEE_RATE):
+    """워커에서 한 파라미터 조합을 백테스트하고 요약 행을 반환합니다."""
+    params = strategy.with_defaults(params)
+    close = _shared['close'][1]
+    fear_greed = _shared['fear_greed'][1] if 'fear_greed' in _shared else None
+    ind = _indicators(params)
+    buy_mask, sell_mask, _, _ = strategy.signals(ind, fear_greed, params)
+    result = backtest.simulate(close, _shared['days'][1], buy_mask, sell_mask,
+                               initial_krw=initial_krw, fee_rate=fee_rate)
+    summary = backtest.summarize(close, result, initial_krw)
+    del summary['equity']
+    if fear_greed is None:
+        # 지수 없이 돌린 조합에는 with_defaults()가 채운 fg_buy/fg_sell이 적용되지 않았으므로 비워 둠
+        params.update(dict.fromkeys(FEAR_GREED_KEYS))
+    return {**params, **summary}
+
+
+def run_sweep(df, candidates, fear_greed=None, workers=None, rank_by='return_pct',
+              results_path=RESULTS_PATH, chunksize=16):
+    """
+    파라미터 조합들을 프로세스 풀에서 병렬로 백테스트하고 순위표를 만듭니다.
+    봉 데이터는 공유 메모리에 한 번만 올리고 워커는 복사 없이 참조합니다.
+
+    Args:
+        df (pandas.DataFrame): 시간순 OHLCV 데이터
+        candidates (iterable): 파라미터 딕셔너리 목록 (grid() 또는 sample() 결과)
+        fear_greed: 공포 탐욕 지수 (None, 상수, 또는 봉별 배열 - fear_greed.align() 결과)
+            None이면 fg_buy/fg_sell을 뺀 조합만 탐색 (drop_fear_greed())
+        workers (int): 프로세스 수 (기본값: CPU 코어 수)
+        rank_by (str): 정렬 기준 컬럼
+        results_path (str): 결과 CSV 경로 (None이면 저장하지 않음)
+
+    Returns:
+        pandas.DataFrame: rank_by 내림차순으로 정렬된 결과표
+    """
+    arrays = {
+        'close': df['close'].to_numpy(dtype=np.float64),
+        'days': backtest.candle_days(df.index, len(df)),
+    }
+    if fear_greed is not None:
+        arrays['fear_greed'] = np.broadcast_to(np.asarray(fear_greed, dtype=np.float64), (len(df),))
+    else:
+        candidates = drop_fear_greed(candidates)
+
+    blocks, spec = _share(arrays)
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                 initializer=_attach, initargs=(spec,)) as pool:
+            rows = list(pool.map(evaluate, candidates, chunksize=chunksize))
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    results = pd.DataFrame(rows)
+    if not results.empty:
+        results = results.sort_values(rank_by, ascending=False, ignore_index=True)
+        results.index += 1
+        results.index.name = 'rank'
+    if results_path:
+        results.to_csv(results_path)
+    return results
+
+
+if __name__ == "__main__":
+    from candle_store import CandleStore
+    import fear_greed
+
+    store = CandleStore("KRW-BTC", "minute60")
+    store.refresh()
+    df = store.tail_frame(len(store))
+
+    # 봉별 공포 탐욕 지수 (이력을 받을 수 없으면 fg_buy/fg_sell 없이 탐색)
+    try:
+        fg = fear_greed.align(df.index, fear_greed.FearGreedIndex().history())
+    except Exception as e:
+        print(f"❗ 공포 탐욕 지수 이력 없음, 지수 조건 없이 탐색: {e}")
+        fg = None
+
+    candidates = list(sample(DEFAULT_SPACE, 500, seed=42))
+    start = time.perf_counter()
+    results = run_sweep(df, candidates, fear_greed=fg)
+    elapsed = time.perf_counter() - start
+
+    print(f"🔍 {len(results)}개 조합 × {len(df)}개 봉 탐색 완료 ({elapsed:.1f}초, {os.cpu_count()}코어)")
+    print(results.head(10).to_string())
+    print(f"💾 결과 저장: {RESULTS_PATH}")
@@ -0,0 +1,158 @@
+import time
+import logging
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken이 없으면 문자 수 기반 근사치 사용
+    tiktoken = None
+
+log = logging.getLogger(__name__)
+
+# 컬럼별 소수점 자릿수 (KRW 가격은 정수, 거래량은 소수점 4자리)
+DEFAULT_PRECISION = {
+    'open': 0, 'high': 0, 'low': 0, 'close': 0, 'volume': 4, 'value': 0,
+    'MA5': 0, 'MA20': 0, 'RSI': 2, 'MACD': 0, 'MACD_Signal': 0, 'Upper_BB': 0, 'Lower_BB': 0,
+}
+DEFAULT_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# 프롬프트 데이터 부분의 기본 토큰 예산
+DEFAULT_TOKEN_BUDGET = 1500
+
+_encodings = {}
+
+
+def _encoding(model):
+    """모델별 tiktoken 인코딩 (없거나 인코딩 파일을 받을 수 없으면 None)"""
+    if model not in _encodings:
+        encoding = None
+        if tiktoken is not None:
+            try:
+                try:
+                    encoding = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    encoding = tiktoken.get_encoding("o200k_base")
+            except Exception as e:
+                log.warning("❗ tiktoken 인코딩 로드 실패, 근사치 사용: %s", e)
+        _encodings[model] = encoding
+    return _encodings[model]
+
+
+def count_tokens(text, model="gpt-4o-mini"):
+    """
+    text의 토큰 수를 셉니다. tiktoken을 쓸 수 있으면 정확한 값, 아니면 근사치(ASCII 3자/토큰, 그 외 1자/토큰)입니다.
+    """
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return -(-ascii_chars // 3) + (len(text) - ascii_chars)
+
+
+class PromptEncoder:
+    """
+    OHLCV DataFrame을 df.to_json()보다 훨씬 짧은 컬럼 지향 텍스트로 바꾸는 인코더.
+
+    - 컬럼별 고정 소수점 자릿수로 값을 줄이고, 날짜는 시작 시각 + 간격으로 한 번만 표기
+    - 이전 호출에서 값이 바뀌지 않은 행은 포맷된 문자열을 재사용 (바뀐 행만 다시 인코딩)
+    - 토큰 예산을 넘으면 가장 오래된 행부터 잘라냄
+    """
+
+    def __init__(self, columns=None, precision=None, token_budget=DEFAULT_TOKEN_BUDGET, model="gpt-4o-mini"):
+        self.columns = columns or DEFAULT_COLUMNS
+        self.precision = dict(DEFAULT_PRECISION)
+        if precision:
+            self.precision.update(precision)
+        self.token_budget = token_budget
+        self.model = model
+        self._rows = {}   # index -> (원본 값 튜플, 포맷된 셀 튜플)
+        self.reused_rows = 0
+
+    def _format(self, column, value):
+        if value != value:
+            return ""
+        digits = self.precision.get(column, 4)
+        return f"{value:.{digits}f}"
+
+    def _cells(self, frame):
+        """행별 포맷 결과를 캐시와 비교해 바뀐 행만 다시 포맷합니다."""
+        rows = {}
+        cells = []
+        self.reused_rows = 0
+        for index, values in zip(frame.index, frame.itertuples(index=False, name=None)):
+            cached = self._rows.get(index)
+            if cached is not None and cached[0] == values:
+                formatted = cached[1]
+                self.reused_rows += 1
+            else:
+                formatted = tuple(self._format(col, v) for col, v in zip(self.columns, values))
+            rows[index] = (values, formatted)
+            cells.append(formatted)
+        self._rows = rows
+        return cells
+
+    def _render(self, index, cells):
+        if len(index) == 0:
+            return "rows: 0"
+        lines = []
+        if len(index) > 1:
+            step = index[1] - index[0]
+            regular = all(index[i + 1] - index[i] == step for i in range(len(index) - 1))
+        else:
+            step, regular = None, True
+        if regular:
+            lines.append(f"time: start={index[0]} step={step} rows={len(index)}")
+        else:
+            lines.append("time: " + ",".join(str(t) for t in index))
+        for k, col in enumerate(self.columns):
+            lines.append(f"{col}: " + ",".join(row[k] for row in cells))
+        return "\n".join(lines)
+
+    def encode(self, df):
+        """
+        df의 self.columns를 컬럼 지향 압축 텍스트로 인코딩합니다.
+
+        Returns:
+            str: 프롬프트에 넣을 텍스트 (토큰 예산 이내)
+        """
+        frame = df[self.columns]
+        cells = self._cells(frame)
+        index = list(frame.index)
+        text = self._render(index, cells)
+        # 예산을 넘으면 오래된 행부터 약 10%씩 잘라냄
+        while self.token_budget and len(cells) > 1 and count_tokens(text, self.model) > self.token_budget:
+            drop = max(1, len(cells) // 10)
+            cells = cells[drop:]
+            index = index[drop:]
+            text = self._render(index, cells)
+        return text
+
+
+if __name__ == "__main__":
+    import numpy as np
+    import pandas as pd
+
+    # df.to_json() 방식과 압축 인코딩의 프롬프트 크기/인코딩 시간 비교
+    rng = np.random.default_rng(0)
+    close = 90_000_000 * np.exp(np.cumsum(rng.normal(0, 0.02, 30)))
+    df = pd.DataFrame({
+        'open': close * 0.99, 'high': close * 1.02, 'low': close * 0.97, 'close': close,
+        'volume': rng.uniform(100, 2000, 30), 'value': close * 1000,
+    }, index=pd.date_range("2025-01-01", periods=30, freq="D", name='candle_date_time_kst'))
+
+    encoder = PromptEncoder()
+    for name, fn in [("df.to_json()", df.to_json), ("PromptEncoder.encode()", lambda: encoder.encode(df))]:
+        start = time.perf_counter()
+        for _ in range(100):
+            text = fn()
+        elapsed = (time.perf_counter() - start) / 100
+        print(f"📏 {name}: {len(text)}자, {count_tokens(text)}토큰, {elapsed * 1000:.2f} ms")
+    print(f"♻️ 재사용된 행: {encoder.reused_rows}/{len(df)}")
+
+    try:
+        from openai import OpenAI
+        start = time.perf_counter()
+        for _ in range(20):
+            OpenAI(api_key="sk-benchmark")
+        print(f"⏱️ OpenAI() 클라이언트 생성: {(time.perf_counter() - start) / 20 * 1000:.2f} ms (재사용 시 0)")
+    except ImportError:
+        pass
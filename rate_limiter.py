@@ -0,0 +1,241 @@
+import os
+import time
+import heapq
+import threading
+import itertools
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+import metrics
+
+# RATE_LIMIT=0이면 제한 없이 바로 통과
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT", "1") == "1"
+
+# 버킷별 (초당 요청 수, 최대 버스트) - 빗썸 공개 API 초당 150회, 비공개 API 초당 140회보다 약간 낮게 잡음
+BUCKET_LIMITS = {
+    'public': (120, 120),
+    'private': (100, 100),
+    'order': (8, 8),
+}
+
+# 요청 종류별로 토큰을 꺼내는 버킷 (주문은 비공개 API 한도도 함께 사용)
+CLASS_BUCKETS = {
+    'public': ('public',),
+    'private': ('private',),
+    'order': ('order', 'private'),
+}
+
+# 계정(API 키)마다 따로 두는 버킷 (시세 조회 한도는 IP 단위라 모든 계정이 공유)
+PER_ACCOUNT_BUCKETS = ('private', 'order')
+
+# 같은 버킷을 기다리는 요청 중 숫자가 작은 종류가 먼저 토큰을 가져감 (주문 > 계좌 조회 > 시세 조회)
+PRIORITY = {'order': 0, 'private': 1, 'public': 2}
+
+# 429 응답에 Retry-After가 없을 때 해당 버킷을 멈추는 시간 (초)
+DEFAULT_PENALTY = 1.0
+
+_ORDER_PATHS = ('/v1/orders', '/v1/order')
+_PRIVATE_PREFIXES = ('/v1/accounts', '/v1/orders', '/v1/order', '/v1/withdraws', '/v1/deposits')
+
+_local = threading.local()
+
+
+def current_account():
+    """현재 스레드에서 account()로 지정한 계정 키 (지정하지 않았으면 None)"""
+    return getattr(_local, 'account', None)
+
+
+@contextmanager
+def account(key):
+    """
+    with 블록 안에서 이 스레드가 보내는 비공개/주문 요청을 key 계정의 버킷으로 계산합니다.
+    (여러 계정을 한 프로세스에서 돌릴 때 계정별 한도를 따로 쓰기 위해 사용)
+    """
+    previous = current_account()
+    _local.account = key
+    try:
+        yield
+    finally:
+        _local.account = previous
+
+
+def classify(method, url):
+    """
+    빗썸 요청의 종류를 반환합니다. (빗썸이 아닌 호스트는 None)
+
+    Returns:
+        str: 'order'(주문 생성/취소), 'private'(계좌/주문 조회), 'public'(시세) 또는 None
+    """
+    parts = urlsplit(url)
+    if parts.hostname != "api.bithumb.com":
+        return None
+    path = parts.path
+    if method in ('POST', 'DELETE') and path in _ORDER_PATHS:
+        return 'order'
+    if path.startswith(_PRIVATE_PREFIXES):
+        return 'private'
+    return 'public'
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 burst개까지 쌓이는 토큰 버킷"""
+    __slots__ = ('rate', 'burst', 'tokens', 'updated', 'blocked_until')
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+        self.blocked_until = 0.0
+
+    def _fill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, now):
+        """토큰 하나를 쓸 수 있을 때까지 남은 시간 (초, 0이면 바로 가능)"""
+        self._fill(now)
+        blocked = self.blocked_until - now
+        missing = (1 - self.tokens) / self.rate if self.tokens < 1 else 0.0
+        return max(blocked, missing, 0.0)
+
+    def take(self, now):
+        self._fill(now)
+        self.tokens -= 1
+
+    def penalize(self, now, seconds):
+        """거래소가 요청을 거절했을 때 seconds 동안 토큰을 내주지 않음"""
+        self.tokens = 0
+        self.updated = now
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+
+class RateLimiter:
+    """
+    요청 종류별 토큰 버킷과 우선순위 대기열.
+
+    acquire()는 토큰이 생길 때까지 호출한 스레드를 재우며,
+    같은 버킷을 기다리는 요청이 여럿이면 PRIORITY가 높은(숫자가 작은) 종류, 그다음 먼저 온 순서로 통과시킵니다.
+    주문은 'order'와 'private' 버킷을 함께 쓰므로, 비공개 한도가 빠듯할 때 잔고/주문 조회보다 먼저 나갑니다.
+    """
+
+    def __init__(self, limits=BUCKET_LIMITS, class_buckets=CLASS_BUCKETS, priority=PRIORITY,
+                 per_account=PER_ACCOUNT_BUCKETS, clock=time.monotonic):
+        self.limits = limits
+        self.class_buckets = class_buckets
+        self.priority = priority
+        self.per_account = per_account
+        self.clock = clock
+        self.buckets = {}       # (버킷 이름, 계정 키) -> TokenBucket, 처음 쓸 때 생성
+        self._cond = threading.Condition()
+        self._waiting = []      # (우선순위, 순번, 버킷 키 튜플) 힙
+        self._seq = itertools.count()
+
+    def _bucket_keys(self, endpoint_class, account):
+        return tuple((name, account if name in self.per_account else None)
+                     for name in self.class_buckets[endpoint_class])
+
+    def _bucket(self, key):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            rate, burst = self.limits[key[0]]
+            bucket = self.buckets[key] = TokenBucket(rate, burst, self.clock())
+        return bucket
+
+    def _first_in_line(self, ticket):
+        """ticket보다 앞선 대기 요청 중 같은 버킷을 쓰는 것이 없으면 True"""
+        for other in self._waiting:
+            if other < ticket and set(other[2]) & set(ticket[2]):
+                return False
+        return True
+
+    def acquire(self, endpoint_class, timeout=None, account=None):
+        """
+        endpoint_class 요청 한 건을 보낼 수 있을 때까지 기다립니다.
+
+        Args:
+            endpoint_class (str): 'order', 'private', 'public'
+            timeout (float): 최대 대기 시간 (초, None이면 무제한)
+            account (str): 계정 키 (PER_ACCOUNT_BUCKETS는 계정마다 따로 계산, None이면 기본 계정)
+
+        Returns:
+            float: 기다린 시간 (초)
+
+        Raises:
+            TimeoutError: timeout 안에 토큰을 얻지 못한 경우
+        """
+        start = self.clock()
+        with self._cond:
+            keys = self._bucket_keys(endpoint_class, account)
+            ticket = (self.priority[endpoint_class], next(self._seq), keys)
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    now = self.clock()
+                    delay = None
+                    if self._first_in_line(ticket):
+                        delay = max(self._bucket(key).wait_time(now) for key in keys)
+                        if delay <= 0:
+                            for key in keys:
+                                self._bucket(key).take(now)
+                            waited = now - start
+                            metrics.observe("rate_limit_wait_seconds", waited, endpoint=endpoint_class)
+                            return waited
+                    if timeout is not None:
+                        remaining = start + timeout - now
+                        if remaining <= 0:
+                            raise TimeoutError(f"{endpoint_class} 요청 한도 대기 {timeout}초 초과")
+                        delay = remaining if delay is None else min(delay, remaining)
+                    # 앞선 요청이 통과하거나 토큰이 찰 때까지 대기
+                    self._cond.wait(delay)
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+    def penalize(self, endpoint_class, seconds=DEFAULT_PENALTY, account=None):
+        """429(요청 한도 초과) 응답을 받았을 때 해당 종류(계정)의 버킷을 seconds 동안 멈춥니다."""
+        metrics.inc("rate_limit_rejections_total", endpoint=endpoint_class)
+        with self._cond:
+            now = self.clock()
+            for key in self._bucket_keys(endpoint_class, account):
+                self._bucket(key).penalize(now, seconds)
+            self._cond.notify_all()
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    """프로세스 전체에서 공유하는 RateLimiter"""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter()
+    return _limiter
+
+
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    # 비공개 버킷이 빠듯한 상황(초당 20회)에서 잔고 조회 60건이 몰린 뒤 주문 5건이 들어올 때 대기 시간
+    limiter = RateLimiter(limits={'public': (50, 50), 'private': (20, 5), 'order': (8, 8)})
+    waits = {'private': [], 'order': []}
+
+    def call(kind):
+        waits[kind].append(limiter.acquire(kind))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(64) as pool:
+        for _ in range(60):
+            pool.submit(call, 'private')
+        time.sleep(0.2)
+        for _ in range(5):
+            pool.submit(call, 'order')
+    elapsed = time.perf_counter() - start
+    print(f"⏱️ 65건 {elapsed:.2f}초 (비공개 한도 초당 20회)")
+    print(f"🧾 주문 대기: 최대 {max(waits['order']) * 1000:.0f} ms / 잔고 조회 대기: 최대 {max(waits['private']) * 1000:.0f} ms")
+    print(f"🔎 분류: {classify('POST', 'https://api.bithumb.com/v1/orders')}, "
+          f"{classify('GET', 'https://api.bithumb.com/v1/accounts')}, {classify('GET', 'https://api.bithumb.com/v1/ticker?markets=KRW-BTC')}")
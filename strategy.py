@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import ta
+
+# yhgo_okno-gpt.py의 should_buy()/should_sell()에 하드코딩된 기준값
+DEFAULT_PARAMS = {
+    'ma_fast': 5,        # 단기 이동평균 기간
+    'ma_slow': 20,       # 장기 이동평균 기간
+    'rsi_buy': 35,       # RSI < rsi_buy 이면 매수 조건
+    'rsi_sell': 65,      # RSI > rsi_sell 이면 매도 조건
+    'bb_window': 20,     # 볼린저 밴드 기간
+    'bb_dev': 2,         # 볼린저 밴드 표준편차 배수
+    'fg_buy': 30,        # 공포 탐욕 지수 < fg_buy 이면 매수 조건
+    'fg_sell': 70,       # 공포 탐욕 지수 > fg_sell 이면 매도 조건
+    'buy_votes': 3,      # 매수에 필요한 최소 조건 수
+    'sell_votes': 2,     # 매도에 필요한 최소 조건 수
+}
+
+
+def with_defaults(params=None):
+    """기본값 위에 params를 덮어쓴 파라미터 딕셔너리를 반환합니다."""
+    merged = dict(DEFAULT_PARAMS)
+    if params:
+        merged.update(params)
+    return merged
+
+
+def compute_indicators(close, params=None):
+    """
+    전체 종가 배열에 대해 기술적 지표를 한 번에 계산합니다. (get_technical_indicators()와 같은 ta 함수 사용)
+
+    Args:
+        close (array-like): 시간순 종가
+        params (dict): DEFAULT_PARAMS 중 덮어쓸 값
+
+    Returns:
+        dict: 'close', 'MA_fast', 'MA_slow', 'RSI', 'MACD', 'MACD_Signal', 'Upper_BB', 'Lower_BB' numpy 배열
+    """
+    p = with_defaults(params)
+    series = pd.Series(np.asarray(close, dtype=np.float64))
+    macd = ta.trend.MACD(series, window_slow=26, window_fast=12, window_sign=9)
+    bollinger = ta.volatility.BollingerBands(series, window=p['bb_window'], window_dev=p['bb_dev'])
+    return {
+        'close': series.to_numpy(),
+        'MA_fast': ta.trend.sma_indicator(series, window=p['ma_fast']).to_numpy(),
+        'MA_slow': ta.trend.sma_indicator(series, window=p['ma_slow']).to_numpy(),
+        'RSI': ta.momentum.rsi(series, window=14).to_numpy(),
+        'MACD': macd.macd().to_numpy(),
+        'MACD_Signal': macd.macd_signal().to_numpy(),
+        'Upper_BB': bollinger.bollinger_hband().to_numpy(),
+        'Lower_BB': bollinger.bollinger_lband().to_numpy(),
+    }
+
+
+def _fear_greed_array(fear_greed, n):
+    # None(조회 실패)은 NaN으로 두어 비교 결과가 항상 False가 되도록 함
+    if fear_greed is None:
+        return np.full(n, np.nan)
+    return np.broadcast_to(np.asarray(fear_greed, dtype=np.float64), (n,))
+
+
+def buy_conditions(ind, fear_greed=None, params=None):
+    """
+    should_buy()의 5개 매수 조건을 (5, n) 불리언 배열로 평가합니다.
+    행 순서는 매수 사유 번호 1~5와 같습니다.
+    """
+    p = with_defaults(params)
+    n = len(ind['close'])
+    fg = _fear_greed_array(fear_greed, n)
+    with np.errstate(invalid='ignore'):
+        return np.vstack([
+            ind['MA_fast'] > ind['MA_slow'],
+            ind['RSI'] < p['rsi_buy'],
+            ind['MACD'] > ind['MACD_Signal'],
+            ind['close'] < ind['Lower_BB'],
+            fg < p['fg_buy'],
+        ])
+
+
+def sell_conditions(ind, fear_greed=None, params=None):
+    """
+    should_sell()의 5개 매도 조건을 (5, n) 불리언 배열로 평가합니다.
+    행 순서는 매도 사유 번호 1~5와 같습니다.
+    """
+    p = with_defaults(params)
+    n = len(ind['close'])
+    fg = _fear_greed_array(fear_greed, n)
+    with np.errstate(invalid='ignore'):
+        return np.vstack([
+            ind['MA_fast'] < ind['MA_slow'],
+            ind['RSI'] > p['rsi_sell'],
+            ind['MACD'] < ind['MACD_Signal'],
+            ind['close'] > ind['Upper_BB'],
+            fg > p['fg_sell'],
+        ])
+
+
+def signals(ind, fear_greed=None, params=None):
+    """
+    매수/매도 투표 결과를 반환합니다.
+
+    Returns:
+        tuple: (buy_mask, sell_mask, buy_conds, sell_conds)
+    """
+    p = with_defaults(params)
+    buy_conds = buy_conditions(ind, fear_greed, p)
+    sell_conds = sell_conditions(ind, fear_greed, p)
+    buy_mask = buy_conds.sum(axis=0) >= p['buy_votes']
+    sell_mask = sell_conds.sum(axis=0) >= p['sell_votes']
+    return buy_mask, sell_mask, buy_conds, sell_conds
+
+
+def reasons_at(conds, i):
+    """조건 배열의 i번째 봉에서 충족된 사유 번호 리스트 (1부터 시작)"""
+    return [k + 1 for k in np.flatnonzero(conds[:, i])]
@@ -1,23 +1,156 @@
 import os
-import time
-import hashlib
-import hmac
-import base64
-import requests
-import json
-import urllib.parse
+import http_transport
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from dotenv import load_dotenv
 from datetime import datetime
+from bithumb_auth import BithumbJwtSigner
+from async_log import get_logger
 
 # 환경 변수 로드 (반드시 .env 파일에 BITHUMB_ACCESS_KEY, BITHUMB_SECRET_KEY 설정 필요)
 load_dotenv()
+log = get_logger("test_buy_history")
 access_key = os.getenv("BITHUMB_ACCESS_KEY")
 secret_key = os.getenv("BITHUMB_SECRET_KEY")
+signer = BithumbJwtSigner(access_key, secret_key)
 
 API_ENDPOINT = "https://api.bithumb.com" # Bithumb API 엔드포인트 URL (고정값)
 
+PAGE_SIZE = 100      # /v1/orders 페이지당 최대 건수
+PREFETCH_PAGES = 4   # 동시에 미리 받아 둘 페이지 수 (메모리는 이 페이지 수만큼만 사용)
+# 체결이 있는 주문은 done(전량 체결) 또는 cancel(시장가 매수 잔량 취소 등 부분 체결)
+HISTORY_STATES = ('done', 'cancel')
+
+_OrderRecordBase = namedtuple('_OrderRecordBase', [
+    'uuid', 'side', 'ord_type', 'market', 'created_at', 'state',
+    'price', 'volume', 'executed_volume', 'executed_funds', 'paid_fee', 'trades_count',
+])
+
+
+class OrderRecord(_OrderRecordBase):
+    """체결 내역이 있는 주문 한 건 (/v1/orders 응답을 숫자형으로 변환한 레코드)"""
+    __slots__ = ()
+
+    @classmethod
+    def from_json(cls, item):
+        def number(key):
+            value = item.get(key)
+            return float(value) if value not in (None, '') else 0.0
+
+        # 실제 체결 금액: executed_funds가 없으면 체결 내역(trades)의 funds 합계 (둘 다 없으면 None)
+        if item.get('executed_funds') not in (None, ''):
+            executed_funds = float(item['executed_funds'])
+        elif item.get('trades'):
+            executed_funds = sum(float(trade['funds']) for trade in item['trades'])
+        else:
+            executed_funds = None
+        return cls(
+            uuid=item['uuid'],
+            side=item['side'],
+            ord_type=item.get('ord_type'),
+            market=item['market'],
+            created_at=datetime.fromisoformat(item['created_at']),
+            state=item.get('state'),
+            price=number('price'),
+            volume=number('volume'),
+            executed_volume=number('executed_volume'),
+            executed_funds=executed_funds,
+            paid_fee=number('paid_fee'),
+            trades_count=int(item.get('trades_count') or 0),
+        )
+
+    @property
+    def amount(self):
+        """
+        실제 체결 금액 (KRW, 알 수 없으면 None).
+        시장가 매수(ord_type='price')의 price는 주문 금액이라 부분 체결 후 취소(cancel)된 주문에서는 실제보다 크므로
+        executed_funds/체결 내역을 우선 쓰고, 지정가 주문만 price * executed_volume으로 계산합니다.
+        """
+        if self.executed_funds is not None:
+            return self.executed_funds
+        if self.ord_type == 'limit':
+            return self.price * self.executed_volume
+        if self.ord_type == 'price' and self.state == 'done':
+            return self.price   # 전량 체결된 시장가 매수는 주문 금액을 모두 사용
+        return None
+
+
+def fetch_order_page(market, page, limit=PAGE_SIZE, states=HISTORY_STATES, order_by='desc'):
+    """Bithumb Private API (v1/orders) 한 페이지 조회
+
+    Args:
+        market (str): 마켓 심볼 (예: "KRW-BTC")
+        page (int): 페이지 번호 (1부터)
+        limit (int): 페이지당 건수 (최대 100)
+        states (tuple): 조회할 주문 상태
+        order_by (str): 정렬 (desc: 최신순, asc: 과거순)
+
+    Returns:
+        list: 주문 JSON 리스트 (마지막 페이지 이후는 빈 리스트)
+    """
+    # states[]는 python_bithumb.get_orders()처럼 대괄호를 이스케이프하지 않은 그대로 서명하고 보냄
+    # (query_hash는 실제로 보낸 쿼리 문자열 기준이라 states%5B%5D로 바뀌면 거절됨)
+    query = '&'.join([f'market={market}'] + [f'states[]={state}' for state in states] +
+                     [f'page={page}', f'limit={limit}', f'order_by={order_by}'])
+    response = http_transport.get(API_ENDPOINT + '/v1/orders?' + query, headers=signer.headers(query))
+    response.raise_for_status() # HTTP 오류 발생 시 예외 발생 (예: 400, 401, 500 등)
+    result_json = response.json()
+    if isinstance(result_json, dict) and 'error' in result_json:
+        raise Exception(f"Bithumb API Error: {result_json['error']}")
+    return result_json
+
+
+def iter_order_history(symbol="BTC", side=None, page_size=PAGE_SIZE, prefetch=PREFETCH_PAGES, order_by='desc'):
+    """전체 주문 체결 내역을 페이지 단위로 훑으며 한 건씩 내보내는 제너레이터
+
+    다음 prefetch개 페이지를 미리 동시에 요청해 두고, 앞 페이지부터 순서대로 소비합니다.
+    한 번에 메모리에 있는 것은 prefetch개 페이지뿐이므로 체결이 수십만 건이어도 메모리가 일정합니다.
+
+    Args:
+        symbol (str): 조회할 가상자산 심볼 (기본값: "BTC")
+        side (str): 'bid'(매수) / 'ask'(매도) / None(전체).
+                    /v1/orders는 side 필터를 지원하지 않아 상태(done/cancel)만 서버에서 거르고 side는 여기서 거름
+        page_size (int): 페이지당 건수 (최대 100)
+        prefetch (int): 동시에 받아 둘 페이지 수
+        order_by (str): 'desc'(최신순) / 'asc'(과거순)
+
+    Yields:
+        OrderRecord: 체결 수량이 있는 주문
+    """
+    market = f"KRW-{symbol}"
+    executor = ThreadPoolExecutor(max_workers=prefetch)
+    pending = {}
+    next_page = 1
+    try:
+        for _ in range(prefetch):
+            pending[next_page] = executor.submit(fetch_order_page, market, next_page, page_size, HISTORY_STATES, order_by)
+            next_page += 1
+        page = 1
+        while True:
+            items = pending.pop(page).result()
+            if len(items) == page_size:
+                # 마지막 페이지가 아니면 창을 한 칸 밀어 다음 페이지를 미리 요청
+                pending[next_page] = executor.submit(fetch_order_page, market, next_page, page_size, HISTORY_STATES, order_by)
+                next_page += 1
+            for item in items:
+                if side is not None and item.get('side') != side:
+                    continue
+                record = OrderRecord.from_json(item)
+                if record.executed_volume > 0:
+                    yield record
+            if len(items) < page_size:
+                return
+            page += 1
+    finally:
+        # 소비자가 중간에 멈추면(islice 등) 남은 페이지 요청은 버림
+        for future in pending.values():
+            future.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
 def get_recent_buy_history_bithumb_api(symbol="BTC", count=3):
-    """Bithumb Private API (info/order_detail) 직접 호출하여 최근 매수 거래 내역 조회
+    """Bithumb Private API (v1/orders) 호출하여 최근 매수 거래 내역 조회
 
     Args:
         symbol (str):  조회할 가상자산 심볼 (기본값: "BTC")
@@ -28,79 +161,33 @@ def get_recent_buy_history_bithumb_api(symbol="BTC", count=3):
               각 거래 내역은 {'datetime': 매수일시, 'amount': 매수금액} 딕셔너리 형태
     """
     try:
-        path = "/info/order_detail" # info/order_detail API 경로 (고정값)
-        market = f"{symbol}_KRW"    # Bithumb 마켓 심볼 (예: BTC_KRW)
-        params = {
-            "order_currency": market,
-            "payment_currency": "KRW",
-            "count": count, # Bithumb API 는 count 인자 지원 안함 (deprecated), 요청 횟수로 조절 (실제 코드에서는 페이지네이션 구현 필요)
-            "offset": 0,   # Bithumb API 는 offset 인자 지원 안함 (deprecated), 페이지네이션으로 구현 필요 (실제 코드에서는 페이지네이션 구현 필요)
-            "type": "bid"  # 매수 거래만 조회 (bid: 매수, ask: 매도) - info/order_detail API 는 type 인자 지원 안함 (deprecated), 전체 거래 내역 조회 후 필터링 해야 함 (실제 코드에서는 전체 거래 내역 조회 후 필터링 구현 필요)
-        }
-
-        # === 1. Nonce 값 생성 ===
-        nonce = str(int(time.time() * 1000)) # milliseconds timestamp
-
-        # === 2. API Signature 생성 ===
-        # 2-1. Public API + Private API Parameter 조합 (UTF-8 인코딩)
-        param_str = urllib.parse.urlencode(params).encode('utf-8') # Public API parameters (URL encoding)
-        api_path = path # Private API path
-        combined_str = api_path.encode('utf-8') + b'\x00' + param_str + b'\x00' + nonce.encode('utf-8') # API path + null byte + parameter string + null byte + nonce
-
-        # 2-2. Secret Key (Base64 Decode) -> HMAC-SHA512 Hash (with Combined String) -> Base64 Encode
-        secret_key_bytes = base64.b64decode(secret_key) # Secret Key Base64 Decode (수정: base64.b64decode() 사용)
-        signature = hmac.new(secret_key_bytes, combined_str, hashlib.sha512).digest() # HMAC-SHA512 Hash
-        api_sign = base64.b64encode(signature).decode('utf-8')   # API Signature Base64 Encode
-
-        # === 3. Private API 요청 (with 계좌 인증) ===
-        headers = {
-            'Content-Type': 'application/x-www-form-urlencoded',
-            'Api-Key': access_key,
-            'Api-Sign': api_sign,
-            'Api-Nonce': nonce
-        }
-
-        # Public API 요청 (예시)
-        # response = requests.get(API_ENDPOINT + path, params=params, headers=headers, timeout=10) # Public API 요청 방식 (headers 불필요) - Private API 요청 방식으로 변경
-
-        # Private API 요청
-        response = requests.post(API_ENDPOINT + path, headers=headers, data=params, timeout=10) # Private API 요청 방식 (headers, data 필요)
-        response.raise_for_status() # HTTP 오류 발생 시 예외 발생 (예: 400, 401, 500 등)
-
-        # JSON 응답 파싱
-        result_json = response.json()
-
-        if result_json['status'] != "0000": # API 요청 실패 시 (status 코드가 "0000" 이 아니면 실패)
-            raise Exception(f"Bithumb API Error: {result_json['message']} (Status Code: {result_json['status']})") # Exception 발생시켜 except 블록에서 처리
-
-        print("\n==================== Bithumb API 응답 전체 데이터 (JSON) ====================\n") # 구분선 추가
-        print(json.dumps(result_json, indent=4, ensure_ascii=False)) # JSON 데이터 예쁘게 출력 (indent=4: 들여쓰기, ensure_ascii=False: 한글 깨짐 방지)
-        print("\n=========================================================================\n") # 구분선 추가
-
-        transactions = result_json['data'] # 거래 내역 데이터 추출 (기존 코드 - 주석 처리 또는 삭제 가능)
-        buy_history = [] # 매수 기록 저장할 리스트 초기화 (주석 처리 또는 삭제 가능)
-        buy_count = 0    # 매수 기록 카운트 초기화 (주석 처리 또는 삭제 가능)
-
-
-        return buy_history # 빈 리스트 반환 (API 응답 데이터 확인이 목적이므로, 매수 기록 필터링 및 반환 기능은 잠시 생략)
+        # count건만 필요하면 첫 페이지만 받도록 페이지 크기/선행 요청 수를 줄임
+        page_size = min(PAGE_SIZE, max(count, 1) * 2)
+        records = islice(iter_order_history(symbol, side='bid', page_size=page_size, prefetch=1), count)
+        return [
+            {'datetime': record.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+             'amount': round(record.amount) if record.amount is not None else None}
+            for record in records
+        ]
 
     except Exception as e: # except 블록 추가 (모든 예외 처리)
-        print(f"⚠️ Bithumb API 호출 오류: {e}") # 오류 메시지 출력
+        log.error("⚠️ Bithumb API 호출 오류: %s", e) # 오류 메시지 기록
         return [] # 오류 발생 시 빈 리스트 반환
 
 if __name__ == "__main__":
-    print("⏳ 최근 3회 매수 기록 조회 시작...")
+    log.info("⏳ 최근 3회 매수 기록 조회 시작...")
     recent_buys = get_recent_buy_history_bithumb_api(symbol="BTC", count=3) # BTC 최근 3회 매수 기록 조회
 
-    if recent_buys: # 현재는 항상 빈 리스트가 반환되므로, 이 조건문은 항상 False (API 응답 데이터 확인이 목적)
-        print("\n✅ 최근 3회 매수 기록 (Bithumb API):")
+    if recent_buys:
+        log.info("\n✅ 최근 3회 매수 기록 (Bithumb API):")
         for buy in recent_buys:
-            # datetime 형식 변환 (YYYY-MM-DD HH:MM:SS) - 현재는 실행되지 않음
+            # datetime 형식 변환 (YYYY-MM-DD HH:MM:SS)
             datetime_obj = datetime.strptime(buy['datetime'], "%Y-%m-%d %H:%M:%S")
             formatted_datetime = datetime_obj.strftime("%Y-%m-%d %H:%M:%S") # 보기 좋게 format 변경
 
-            print(f"- 매수일시: {formatted_datetime}, 매수금액: {buy['amount']:,}원") # 현재는 실행되지 않음
+            amount = f"{buy['amount']:,}원" if buy['amount'] is not None else "알 수 없음 (체결 금액 미제공)"
+            log.info(f"- 매수일시: {formatted_datetime}, 매수금액: {amount}")
     else:
-        print("\n❌ 매수 기록 조회 실패 또는 매수 기록 없음 (Bithumb API)") # Bithumb API 명시 - API 호출 자체는 성공해도 빈 리스트가 반환되므로, 이 메시지가 출력될 수 있음
+        log.warning("\n❌ 매수 기록 조회 실패 또는 매수 기록 없음 (Bithumb API)") # Bithumb API 명시
 
-    print("\n✅ 최근 3회 매수 기록 조회 완료 (Bithumb API)") # Bithumb API 명시 - API 호출 시 오류가 발생하지 않고, 함수가 정상적으로 종료되었음을 의미
\ No newline at end of file
+    log.info("\n✅ 최근 3회 매수 기록 조회 완료 (Bithumb API)") # Bithumb API 명시 - API 호출 시 오류가 발생하지 않고, 함수가 정상적으로 종료되었음을 의미
@@ -0,0 +1,186 @@
+import os
+import time
+import sqlite3
+import threading
+from collections import namedtuple
+from datetime import datetime
+
+# 원장 DB 경로
+TRADE_LEDGER_PATH = os.getenv("TRADE_LEDGER_PATH", "trade_ledger.db")
+
+# 이 수량 미만의 잔량은 포지션 종료로 취급 (부동소수점 찌꺼기)
+DUST_AMOUNT = 1e-12
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    symbol TEXT NOT NULL,
+    side TEXT NOT NULL CHECK (side IN ('bid', 'ask')),
+    ts REAL NOT NULL,
+    price REAL NOT NULL,
+    amount REAL NOT NULL,
+    fee REAL NOT NULL DEFAULT 0,
+    realized_pnl REAL,
+    order_uuid TEXT UNIQUE
+);
+CREATE INDEX IF NOT EXISTS trades_symbol_ts ON trades (symbol, ts);
+
+CREATE TABLE IF NOT EXISTS positions (
+    symbol TEXT PRIMARY KEY,
+    amount REAL NOT NULL DEFAULT 0,
+    cost REAL NOT NULL DEFAULT 0,
+    buy_fee REAL NOT NULL DEFAULT 0,
+    realized_pnl REAL NOT NULL DEFAULT 0,
+    buy_count INTEGER NOT NULL DEFAULT 0,
+    sell_count INTEGER NOT NULL DEFAULT 0,
+    updated_ts REAL
+);
+"""
+
+Position = namedtuple('Position', ['symbol', 'amount', 'cost', 'buy_fee', 'realized_pnl',
+                                   'buy_count', 'sell_count', 'updated_ts'])
+Trade = namedtuple('Trade', ['id', 'symbol', 'side', 'time', 'price', 'amount', 'fee', 'realized_pnl', 'order_uuid'])
+
+
+def average_price(position):
+    """평균 매수 단가 (보유 수량이 없으면 0)"""
+    return position.cost / position.amount if position.amount > DUST_AMOUNT else 0
+
+
+def unrealized_pnl(position, price):
+    """현재가 기준 평가 손익 (매수 수수료 포함)"""
+    return price * position.amount - position.cost - position.buy_fee
+
+
+def _apply(p, side, price, amount, fee, ts):
+    """체결 한 건을 누적값에 반영한 (새 Position, 실현 손익)을 반환합니다. (매수는 실현 손익 None)"""
+    if side == 'bid':
+        return p._replace(amount=p.amount + amount, cost=p.cost + price * amount, buy_fee=p.buy_fee + fee,
+                          buy_count=p.buy_count + 1, updated_ts=ts), None
+    # 원장 밖에서 생긴 보유분까지 팔면(잔고 전량 매도) 원장 보유분 전체를 청산한 것으로 처리
+    ratio = min(amount / p.amount, 1.0) if p.amount > DUST_AMOUNT else 0.0
+    cost = p.cost * ratio
+    buy_fee = p.buy_fee * ratio
+    profit = price * amount - cost - (buy_fee + fee)
+    remaining = p.amount * (1 - ratio)
+    if remaining <= DUST_AMOUNT:
+        p = p._replace(amount=0.0, cost=0.0, buy_fee=0.0)
+    else:
+        p = p._replace(amount=remaining, cost=p.cost - cost, buy_fee=p.buy_fee - buy_fee)
+    return p._replace(realized_pnl=p.realized_pnl + profit, sell_count=p.sell_count + 1, updated_ts=ts), profit
+
+
+class TradeLedger:
+    """
+    체결 내역을 SQLite(WAL)에 남기는 로컬 거래 원장.
+
+    체결을 기록할 때 같은 트랜잭션 안에서 심볼별 누적값(보유 수량, 매수 원가, 매수 수수료, 실현 손익)을
+    갱신하고, 메모리에도 같은 값을 들고 있으므로 평균 단가/손익 조회는 O(1)입니다.
+    프로세스가 죽어도 커밋된 체결과 누적값은 함께 남습니다.
+    """
+
+    def __init__(self, path=TRADE_LEDGER_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self.positions = {
+            row[0]: Position(*row)
+            for row in self.conn.execute("SELECT symbol, amount, cost, buy_fee, realized_pnl, buy_count, sell_count, updated_ts FROM positions")
+        }
+
+    def position(self, symbol):
+        """심볼의 현재 누적값 (기록이 없으면 0으로 채운 Position)"""
+        return self.positions.get(symbol) or Position(symbol, 0.0, 0.0, 0.0, 0.0, 0, 0, None)
+
+    def _write(self, trade, position):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = self.conn.execute(
+                "INSERT INTO trades (symbol, side, ts, price, amount, fee, realized_pnl, order_uuid) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                trade)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO positions (symbol, amount, cost, buy_fee, realized_pnl, buy_count, sell_count, updated_ts) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", position)
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.positions[position.symbol] = position
+        return cursor.lastrowid
+
+    def record_buy(self, symbol, price, amount, fee=0, ts=None, order_uuid=None):
+        """
+        매수 체결을 기록하고 갱신된 Position을 반환합니다.
+        order_uuid가 이미 기록된 주문이면 sqlite3.IntegrityError가 발생합니다. (중복 반영 방지)
+        """
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            position, _ = _apply(self.position(symbol), 'bid', price, amount, fee, ts)
+            self._write((symbol, 'bid', ts, price, amount, fee, None, order_uuid), position)
+            return position
+
+    def record_sell(self, symbol, price, amount, fee=0, ts=None, order_uuid=None):
+        """
+        매도 체결을 기록합니다. 평균 단가 기준으로 판 수량만큼의 원가/매수 수수료를 차감해 실현 손익을 계산합니다.
+
+        Returns:
+            dict: profit(실현 손익), profit_rate(%), average_buy_price, cost(차감된 원가), position(갱신된 Position)
+        """
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            before = self.position(symbol)
+            position, profit = _apply(before, 'ask', price, amount, fee, ts)
+            self._write((symbol, 'ask', ts, price, amount, fee, profit, order_uuid), position)
+            cost = before.cost - position.cost
+            return {
+                'profit': profit,
+                'profit_rate': profit / cost * 100 if cost else 0,
+                'average_buy_price': average_price(before),
+                'cost': cost,
+                'position': position,
+            }
+
+    def history(self, symbol=None, since=None, until=None, side=None):
+        """
+        체결 내역을 시간순으로 하나씩 내보냅니다. (symbol, ts 인덱스 사용)
+
+        Args:
+            symbol (str): 심볼 (None이면 전체)
+            since, until (datetime or float): 조회 구간 [since, until)
+            side (str): 'bid' / 'ask' / None
+        """
+        clauses, args = [], []
+        for column, op, value in (('symbol', '=', symbol), ('ts', '>=', since), ('ts', '<', until), ('side', '=', side)):
+            if value is not None:
+                clauses.append(f"{column} {op} ?")
+                args.append(value.timestamp() if isinstance(value, datetime) else value)
+        sql = "SELECT id, symbol, side, ts, price, amount, fee, realized_pnl, order_uuid FROM trades"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        for row in self.conn.execute(sql + " ORDER BY ts, id", args):
+            yield Trade(row[0], row[1], row[2], datetime.fromtimestamp(row[3]), *row[4:])
+
+    def rebuild(self):
+        """trades 테이블을 처음부터 다시 훑어 positions 누적값을 재계산합니다. (수동 수정 후 정합성 복구용)"""
+        with self._lock:
+            positions = {}
+            for t in self.history():
+                before = positions.get(t.symbol) or Position(t.symbol, 0.0, 0.0, 0.0, 0.0, 0, 0, None)
+                positions[t.symbol], _ = _apply(before, t.side, t.price, t.amount, t.fee, t.time.timestamp())
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute("DELETE FROM positions")
+                self.conn.executemany(
+                    "INSERT INTO positions (symbol, amount, cost, buy_fee, realized_pnl, buy_count, sell_count, updated_ts) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", positions.values())
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.positions = positions
+
+    def close(self):
+        self.conn.close()
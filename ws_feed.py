@@ -0,0 +1,256 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timezone, timedelta
+import pandas as pd
+from order_book import OrderBook
+
+try:
+    import websockets
+except ImportError:  # websockets가 없으면 피드를 쓰지 않고 REST 조회로 동작
+    websockets = None
+
+log = logging.getLogger(__name__)
+
+# BITHUMB_WS_URL로 바꿀 수 있음 (예: serve_replay() 리플레이 서버)
+WS_URL = os.getenv("BITHUMB_WS_URL", "wss://ws-api.bithumb.com/websocket/v1")
+
+# 마지막 수신 후 이 시간(초)이 지난 데이터는 오래된 것으로 보고 None 반환 (호출 측은 REST로 대체)
+STALE_SECONDS = 5
+# 재연결 대기 (지수 백오프, 초)
+RECONNECT_MIN = 1
+RECONNECT_MAX = 30
+# 체결로 만든 봉을 보관할 개수
+CANDLE_HISTORY = 200
+
+# 빗썸 봉 경계는 KST 기준
+KST = timezone(timedelta(hours=9))
+
+
+class TradeCandles:
+    """
+    체결(trade) 메시지로 KST 기준 봉을 만드는 빌더.
+    frame()은 get_ohlcv()와 같은 컬럼/인덱스의 DataFrame을 반환합니다.
+    """
+
+    def __init__(self, period, history=CANDLE_HISTORY):
+        self.period = period
+        self.rows = deque(maxlen=history)   # [start(epoch 초), open, high, low, close, volume, value]
+
+    def add(self, price, volume, ts):
+        """
+        체결 한 건을 반영합니다.
+
+        Args:
+            price (float): 체결가
+            volume (float): 체결량
+            ts (float): 체결 시각 (epoch 초)
+        """
+        local = ts + 9 * 3600
+        start = local - local % self.period - 9 * 3600
+        if self.rows and self.rows[-1][0] == start:
+            row = self.rows[-1]
+            if price > row[2]:
+                row[2] = price
+            if price < row[3]:
+                row[3] = price
+            row[4] = price
+            row[5] += volume
+            row[6] += price * volume
+        elif not self.rows or start > self.rows[-1][0]:
+            self.rows.append([start, price, price, price, price, volume, price * volume])
+        # 이미 지난 봉의 늦게 도착한 체결은 무시
+
+    def frame(self):
+        index = pd.DatetimeIndex([datetime.fromtimestamp(r[0], KST).replace(tzinfo=None) for r in self.rows],
+                                 name='candle_date_time_kst')
+        return pd.DataFrame([r[1:] for r in self.rows], index=index,
+                            columns=['open', 'high', 'low', 'close', 'volume', 'value'])
+
+
+class MarketFeed:
+    """
+    빗썸 WebSocket(orderbook/trade 스트림)으로 호가와 마지막 체결가를 로컬에 유지하는 피드.
+
+    get_orderbook()/get_current_price()는 python_bithumb의 같은 이름 함수와 같은 형태를 반환하므로
+    메인 루프는 주문 직전에 REST 왕복 없이 최신 값을 읽을 수 있습니다.
+    데이터가 없거나 STALE_SECONDS보다 오래되었으면 None을 반환합니다.
+    """
+
+    def __init__(self, symbols, candle_period=3600, url=WS_URL, stale_seconds=STALE_SECONDS,
+                 record_path=None, clock=time.time):
+        self.symbols = list(symbols)
+        self.url = url
+        self.stale_seconds = stale_seconds
+        self.clock = clock
+        self.books = {}
+        self.prices = {}
+        self.updated_at = {}
+        self.candles = {symbol: TradeCandles(candle_period) for symbol in self.symbols}
+        self.connected = False
+        self.messages = 0
+        self._listeners = []
+        self._record = open(record_path, 'a', encoding='utf-8') if record_path else None
+
+    def subscription(self):
+        """구독 요청 메시지"""
+        return json.dumps([
+            {"ticket": str(uuid.uuid4())},
+            {"type": "orderbook", "codes": self.symbols},
+            {"type": "trade", "codes": self.symbols},
+            {"format": "DEFAULT"},
+        ])
+
+    def add_listener(self, callback):
+        """체결가가 바뀔 때마다 callback(symbol, price)를 호출합니다. (이벤트 루프 스레드에서 실행)"""
+        self._listeners.append(callback)
+
+    def handle(self, message):
+        """수신한 메시지(JSON 문자열/바이트 또는 dict) 하나를 반영합니다."""
+        if not isinstance(message, dict):
+            if self._record:
+                self._record.write((message.decode() if isinstance(message, bytes) else message) + "\n")
+            message = json.loads(message)
+        kind = message.get('type')
+        symbol = message.get('code')
+        if symbol not in self.candles:
+            return
+        now = self.clock()
+        self.messages += 1
+        if kind == 'orderbook':
+            book = self.books.get(symbol)
+            if book is None:
+                book = self.books[symbol] = OrderBook(symbol)
+            book.replace(message.get('orderbook_units', []), message.get('timestamp'))
+            self.updated_at[('orderbook', symbol)] = now
+        elif kind in ('trade', 'ticker'):
+            price = float(message['trade_price'])
+            self.prices[symbol] = price
+            self.updated_at[('price', symbol)] = now
+            if kind == 'trade':
+                ts = message.get('trade_timestamp') or message.get('timestamp')
+                self.candles[symbol].add(price, float(message.get('trade_volume', 0)), ts / 1000 if ts else now)
+            for callback in self._listeners:
+                callback(symbol, price)
+
+    def _fresh(self, kind, symbol):
+        updated = self.updated_at.get((kind, symbol))
+        return updated is not None and self.clock() - updated <= self.stale_seconds
+
+    def get_orderbook(self, symbol):
+        """python_bithumb.get_orderbook(symbol)과 같은 형태의 최신 호가 (없거나 오래되었으면 None)"""
+        book = self.get_book(symbol)
+        return book.to_dict() if book is not None else None
+
+    def get_book(self, symbol):
+        """최신 OrderBook (예상 체결가/누적 잔량 조회용, 없거나 오래되었으면 None)"""
+        return self.books.get(symbol) if self._fresh('orderbook', symbol) else None
+
+    def get_current_price(self, symbol):
+        """마지막 체결가 (없거나 오래되었으면 None)"""
+        return self.prices.get(symbol) if self._fresh('price', symbol) else None
+
+    def candle_frame(self, symbol):
+        """체결로 만든 봉 DataFrame (get_ohlcv()와 같은 컬럼)"""
+        return self.candles[symbol].frame()
+
+    async def run(self):
+        """연결이 끊기면 지수 백오프로 재연결하며 계속 수신합니다. (태스크로 실행)"""
+        if websockets is None:
+            log.warning("❗ websockets 패키지가 없어 실시간 피드를 사용하지 않습니다.")
+            return
+        if os.getenv("SIMULATOR_URL") and not os.getenv("BITHUMB_WS_URL"):
+            # 시뮬레이터로 REST를 돌린 상태에서 실제 시세가 섞이지 않도록 피드를 끔 (REST 대체 경로 사용)
+            log.info("ℹ️ SIMULATOR_URL 사용 중 - 실시간 피드 비활성화")
+            return
+        delay = RECONNECT_MIN
+        while True:
+            try:
+                async with websockets.connect(self.url, ping_interval=20, max_queue=1024) as ws:
+                    await ws.send(self.subscription())
+                    self.connected = True
+                    delay = RECONNECT_MIN
+                    log.info("📡 실시간 시세 피드 연결 (%s)", ", ".join(self.symbols))
+                    async for message in ws:
+                        self.handle(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error("❗ 실시간 피드 연결 오류: %s - %s초 후 재연결", e, delay)
+            finally:
+                self.connected = False
+                if self._record:
+                    self._record.flush()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX)
+
+
+def load_recording(path):
+    """record_path로 저장한 메시지(JSON 한 줄씩)를 리스트로 읽습니다."""
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+async def serve_replay(messages, host="127.0.0.1", port=0, speed=1.0):
+    """
+    녹화한 메시지를 WebSocket으로 다시 흘려보내는 로컬 리플레이 서버를 띄웁니다.
+    접속한 클라이언트가 구독 메시지를 보내면 메시지 간 원래 시간 간격을 speed배로 줄여 전송합니다. (speed=0이면 대기 없음)
+
+    Returns:
+        (server, url): websockets 서버 객체와 접속 URL
+    """
+    def stamp(message):
+        return message.get('trade_timestamp') or message.get('timestamp') or 0
+
+    async def handler(ws):
+        await ws.recv()   # 구독 요청
+        previous = None
+        for message in messages:
+            if speed and previous is not None:
+                gap = (stamp(message) - previous) / 1000 / speed
+                if gap > 0:
+                    await asyncio.sleep(gap)
+            previous = stamp(message)
+            await ws.send(json.dumps(message))
+        await ws.wait_closed()
+
+    server = await websockets.serve(handler, host, port)
+    bound_port = next(iter(server.sockets)).getsockname()[1]
+    return server, f"ws://{host}:{bound_port}"
+
+
+if __name__ == "__main__":
+    import random
+
+    # 가상 체결/호가를 리플레이 서버로 보내 피드의 수신 지연과 봉 생성을 확인
+    async def demo():
+        base = int(time.time() * 1000)
+        messages = []
+        price = 100_000_000.0
+        for i in range(2000):
+            price *= 1 + random.gauss(0, 0.0005)
+            messages.append({'type': 'trade', 'code': 'KRW-BTC', 'trade_price': round(price),
+                             'trade_volume': 0.001, 'trade_timestamp': base + i * 1000, 'ask_bid': 'BID'})
+            if i % 10 == 0:
+                messages.append({'type': 'orderbook', 'code': 'KRW-BTC', 'timestamp': base + i * 1000,
+                                 'total_ask_size': 1.0, 'total_bid_size': 1.0,
+                                 'orderbook_units': [{'ask_price': round(price) + 1000, 'bid_price': round(price) - 1000,
+                                                      'ask_size': 0.5, 'bid_size': 0.5}]})
+        server, url = await serve_replay(messages, speed=0)
+        feed = MarketFeed(['KRW-BTC'], candle_period=60, url=url)
+        start = time.perf_counter()
+        task = asyncio.create_task(feed.run())
+        while feed.messages < len(messages):
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - start
+        task.cancel()
+        server.close()
+        print(f"📨 {feed.messages}개 메시지 {elapsed:.2f}초 ({feed.messages / elapsed:.0f} msg/s)")
+        print(f"💹 현재가: {feed.get_current_price('KRW-BTC')}, 매도 1호가: {feed.get_orderbook('KRW-BTC')['orderbook_units'][0]['ask_price']}")
+        print(feed.candle_frame('KRW-BTC').tail(3))
+
+    asyncio.run(demo())
@@ -1,19 +1,36 @@
 import os
 import time
-import pandas as pd
+import asyncio
 import ta
-import requests
 from datetime import datetime
 import python_bithumb
+import http_transport
+import metrics
+from bithumb_auth import sign_python_bithumb
 from dotenv import load_dotenv
 import json
 from openai import OpenAI
+from indicator_engine import IncrementalIndicators
+from candle_buffer import CandleBuffer
+from candle_store import CandleStore
+from async_fetch import gather_calls, FETCH_TIMEOUTS
+from candle_scheduler import CandleScheduler, PRICE_POLL_SECONDS
+from decision_cache import DecisionCache, make_key
+from trade_ledger import TradeLedger
+from ws_feed import MarketFeed
+from order_book import OrderBook
+from async_log import get_logger
+from balance_snapshot import BalanceSnapshot
+from fill_tracker import FillTracker
+from fear_greed import get_index
 
 # 환경변수 로드 및 API 객체 초기화
 load_dotenv()
+http_transport.patch_python_bithumb()
+log = get_logger("yhgo_okno-gpt")
 access_key = os.getenv("BITHUMB_ACCESS_KEY")
 secret_key = os.getenv("BITHUMB_SECRET_KEY")
-bithumb = python_bithumb.Bithumb(access_key, secret_key)
+bithumb = sign_python_bithumb(python_bithumb.Bithumb(access_key, secret_key))
 openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 # 상수 정의
@@ -22,10 +39,42 @@ INTERVAL = "1h"
 DAILY_TRADES = 5
 MIN_KRW = 10001
 FIXED_BUY_AMOUNT = 10001
+# 최우선 매도 호가 대비 예상 평균 체결가가 이 비율 이상 불리하면 매수 보류
+MAX_SLIPPAGE = 0.005
+
+# 마지막 저장 봉 이후만 받아오는 로컬 봉 저장소
+candle_store = CandleStore(SYMBOL, INTERVAL)
+
+# AI 판단 캐시 (프롬프트를 바꾸면 PROMPT_VERSION도 올릴 것)
+PROMPT_VERSION = "gpt-v1"
+AI_COLUMNS = ['open','high','low','close','volume','MA5','MA20','RSI','MACD','MACD_Signal','Upper_BB','Lower_BB']
+decision_cache = DecisionCache()
+
+# 매수/매도 체결과 평균 단가/실현 손익을 재시작 후에도 유지하는 로컬 원장
+ledger = TradeLedger()
+
+# 틱마다 get_balances() 한 번으로 받아 두는 전체 잔고 (주문 후 invalidate()하면 다음 조회 때 다시 받아옴)
+balances = BalanceSnapshot(bithumb)
+
+# 호가/체결가를 WebSocket으로 유지하는 실시간 피드 (끊기거나 오래되면 REST로 대체)
+# (봉 길이는 get_ohlcv()가 실제로 받아오는 봉 기준 - "1h"는 일봉)
+feed = MarketFeed([SYMBOL], candle_period=candle_store.period)
+# 피드가 살아 있으면 가격 임계값을 이 주기(초)로 로컬에서 확인 (끊겼거나 오래되었으면 REST 조회라 PRICE_POLL_SECONDS)
+FEED_POLL_SECONDS = 1
+
+# 원본 갱신 일정에 맞춰서만 조회하는 공포 탐욕 지수 캐시
+fear_greed_index = get_index()
+
+# 틱마다 전체 재계산 대신 새로/수정된 봉만 반영하는 증분 지표 엔진
+indicator_engine = IncrementalIndicators()
+# 최근 봉과 지표를 담는 고정 크기 링 버퍼 (틱마다 DataFrame을 만들지 않음)
+CANDLE_ROWS = 100
+candles = CandleBuffer(CANDLE_ROWS, indicator_engine)
 
 def get_technical_indicators(df):
     """
     OHLCV 데이터에 기술적 지표(MA, RSI, MACD, Bollinger Bands)를 추가합니다.
+    (전체 재계산 버전, 메인 루프는 update_technical_indicators()를 사용)
     """
     df['MA5'] = ta.trend.sma_indicator(df['close'], window=5)
     df['MA20'] = ta.trend.sma_indicator(df['close'], window=20)
@@ -41,72 +90,93 @@ def get_technical_indicators(df):
     
     return df
 
+def update_technical_indicators():
+    """
+    봉 저장소의 최근 봉을 링 버퍼에 반영합니다. 새로/수정된 봉만 증분 지표 엔진으로 계산합니다.
+
+    Returns:
+        dict: 마지막 봉의 가격/지표 (should_buy()/should_sell()에 그대로 전달)
+    """
+    with metrics.span("indicators"):
+        return candles.sync(candle_store.tail(CANDLE_ROWS))
+
 def fetch_fear_and_greed():
     """
-    대체 API를 통해 공포/탐욕 지수를 가져옵니다.
+    공포/탐욕 지수를 반환합니다. 하루 한 번 바뀌는 값이라 캐시(fear_greed.json)에서 바로 읽고,
+    원본 갱신 시각이 지났을 때만 백그라운드에서 다시 받아옵니다. (조회 실패 시 이전 값 사용)
     """
-    try:
-        response = requests.get("https://api.alternative.me/fng/", timeout=10)
-        return int(response.json()['data'][0]['value'])
-    except Exception as e:
-        print(f"❗ 공포 탐욕 지수 오류: {str(e)}")
-        return None
+    value = fear_greed_index.value()
+    if value is None:
+        log.error("❗ 공포 탐욕 지수 없음 (조회 실패)")
+    return value
 
 def get_ai_decision(df, fear_greed):
     """
     OpenAI API를 사용하여 기술적 지표와 시장 심리를 종합 분석하고
     매수/매도/홀딩 결정을 JSON 형식으로 반환합니다.
+    같은 입력(지표 tail + 공포 탐욕 지수 + 프롬프트 버전)에 대한 판단은 캐시에서 돌려줍니다.
     """
+    tail = df[AI_COLUMNS].tail()
+    cache_key = make_key(tail, fear_greed, PROMPT_VERSION)
+    cached = decision_cache.get(cache_key)
+    if cached is not None:
+        metrics.inc("ai_decision_cache_total", result="hit")
+        return cached
+    metrics.inc("ai_decision_cache_total", result="miss")
     try:
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system", 
-                    "content": (
-                        "당신은 금융 전문가입니다. 다음 지표를 종합 분석하여 매수, 매도, 홀딩 중 하나의 결정을 JSON 형식으로 내려주세요:\n"
-                        "1. 이동평균선(5일 vs 20일) 크로스오버: MA5와 MA20의 관계 분석\n"
-                        "2. RSI 과매수/과매도 상태: RSI 지표를 활용한 시장의 과열/침체 판단\n"
-                        "3. MACD 선과 시그널 선 관계: MACD, MACD_Signal 선의 교차 및 방향성 분석\n"
-                        "4. 볼린저 밴드 위치: 현재 가격이 볼린저 밴드 내 어느 위치에 있는지 파악\n"
-                        "5. 공포/탐욕 지수: 시장의 전반적인 투자 심리 (극단적 공포 또는 탐욕 상태)\n"
-                        "6. 거래량 변화 추이: 최근 거래량 변화를 분석하여 투자 심리 및 추세 강도 파악\n\n"
-                        "**투자 원칙:**\n"
-                        "- **손실 최소화**: 안정적인 투자를 최우선 목표로 손실 위험을 최소화합니다.\n"
-                        "- **보수적 매매**: 최소 3개 이상의 긍정적 지표가 확인될 때만 신중하게 매수를 고려합니다.\n"
-                        "- **위험 관리**: 2개 이상의 부정적 지표가 감지되면 즉시 매도하여 리스크를 관리합니다.\n"
-                        "- **탐욕 경계**: 탐욕 지수가 과도하게 높을 때는 시장 과열을 경계하고 매도 우선 전략을 고려합니다.\n\n"
-                        "**JSON 형식 예시:**\n"
-                        "```json\n"
-                        '{"decision": "buy", "reason": "MA5>MA20, RSI 28, MACD 상승"}\n'
-                        "```"
-                    )
-                },
-                {
-                    "role": "user", 
-                    "content": (
-                        f"최근 100개 {INTERVAL} 봉 데이터:\n"
-                        f"{df[['open','high','low','close','volume','MA5','MA20','RSI','MACD','MACD_Signal','Upper_BB','Lower_BB']].tail().to_markdown()}\n"
-                        f"공포 탐욕 지수: {fear_greed}/100"
-                    )
-                }
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.2
-        )
-        return json.loads(response.choices[0].message.content)
+        with metrics.span("ai_decision", model="gpt-4o-mini"):
+            response = openai_client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {
+                        "role": "system", 
+                        "content": (
+                            "당신은 금융 전문가입니다. 다음 지표를 종합 분석하여 매수, 매도, 홀딩 중 하나의 결정을 JSON 형식으로 내려주세요:\n"
+                            "1. 이동평균선(5일 vs 20일) 크로스오버: MA5와 MA20의 관계 분석\n"
+                            "2. RSI 과매수/과매도 상태: RSI 지표를 활용한 시장의 과열/침체 판단\n"
+                            "3. MACD 선과 시그널 선 관계: MACD, MACD_Signal 선의 교차 및 방향성 분석\n"
+                            "4. 볼린저 밴드 위치: 현재 가격이 볼린저 밴드 내 어느 위치에 있는지 파악\n"
+                            "5. 공포/탐욕 지수: 시장의 전반적인 투자 심리 (극단적 공포 또는 탐욕 상태)\n"
+                            "6. 거래량 변화 추이: 최근 거래량 변화를 분석하여 투자 심리 및 추세 강도 파악\n\n"
+                            "**투자 원칙:**\n"
+                            "- **손실 최소화**: 안정적인 투자를 최우선 목표로 손실 위험을 최소화합니다.\n"
+                            "- **보수적 매매**: 최소 3개 이상의 긍정적 지표가 확인될 때만 신중하게 매수를 고려합니다.\n"
+                            "- **위험 관리**: 2개 이상의 부정적 지표가 감지되면 즉시 매도하여 리스크를 관리합니다.\n"
+                            "- **탐욕 경계**: 탐욕 지수가 과도하게 높을 때는 시장 과열을 경계하고 매도 우선 전략을 고려합니다.\n\n"
+                            "**JSON 형식 예시:**\n"
+                            "```json\n"
+                            '{"decision": "buy", "reason": "MA5>MA20, RSI 28, MACD 상승"}\n'
+                            "```"
+                        )
+                    },
+                    {
+                        "role": "user", 
+                        "content": (
+                            f"최근 100개 {INTERVAL} 봉 데이터:\n"
+                            f"{tail.to_markdown()}\n"
+                            f"공포 탐욕 지수: {fear_greed}/100"
+                        )
+                    }
+                ],
+                response_format={"type": "json_object"},
+                temperature=0.2
+            )
+        decision = json.loads(response.choices[0].message.content)
+        if decision:
+            decision_cache.put(cache_key, decision)
+        return decision
     except json.JSONDecodeError as json_error:
-        print(f"❗ AI 판단 JSON 디코드 오류: {str(json_error)}")
+        log.error(f"❗ AI 판단 JSON 디코드 오류: {str(json_error)}")
         return {}
     except Exception as e:
-        print(f"❗ AI 판단 오류: {str(e)}")
+        log.error(f"❗ AI 판단 오류: {str(e)}")
         return {}
 
-def should_buy(df, fear_greed):
+def should_buy(latest, fear_greed):
     """
     매수 조건을 평가하여 조건을 충족하면 해당 사유 번호 리스트를 반환합니다.
+    latest: 마지막 봉의 가격/지표 (candles.latest() 또는 DataFrame 행)
     """
-    latest = df.iloc[-1]
     buy_reasons = []
     if latest['MA5'] > latest['MA20']:
         buy_reasons.append(1)
@@ -120,11 +190,11 @@ def should_buy(df, fear_greed):
         buy_reasons.append(5)
     return buy_reasons if len(buy_reasons) >= 3 else []
 
-def should_sell(df, fear_greed):
+def should_sell(latest, fear_greed):
     """
     매도 조건을 평가하여 조건을 충족하면 해당 사유 번호 리스트를 반환합니다.
+    latest: 마지막 봉의 가격/지표 (candles.latest() 또는 DataFrame 행)
     """
-    latest = df.iloc[-1]
     sell_reasons = []
     if latest['MA5'] < latest['MA20']:
         sell_reasons.append(1)
@@ -140,161 +210,251 @@ def should_sell(df, fear_greed):
 
 def check_balance():
     """
-    현재 계좌의 KRW 및 BTC 잔고를 확인합니다.
-    bithumb.get_balance()가 float을 반환하므로 바로 사용합니다.
+    현재 계좌의 KRW 및 BTC 잔고(주문 가능 / 미체결 주문에 묶인 수량)를 확인합니다.
+    틱 시작 시 받아 둔 잔고 스냅샷을 읽으므로 추가 조회가 없습니다. (스냅샷이 오래되었으면 한 번 갱신)
     """
     try:
-        krw_balance = bithumb.get_balance("KRW")
-        btc_balance = bithumb.get_balance("BTC")
+        krw = balances.get("KRW")
+        btc = balances.get("BTC")
         balance_list = [
-            f"1. 보유 KRW: {krw_balance:.5f} KRW",
-            f"2. 보유 BTC: {btc_balance:.5f} BTC"
+            f"1. 보유 KRW: {krw.available:.5f} KRW (주문 중 {krw.locked:.5f} KRW)",
+            f"2. 보유 BTC: {btc.available:.5f} BTC (주문 중 {btc.locked:.5f} BTC)"
         ]
         return balance_list
     except Exception as e:
-        print(f"❗ 잔고 확인 오류: {str(e)}")
+        log.error(f"❗ 잔고 확인 오류: {str(e)}")
         return ["잔고 확인에 실패했습니다."]
 
-if __name__ == "__main__":
-    buy_orders = []
+def log_fill(fill, realized):
+    """
+    체결 추적기가 주문이 끝났을 때 호출합니다. 주문 응답이 아닌 실제 체결 내역 기준 가격/수량/수수료를 출력합니다.
+    """
+    if fill.volume <= 0:
+        log.warning("❗ 주문 %s 체결 없이 종료 (%s)", fill.uuid, fill.state)
+    elif fill.side == 'bid':
+        log.info("✅ BTC 매수 체결 - 평균 체결가: %.0f KRW, 수량: %.8f BTC, 수수료: %s KRW",
+                 fill.price, fill.volume, fill.fee, extra={'fill': fill._asdict()})
+    else:
+        log.info("✅ BTC 매도 체결 - 평균 체결가: %.0f KRW, 수량: %.8f BTC, 수수료: %s KRW",
+                 fill.price, fill.volume, fill.fee, extra={'fill': fill._asdict()})
+        if realized:
+            log.info("💰 총 수익: %.2f KRW, 수익률: %.2f%% (평균 매수 가격: %.2f KRW)",
+                     realized['profit'], realized['profit_rate'], realized['average_buy_price'])
+
+# 주문이 끝날 때까지 따라가며 실제 체결 결과를 원장에 반영하고 잔고 스냅샷을 무효화하는 추적기
+fills = FillTracker(bithumb, ledger, balances, on_fill=log_fill)
+
+def latest_orderbook():
+    """
+    실시간 피드의 호가를 반환하고, 피드가 없거나 오래되었으면 REST로 조회합니다.
+    """
+    return feed.get_orderbook(SYMBOL) or python_bithumb.get_orderbook(SYMBOL)
+
+def latest_price():
+    """
+    실시간 피드의 마지막 체결가를 반환하고, 피드가 없거나 오래되었으면 REST로 조회합니다.
+    """
+    price = feed.get_current_price(SYMBOL)
+    return price if price is not None else python_bithumb.get_current_price(SYMBOL)
+
+def price_poll_seconds():
+    """
+    가격 임계값 확인 주기. 피드 가격이 살아 있을 때만 1초, 아니면 REST 티커 조회이므로 PRICE_POLL_SECONDS.
+    """
+    if feed.connected and feed.get_current_price(SYMBOL) is not None:
+        return FEED_POLL_SECONDS
+    return PRICE_POLL_SECONDS
+
+def tick_calls():
+    """
+    한 틱에 필요한 서로 독립적인 조회 목록 (gather_calls()로 동시에 실행)
+    """
+    return {
+        'candles': (candle_store.refresh,),
+        'fear_greed': (fetch_fear_and_greed,),
+        'balances': (balances.refresh,),
+        'orderbook': (latest_orderbook,),
+        'current_price': (latest_price,),
+    }
+
+# 봉 경계 및 볼린저 밴드 돌파 시점에만 깨어나는 스케줄러
+scheduler = CandleScheduler(INTERVAL, price_fn=latest_price, poll_seconds=price_poll_seconds, period=candle_store.period)
+
+async def main():
     trades_today = 0
     last_trade_time = None
     last_reset_date = datetime.now().date()
 
-    print("--- 자동 매매 시작 ---")
+    log.info("--- 자동 매매 시작 ---")
+    metrics.start_exporter()
+    fear_greed_index.start()
+    feed_task = asyncio.create_task(feed.run())
 
     while True:
         try:
+            tick_start = time.perf_counter()
             now = datetime.now()
             if now.date() != last_reset_date:
                 trades_today = 0
                 last_reset_date = now.date()
-                print("🔄 일일 매매 횟수 초기화 (자정 기준)")
+                log.info("🔄 일일 매매 횟수 초기화 (자정 기준)")
+
+            # 봉, 공포 탐욕 지수, 잔고, 호가, 현재가를 동시에 조회
+            inputs, errors, elapsed = await gather_calls(tick_calls(), FETCH_TIMEOUTS)
+            for name, error in errors.items():
+                log.error(f"❗ {name} 조회 오류: {error}")
 
-            df = python_bithumb.get_ohlcv(SYMBOL, INTERVAL)
-            if df is None or df.empty:
-                print("❗ OHLCV 데이터 조회 실패, 5초 후 재시도...")
-                time.sleep(5)
+            latest = update_technical_indicators()
+            if not len(candles):
+                log.warning("❗ OHLCV 데이터 조회 실패, 5초 후 재시도...")
+                await asyncio.sleep(5)
                 continue
 
-            df = df.tail(100)
-            df = get_technical_indicators(df)
-            fear_greed = fetch_fear_and_greed()
+            fear_greed = inputs['fear_greed']
+            if 'balances' in errors:
+                krw_balance = btc_balance = None
+            else:
+                krw_balance = balances.available("KRW")
+                btc_balance = balances.available("BTC")
 
-            buy_reasons = should_buy(df, fear_greed)
-            sell_reasons = should_sell(df, fear_greed)
+            # 봉 중간에는 가격이 볼린저 밴드 밖으로 나갈 때만 다시 평가
+            scheduler.set_price_triggers(latest['Lower_BB'], latest['Upper_BB'])
+            if not scheduler.changed(candles.last_time(), latest['close'], fear_greed, krw_balance, btc_balance, trades_today):
+                log.info(f"⏸️ 입력 변화 없음 - {now.strftime('%H:%M:%S')} 평가 생략 (다음 업데이트 시간: {scheduler.upcoming().strftime('%H:%M:%S')})")
+                await scheduler.wait()
+                continue
 
-            balance_info = check_balance()
+            buy_reasons = should_buy(latest, fear_greed)
+            sell_reasons = should_sell(latest, fear_greed)
+            if buy_reasons:
+                metrics.inc("signals_total", side="buy")
+            if sell_reasons:
+                metrics.inc("signals_total", side="sell")
+
+            balance_info = None if 'balances' in errors else check_balance()
             if balance_info:
-                print("💰 계좌 잔고:")
+                log.info("💰 계좌 잔고:")
                 for balance_item in balance_info:
-                    print(f"  - {balance_item}")
+                    log.info(f"  - {balance_item}")
             else:
-                print("❗ 잔고 확인 실패")
+                log.warning("❗ 잔고 확인 실패")
 
             # 매수 신호 처리
             if buy_reasons and trades_today < DAILY_TRADES:
-                available_krw = bithumb.get_balance("KRW")
-                if FIXED_BUY_AMOUNT <= available_krw:
-                    print("🟢 매수 신호 발생!")
-                    print("매수 사유:")
+                if krw_balance is not None and FIXED_BUY_AMOUNT <= krw_balance:
+                    log.info("🟢 매수 신호 발생!")
+                    log.info("매수 사유:")
                     for reason in buy_reasons:
                         if reason == 1:
-                            print("  1. 이동평균선 (MA5 > MA20)")
+                            log.info("  1. 이동평균선 (MA5 > MA20)")
                         elif reason == 2:
-                            print("  2. RSI (RSI < 35)")
+                            log.info("  2. RSI (RSI < 35)")
                         elif reason == 3:
-                            print("  3. MACD (MACD > MACD_Signal)")
+                            log.info("  3. MACD (MACD > MACD_Signal)")
                         elif reason == 4:
-                            print("  4. 볼린저 밴드 (현재 가격 < 볼린저 밴드 하단)")
+                            log.info("  4. 볼린저 밴드 (현재 가격 < 볼린저 밴드 하단)")
                         elif reason == 5:
-                            print("  5. 시장 심리 (공포 탐욕 지수 < 30)")
+                            log.info("  5. 시장 심리 (공포 탐욕 지수 < 30)")
 
                     try:
-                        orderbook = bithumb.get_orderbook(SYMBOL)
-                        if orderbook and orderbook['asks']:
-                            ask_price = orderbook['asks'][0]['price']
-                            btc_amount = FIXED_BUY_AMOUNT / ask_price
-                            buy_result = bithumb.buy_market_order(SYMBOL, btc_amount)
+                        # 주문 직전 호가는 피드의 최신 값 사용 (없으면 틱 시작 시 조회한 값)
+                        book = feed.get_book(SYMBOL)
+                        if book is None and inputs['orderbook']:
+                            book = OrderBook.from_orderbook(inputs['orderbook'])
+                        # 최우선 호가 하나가 아니라 호가 잔량을 차례로 먹어 들어가는 예상 평균 체결가로 슬리피지 확인
+                        fill = book.expected_buy(FIXED_BUY_AMOUNT) if book and book.best_ask() is not None else None
+                        if fill and fill.filled and book.slippage(fill) < MAX_SLIPPAGE:
+                            ask_price = fill.average_price
+                            # 시장가 매수는 수량이 아니라 원화 금액으로 주문
+                            with metrics.span("order", side="buy"):
+                                buy_result = bithumb.buy_market_order(SYMBOL, FIXED_BUY_AMOUNT)
+                            metrics.inc("orders_total", side="buy", result="ok" if buy_result else "failed")
                             if buy_result:
-                                buy_fee = buy_result.get('fee', 0)
-                                buy_orders.append({
-                                    'price': ask_price,
-                                    'amount': btc_amount,
-                                    'fee': buy_fee
-                                })
+                                # 원장 기록은 체결 추적기가 실제 체결가/수수료로 처리 (ask_price는 호가 기준 예상가)
+                                fills.track(buy_result, SYMBOL)
+                                balances.invalidate()
                                 trades_today += 1
                                 last_trade_time = now
-                                print(f"🚀 {now.strftime('%H:%M:%S')} BTC 시장가 매수 주문 성공! - 매수 가격: {ask_price} KRW, 매수 금액: {FIXED_BUY_AMOUNT} KRW, 수수료: {buy_fee}")
-                                print(f"📊 오늘 총 매수 횟수: {trades_today}/{DAILY_TRADES}")
+                                log.info("🚀 %s BTC 시장가 매수 주문 접수! - 예상 가격: %s KRW, 매수 금액: %s KRW",
+                                         now.strftime('%H:%M:%S'), ask_price, FIXED_BUY_AMOUNT, extra={'order': buy_result})
+                                log.info(f"📊 오늘 총 매수 횟수: {trades_today}/{DAILY_TRADES}")
                             else:
-                                print(f"❗ {now.strftime('%H:%M:%S')} BTC 시장가 매수 주문 실패: {buy_result}")
+                                log.warning("❗ %s BTC 시장가 매수 주문 실패: %s", now.strftime('%H:%M:%S'), buy_result)
+                        elif fill:
+                            metrics.inc("orders_skipped_total", side="buy", reason="slippage")
+                            log.info("⛔ 호가 잔량 부족 또는 예상 슬리피지 과다 (최우선 매도 %s KRW, 예상 평균 %s KRW) - 매수 보류",
+                                     book.best_ask(), fill.average_price)
                         else:
-                            print("❗ 매수 호가 정보를 가져오는데 실패했습니다.")
+                            log.warning("❗ 매수 호가 정보를 가져오는데 실패했습니다.")
                     except Exception as e:
-                        print(f"❗ BTC 매수 중 오류 발생: {e}")
+                        metrics.inc("errors_total", source="buy")
+                        log.error("❗ BTC 매수 중 오류 발생: %s", e, exc_info=True)
                 else:
-                    print("❗ 매수 가능한 KRW 잔고 부족")
+                    log.warning("❗ 매수 가능한 KRW 잔고 부족")
             else:
                 if not buy_reasons:
-                    print(f"⛔ 매수 조건 미충족 - {now.strftime('%H:%M:%S')} 매수 대기...")
+                    log.info(f"⛔ 매수 조건 미충족 - {now.strftime('%H:%M:%S')} 매수 대기...")
                 elif trades_today >= DAILY_TRADES:
-                    print(f"⛔ 하루 최대 매수 횟수 초과 ({DAILY_TRADES}회) - {now.strftime('%H:%M:%S')} 매수 대기...")
+                    log.info(f"⛔ 하루 최대 매수 횟수 초과 ({DAILY_TRADES}회) - {now.strftime('%H:%M:%S')} 매수 대기...")
 
             # 매도 신호 처리
-            if sell_reasons and buy_orders:
-                print("🔴 매도 신호 발생!")
-                print("매도 사유:")
+            position = ledger.position(SYMBOL)
+            if sell_reasons and position.amount > 0:
+                log.info("🔴 매도 신호 발생!")
+                log.info("매도 사유:")
                 for reason in sell_reasons:
                     if reason == 1:
-                        print("  1. 이동평균선 (MA5 < MA20)")
+                        log.info("  1. 이동평균선 (MA5 < MA20)")
                     elif reason == 2:
-                        print("  2. RSI (RSI > 65)")
+                        log.info("  2. RSI (RSI > 65)")
                     elif reason == 3:
-                        print("  3. MACD (MACD < MACD_Signal)")
+                        log.info("  3. MACD (MACD < MACD_Signal)")
                     elif reason == 4:
-                        print("  4. 볼린저 밴드 (현재 가격 > 볼린저 밴드 상단)")
+                        log.info("  4. 볼린저 밴드 (현재 가격 > 볼린저 밴드 상단)")
                     elif reason == 5:
-                        print("  5. 시장 심리 (공포 탐욕 지수 > 70)")
+                        log.info("  5. 시장 심리 (공포 탐욕 지수 > 70)")
 
                 try:
-                    total_cost = sum(order['price'] * order['amount'] for order in buy_orders)
-                    total_amount = sum(order['amount'] for order in buy_orders)
-                    average_buy_price = total_cost / total_amount if total_amount != 0 else 0
-                    cumulative_buy_fee = sum(order['fee'] for order in buy_orders)
-
-                    current_price = python_bithumb.get_current_price(SYMBOL)
+                    current_price = feed.get_current_price(SYMBOL) or inputs['current_price']
                     if current_price and current_price > MIN_KRW:
-                        sell_amount = bithumb.get_balance("BTC")
+                        # 같은 틱에 매수했다면 스냅샷이 무효화되어 있어 이때만 다시 조회
+                        sell_amount = balances.available("BTC")
                         if sell_amount > 0:
-                            sell_result = bithumb.sell_market_order(SYMBOL, sell_amount)
+                            with metrics.span("order", side="sell"):
+                                sell_result = bithumb.sell_market_order(SYMBOL, sell_amount)
+                            metrics.inc("orders_total", side="sell", result="ok" if sell_result else "failed")
                             if sell_result:
-                                sell_fee = sell_result.get('fee', 0)
-                                sell_price = current_price
-                                profit = (sell_price * sell_amount) - total_cost - (cumulative_buy_fee + sell_fee)
-                                profit_rate = (profit / total_cost * 100) if total_cost != 0 else 0
-
-                                print(f"🚀 {now.strftime('%H:%M:%S')} BTC 시장가 매도 주문 성공! - 매도 가격: {sell_price} KRW, 매도 수량: {sell_amount} BTC, 수수료: {sell_fee}")
-                                print(f"💰 총 수익: {profit:.2f} KRW, 수익률: {profit_rate:.2f}% (평균 매수 가격: {average_buy_price:.2f} KRW)")
-                                buy_orders = []
+                                # 실현 손익은 체결 추적기가 실제 체결가로 원장에 기록한 뒤 log_fill()에서 출력
+                                fills.track(sell_result, SYMBOL)
+                                balances.invalidate()
+                                log.info("🚀 %s BTC 시장가 매도 주문 접수! - 현재 가격: %s KRW, 매도 수량: %s BTC",
+                                         now.strftime('%H:%M:%S'), current_price, sell_amount, extra={'order': sell_result})
                             else:
-                                print(f"❗ {now.strftime('%H:%M:%S')} BTC 시장가 매도 주문 실패: {sell_result}")
+                                log.warning("❗ %s BTC 시장가 매도 주문 실패: %s", now.strftime('%H:%M:%S'), sell_result)
                         else:
-                            print("❗ 매도 가능 수량이 없습니다.")
+                            log.warning("❗ 매도 가능 수량이 없습니다.")
                     else:
-                        print(f"⛔ 현재 가격이 최소 매도 금액 미만 ({MIN_KRW} KRW) 이거나 가격 정보를 가져올 수 없습니다.")
+                        log.info(f"⛔ 현재 가격이 최소 매도 금액 미만 ({MIN_KRW} KRW) 이거나 가격 정보를 가져올 수 없습니다.")
                 except Exception as e:
-                    print(f"❗ BTC 매도 중 오류 발생: {e}")
+                    metrics.inc("errors_total", source="sell")
+                    log.error("❗ BTC 매도 중 오류 발생: %s", e, exc_info=True)
             else:
                 if not sell_reasons:
-                    print(f"⛔ 매도 조건 미충족 - {now.strftime('%H:%M:%S')} 매도 대기...")
-                elif not buy_orders:
-                    print(f"⛔ 매도할 BTC 잔액 부족 - {now.strftime('%H:%M:%S')} 매도 대기...")
+                    log.info(f"⛔ 매도 조건 미충족 - {now.strftime('%H:%M:%S')} 매도 대기...")
+                elif position.amount <= 0:
+                    log.info(f"⛔ 매도할 BTC 잔액 부족 - {now.strftime('%H:%M:%S')} 매도 대기...")
 
-            next_update = (now.replace(minute=0, second=0, microsecond=0) + pd.Timedelta(hours=1)).strftime('%H:%M:%S')
-            print(f"⏳ {INTERVAL} 봉 업데이트 대기 (다음 업데이트 시간: {next_update})")
-            time.sleep(10)
+            metrics.observe("tick_seconds", time.perf_counter() - tick_start)
+            next_update = scheduler.upcoming().strftime('%H:%M:%S')
+            log.info(f"⏳ {INTERVAL} 봉 업데이트 대기 (다음 업데이트 시간: {next_update}, 조회 {elapsed:.2f}초)")
+            reason = await scheduler.wait()
+            if reason != 'candle':
+                log.info(f"⚡ 가격 임계값 돌파 ({reason}) - 봉 마감 전 재평가")
 
         except Exception as e:
-            print(f"❗ 메인 루프 오류 발생: {e}")
-            time.sleep(5)
+            metrics.inc("errors_total", source="main_loop")
+            log.error("❗ 메인 루프 오류 발생: %s", e, exc_info=True)
+            await asyncio.sleep(5)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,18 +2,29 @@ import os
 import time
 import pandas as pd
 import ta
-import requests
 from datetime import datetime, timedelta
 import python_bithumb
+import http_transport
+import metrics
+from bithumb_auth import sign_python_bithumb
 from dotenv import load_dotenv
 import json
 from openai import OpenAI
+from candle_store import CandleStore
+from candle_buffer import CandleBuffer
+from async_log import get_logger
+from balance_snapshot import BalanceSnapshot
+from trade_ledger import TradeLedger
+from fill_tracker import FillTracker
+from fear_greed import get_index
 
 # 환경 변수 로드 및 초기 설정
 load_dotenv()
+http_transport.patch_python_bithumb()
+log = get_logger("yhgo_okno-grok")
 access_key = os.getenv("BITHUMB_ACCESS_KEY")
 secret_key = os.getenv("BITHUMB_SECRET_KEY")
-bithumb = python_bithumb.Bithumb(access_key, secret_key)
+bithumb = sign_python_bithumb(python_bithumb.Bithumb(access_key, secret_key))
 openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 SYMBOL = "KRW-BTC"
@@ -21,8 +32,37 @@ INTERVAL = "1h"
 DAILY_TRADES = 5
 MIN_KRW = 10001
 FIXED_BUY_AMOUNT = 10001
+LOOP_SECONDS = 10   # 틱 간 대기 (한 틱 작업이 이보다 길면 loop_overruns_total 증가)
 
-# 기술적 지표 계산
+# 마지막 저장 봉 이후만 받아오는 로컬 봉 저장소
+candle_store = CandleStore(SYMBOL, INTERVAL)
+# 최근 100개 봉과 지표를 담는 링 버퍼 (새로/수정된 봉만 증분 계산, 틱마다 DataFrame을 만들지 않음)
+CANDLE_ROWS = 100
+candles = CandleBuffer(CANDLE_ROWS)
+
+# 틱마다 get_balances() 한 번으로 받아 두는 전체 잔고 (주문 후 invalidate()하면 다음 조회 때 다시 받아옴)
+balances = BalanceSnapshot(bithumb)
+
+# 매수/매도 체결과 평균 단가/실현 손익을 재시작 후에도 유지하는 로컬 원장
+ledger = TradeLedger()
+
+def log_fill(fill, realized):
+    """
+    체결 추적기가 주문이 끝났을 때 호출합니다. 주문 응답이 아닌 실제 체결 내역 기준 가격/수량/수수료를 출력합니다.
+    """
+    if fill.volume <= 0:
+        log.warning("❗ 주문 %s 체결 없이 종료 (%s)", fill.uuid, fill.state)
+    elif fill.side == 'bid':
+        log.info(f"✅ BTC 매수 체결 - 평균 체결가: {fill.price:.0f} KRW, 수량: {fill.volume:.8f} BTC, 수수료: {fill.fee} KRW")
+    else:
+        log.info(f"✅ BTC 매도 체결 - 평균 체결가: {fill.price:.0f} KRW, 수량: {fill.volume:.8f} BTC, 수수료: {fill.fee} KRW")
+        if realized:
+            log.info(f"💰 총 수익: {realized['profit']:.2f} KRW, 수익률: {realized['profit_rate']:.2f}% (평균 매수 가격: {realized['average_buy_price']:.2f} KRW)")
+
+# 주문이 끝날 때까지 따라가며 실제 체결 결과를 원장에 반영하고 잔고 스냅샷을 무효화하는 추적기
+fills = FillTracker(bithumb, ledger, balances, on_fill=log_fill)
+
+# 기술적 지표 계산 (전체 재계산 버전, 메인 루프는 candles.sync()를 사용)
 def get_technical_indicators(df):
     df['MA5'] = ta.trend.sma_indicator(df['close'], window=5)
     df['MA20'] = ta.trend.sma_indicator(df['close'], window=20)
@@ -35,16 +75,17 @@ def get_technical_indicators(df):
     df['Lower_BB'] = bollinger.bollinger_lband()
     return df
 
-# 공포/탐욕 지수 가져오기
+# 공포/탐욕 지수 가져오기 (하루 한 번 바뀌는 값이라 캐시에서 읽고, 원본 갱신 시각이 지났을 때만 백그라운드에서 다시 조회)
+fear_greed_index = get_index()
+
 def fetch_fear_and_greed():
-    try:
-        response = requests.get("https://api.alternative.me/fng/", timeout=10)
-        return int(response.json()['data'][0]['value'])
-    except Exception as e:
-        print(f"❗ 공포 탐욕 지수 오류: {str(e)}")
-        return None
+    value = fear_greed_index.value()
+    if value is None:
+        log.error("❗ 공포 탐욕 지수 없음 (조회 실패)")
+    return value
 
 # AI 판단 함수
+@metrics.timed("ai_decision", model="gpt-4o-mini")
 def get_ai_decision(df, fear_greed):
     try:
         response = openai_client.chat.completions.create(
@@ -77,15 +118,16 @@ def get_ai_decision(df, fear_greed):
         )
         return json.loads(response.choices[0].message.content)
     except json.JSONDecodeError as json_error:
-        print(f"❗ AI 판단 JSON 디코드 오류: {str(json_error)}")
+        metrics.inc("errors_total", source="ai_decision")
+        log.error(f"❗ AI 판단 JSON 디코드 오류: {str(json_error)}")
         return {}
     except Exception as e:
-        print(f"❗ AI 판단 오류: {str(e)}")
+        metrics.inc("errors_total", source="ai_decision")
+        log.error(f"❗ AI 판단 오류: {str(e)}")
         return {}
 
 # 매수 조건 확인
-def should_buy(df, fear_greed):
-    latest = df.iloc[-1]
+def should_buy(latest, fear_greed):
     buy_reasons = []
     if latest['MA5'] > latest['MA20']:
         buy_reasons.append(1)
@@ -103,8 +145,7 @@ def should_buy(df, fear_greed):
         return []
 
 # 매도 조건 확인
-def should_sell(df, fear_greed, buy_prices):
-    latest = df.iloc[-1]
+def should_sell(latest, fear_greed):
     sell_reasons = []
     if latest['MA5'] < latest['MA20']:
         sell_reasons.append(1)
@@ -125,29 +166,31 @@ def should_sell(df, fear_greed, buy_prices):
 def check_balance():
     balance_info = {}
     try:
-        # get_balance가 실수 값을 반환한다고 가정
-        balance_info['KRW'] = bithumb.get_balance("KRW")
-        balance_info['BTC'] = bithumb.get_balance("BTC")
+        # 틱마다 한 번 전체 잔고를 받아 두고, 이번 틱의 매수/매도 판단도 이 스냅샷을 사용
+        balances.refresh()
+        balance_info['KRW'] = balances.available("KRW")
+        balance_info['BTC'] = balances.available("BTC")
         balance_list = []
         for i, (currency, amount) in enumerate(balance_info.items(), 1):
             balance_list.append(f"{i}. 보유 {currency}: {amount:.5f} {currency}")
         return balance_list
     except Exception as e:
-        print(f"❗ 잔고 확인 오류: {str(e)}")
+        log.error(f"❗ 잔고 확인 오류: {str(e)}")
         return ["잔고 확인에 실패했습니다."]
 
 # 메인 로직
 if __name__ == "__main__":
-    buy_prices = []  # 매수 가격 기록
-    buy_fees = []    # 매수 수수료 기록
     trades_today = 0
     last_trade_time = None
     last_reset_date = None  # 자정 리셋 날짜 추적
 
-    print("--- 자동 매매 시작 ---")
+    log.info("--- 자동 매매 시작 ---")
+    metrics.start_exporter()
+    fear_greed_index.start()
 
     while True:
         try:
+            tick_start = time.perf_counter()
             now = datetime.now()
             current_hour = now.hour
 
@@ -156,134 +199,142 @@ if __name__ == "__main__":
                 if now.date() != last_reset_date:
                     trades_today = 0
                     last_reset_date = now.date()
-                    print("🔄 일일 매매 횟수 초기화 (자정 기준)")
+                    log.info("🔄 일일 매매 횟수 초기화 (자정 기준)")
 
             # OHLCV 데이터 가져오기
-            df = python_bithumb.get_ohlcv(SYMBOL, INTERVAL)
-            if df is None or df.empty:
-                print("❗ OHLCV 데이터 조회 실패, 5초 후 재시도...")
+            candle_store.refresh()
+
+            # 최근 100개 봉(메모리 맵 뷰) 중 새로/수정된 봉만 링 버퍼와 지표에 반영
+            with metrics.span("indicators"):
+                latest = candles.sync(candle_store.tail(CANDLE_ROWS))
+            if not len(candles):
+                log.warning("❗ OHLCV 데이터 조회 실패, 5초 후 재시도...")
                 time.sleep(5)
                 continue
 
-            # 최근 100개 데이터만 사용
-            df = df.tail(100)
-
-            df = get_technical_indicators(df)
             fear_greed = fetch_fear_and_greed()
 
-            buy_reasons = should_buy(df, fear_greed)
-            sell_reasons = should_sell(df, fear_greed, buy_prices)
+            buy_reasons = should_buy(latest, fear_greed)
+            sell_reasons = should_sell(latest, fear_greed)
+            if buy_reasons:
+                metrics.inc("signals_total", side="buy")
+            if sell_reasons:
+                metrics.inc("signals_total", side="sell")
 
             # 잔고 출력
             balance_info = check_balance()
             if balance_info:
-                print("💰 계좌 잔고:")
+                log.info("💰 계좌 잔고:")
                 for balance_item in balance_info:
-                    print(f"  - {balance_item}")
+                    log.info(f"  - {balance_item}")
             else:
-                print("❗ 잔고 확인 실패")
+                log.warning("❗ 잔고 확인 실패")
 
             # 매수 로직
             if buy_reasons and trades_today < DAILY_TRADES:
-                if FIXED_BUY_AMOUNT <= bithumb.get_balance("KRW"):
-                    print("🟢 매수 신호 발생!")
-                    print("매수 사유:")
+                if FIXED_BUY_AMOUNT <= balances.available("KRW"):
+                    log.info("🟢 매수 신호 발생!")
+                    log.info("매수 사유:")
                     for reason_number in buy_reasons:
                         if reason_number == 1:
-                            print(f"  {reason_number}. 이동평균선 (MA5 > MA20)")
+                            log.info(f"  {reason_number}. 이동평균선 (MA5 > MA20)")
                         elif reason_number == 2:
-                            print(f"  {reason_number}. RSI (RSI < 35)")
+                            log.info(f"  {reason_number}. RSI (RSI < 35)")
                         elif reason_number == 3:
-                            print(f"  {reason_number}. MACD (MACD > MACD_Signal)")
+                            log.info(f"  {reason_number}. MACD (MACD > MACD_Signal)")
                         elif reason_number == 4:
-                            print(f"  {reason_number}. 볼린저 밴드 (현재 가격 < 볼린저 밴드 하단)")
+                            log.info(f"  {reason_number}. 볼린저 밴드 (현재 가격 < 볼린저 밴드 하단)")
                         elif reason_number == 5:
-                            print(f"  {reason_number}. 시장 심리 (공포 탐욕 지수 < 30)")
+                            log.info(f"  {reason_number}. 시장 심리 (공포 탐욕 지수 < 30)")
 
                     try:
-                        orderbook = bithumb.get_orderbook(SYMBOL)
-                        if orderbook and orderbook['asks']:
-                            ask_price = orderbook['asks'][0]['price']
-                            buy_amount = FIXED_BUY_AMOUNT / ask_price
-                            buy_result = bithumb.buy_market_order(SYMBOL, buy_amount)
+                        # 호가 조회는 공개 API (Bithumb 인스턴스에는 get_orderbook이 없음)
+                        orderbook = python_bithumb.get_orderbook(SYMBOL)
+                        if orderbook and orderbook['orderbook_units']:
+                            ask_price = orderbook['orderbook_units'][0]['ask_price']
+                            # 시장가 매수는 수량이 아니라 원화 금액으로 주문
+                            with metrics.span("order", side="buy"):
+                                buy_result = bithumb.buy_market_order(SYMBOL, FIXED_BUY_AMOUNT)
+                            metrics.inc("orders_total", side="buy", result="ok" if buy_result else "failed")
 
                             if buy_result:
-                                buy_price = ask_price
-                                buy_prices.append(buy_price)
-                                buy_fees.append(buy_result.get('fee', 0))
+                                # 원장 기록은 체결 추적기가 실제 체결가/수수료로 처리 (ask_price는 최우선 호가 기준 예상가)
+                                fills.track(buy_result, SYMBOL)
+                                balances.invalidate()
                                 trades_today += 1
                                 last_trade_time = now
-                                print(f"🚀 {now.strftime('%H:%M:%S')} BTC 시장가 매수 주문 성공! - 매수 가격: {buy_price} KRW, 매수 금액: {FIXED_BUY_AMOUNT} KRW, 수수료: {buy_result.get('fee', 'N/A')}")
-                                print(f"📊 오늘 총 매수 횟수: {trades_today}/{DAILY_TRADES}")
+                                log.info(f"🚀 {now.strftime('%H:%M:%S')} BTC 시장가 매수 주문 접수! - 예상 가격: {ask_price} KRW, 매수 금액: {FIXED_BUY_AMOUNT} KRW")
+                                log.info(f"📊 오늘 총 매수 횟수: {trades_today}/{DAILY_TRADES}")
                             else:
-                                print(f"❗ {now.strftime('%H:%M:%S')} BTC 시장가 매수 주문 실패: {buy_result}")
+                                log.warning(f"❗ {now.strftime('%H:%M:%S')} BTC 시장가 매수 주문 실패: {buy_result}")
                         else:
-                            print("❗ 매수 호가 정보를 가져오는데 실패했습니다.")
+                            log.warning("❗ 매수 호가 정보를 가져오는데 실패했습니다.")
                     except Exception as e:
-                        print(f"❗ BTC 매수 중 오류 발생: {e}")
+                        metrics.inc("errors_total", source="buy")
+                        log.error(f"❗ BTC 매수 중 오류 발생: {e}")
                 else:
-                    print(f"⛔ KRW 잔고 부족 - {now.strftime('%H:%M:%S')} 매수 대기...")
+                    log.info(f"⛔ KRW 잔고 부족 - {now.strftime('%H:%M:%S')} 매수 대기...")
             else:
                 if not buy_reasons:
-                    print(f"⛔ 매수 조건 미충족 - {now.strftime('%H:%M:%S')} 매수 대기...")
+                    log.info(f"⛔ 매수 조건 미충족 - {now.strftime('%H:%M:%S')} 매수 대기...")
                 elif trades_today >= DAILY_TRADES:
-                    print(f"⛔ 하루 최대 매수 횟수 초과 ({DAILY_TRADES}회) - {now.strftime('%H:%M:%S')} 매수 대기...")
+                    log.info(f"⛔ 하루 최대 매수 횟수 초과 ({DAILY_TRADES}회) - {now.strftime('%H:%M:%S')} 매수 대기...")
 
             # 매도 로직
-            if sell_reasons and buy_prices:
-                print("🔴 매도 신호 발생!")
-                print("매도 사유:")
+            position = ledger.position(SYMBOL)
+            if sell_reasons and position.amount > 0:
+                log.info("🔴 매도 신호 발생!")
+                log.info("매도 사유:")
                 for reason_number in sell_reasons:
                     if reason_number == 1:
-                        print(f"  {reason_number}. 이동평균선 (MA5 < MA20)")
+                        log.info(f"  {reason_number}. 이동평균선 (MA5 < MA20)")
                     elif reason_number == 2:
-                        print(f"  {reason_number}. RSI (RSI > 65)")
+                        log.info(f"  {reason_number}. RSI (RSI > 65)")
                     elif reason_number == 3:
-                        print(f"  {reason_number}. MACD (MACD < MACD_Signal)")
+                        log.info(f"  {reason_number}. MACD (MACD < MACD_Signal)")
                     elif reason_number == 4:
-                        print(f"  {reason_number}. 볼린저 밴드 (현재 가격 > 볼린저 밴드 상단)")
+                        log.info(f"  {reason_number}. 볼린저 밴드 (현재 가격 > 볼린저 밴드 상단)")
                     elif reason_number == 5:
-                        print(f"  {reason_number}. 시장 심리 (공포 탐욕 지수 > 70)")
+                        log.info(f"  {reason_number}. 시장 심리 (공포 탐욕 지수 > 70)")
 
                 try:
-                    average_buy_price = sum(buy_prices) / len(buy_prices)
                     current_price = python_bithumb.get_current_price(SYMBOL)
 
                     if current_price and current_price > MIN_KRW:
-                        sell_amount = bithumb.get_balance("BTC")
+                        sell_amount = balances.available("BTC")
                         if sell_amount > 0:
-                            sell_result = bithumb.sell_market_order(SYMBOL, sell_amount)
+                            with metrics.span("order", side="sell"):
+                                sell_result = bithumb.sell_market_order(SYMBOL, sell_amount)
+                            metrics.inc("orders_total", side="sell", result="ok" if sell_result else "failed")
 
                             if sell_result:
-                                sell_price = current_price
-                                total_buy_fees = sum(buy_fees)
-                                sell_fee = sell_result.get('fee', 0)
-                                total_fees = total_buy_fees + sell_fee
-                                profit = (sell_price * sell_amount) - (average_buy_price * sell_amount) - total_fees
-                                profit_rate = (profit / (average_buy_price * sell_amount)) * 100 if (average_buy_price * sell_amount) != 0 else 0
-
-                                print(f"🚀 {now.strftime('%H:%M:%S')} BTC 시장가 매도 주문 성공! - 매도 가격: {sell_price} KRW, 매도 수량: {sell_amount} BTC, 수수료: {sell_result.get('fee', 'N/A')}")
-                                print(f"💰 총 수익: {profit:.2f} KRW, 수익률: {profit_rate:.2f}% (평균 매수 가격: {average_buy_price:.2f} KRW)")
-
-                                buy_prices = []
-                                buy_fees = []
+                                # 실현 손익은 체결 추적기가 실제 체결가로 원장에 기록한 뒤 log_fill()에서 출력
+                                fills.track(sell_result, SYMBOL)
+                                balances.invalidate()
+                                log.info(f"🚀 {now.strftime('%H:%M:%S')} BTC 시장가 매도 주문 접수! - 현재 가격: {current_price} KRW, 매도 수량: {sell_amount} BTC")
                             else:
-                                print(f"❗ {now.strftime('%H:%M:%S')} BTC 시장가 매도 주문 실패: {sell_result}")
+                                log.warning(f"❗ {now.strftime('%H:%M:%S')} BTC 시장가 매도 주문 실패: {sell_result}")
                         else:
-                            print("❗ 매도 가능 수량이 없습니다.")
+                            log.warning("❗ 매도 가능 수량이 없습니다.")
                     else:
-                        print(f"⛔ 현재 가격이 최소 매도 금액 미만 ({MIN_KRW} KRW) 이거나 가격 정보를 가져올 수 없습니다.")
+                        log.info(f"⛔ 현재 가격이 최소 매도 금액 미만 ({MIN_KRW} KRW) 이거나 가격 정보를 가져올 수 없습니다.")
                 except Exception as e:
-                    print(f"❗ BTC 매도 중 오류 발생: {e}")
+                    metrics.inc("errors_total", source="sell")
+                    log.error(f"❗ BTC 매도 중 오류 발생: {e}")
             else:
                 if not sell_reasons:
-                    print(f"⛔ 매도 조건 미충족 - {now.strftime('%H:%M:%S')} 매도 대기...")
-                elif not buy_prices:
-                    print(f"⛔ 매도할 BTC 잔액 부족 - {now.strftime('%H:%M:%S')} 매도 대기...")
+                    log.info(f"⛔ 매도 조건 미충족 - {now.strftime('%H:%M:%S')} 매도 대기...")
+                elif position.amount <= 0:
+                    log.info(f"⛔ 매도할 BTC 잔액 부족 - {now.strftime('%H:%M:%S')} 매도 대기...")
 
-            print(f"⏳ {INTERVAL} 봉 업데이트 대기 (다음 업데이트 시간: {(now.replace(minute=0, second=0, microsecond=0) + pd.Timedelta(hours=1)).strftime('%H:%M:%S')})")
-            time.sleep(10)
+            log.info(f"⏳ {INTERVAL} 봉 업데이트 대기 (다음 업데이트 시간: {(now.replace(minute=0, second=0, microsecond=0) + pd.Timedelta(hours=1)).strftime('%H:%M:%S')})")
+            tick_elapsed = time.perf_counter() - tick_start
+            metrics.observe("tick_seconds", tick_elapsed)
+            if tick_elapsed > LOOP_SECONDS:
+                metrics.inc("loop_overruns_total")
+            time.sleep(LOOP_SECONDS)
 
         except Exception as e:
-            print(f"❗ 메인 루프 오류 발생: {e}")
+            metrics.inc("errors_total", source="main_loop")
+            log.error("❗ 메인 루프 오류 발생: %s", e, exc_info=True)
             time.sleep(5)
\ No newline at end of file
@@ -0,0 +1,226 @@
+import os
+import asyncio
+from datetime import datetime
+import python_bithumb
+import http_transport
+import metrics
+from bithumb_auth import sign_python_bithumb
+from dotenv import load_dotenv
+from async_fetch import gather_calls
+from candle_scheduler import CandleScheduler
+from multi_engine import MultiSymbolEngine, krw_markets, batch_prices
+from trade_ledger import TradeLedger
+from async_log import get_logger
+from balance_snapshot import BalanceSnapshot
+from fill_tracker import FillTracker
+from fear_greed import get_index
+
+# 환경변수 로드 및 API 객체 초기화
+load_dotenv()
+http_transport.patch_python_bithumb()
+log = get_logger("yhgo_okno-multi")
+access_key = os.getenv("BITHUMB_ACCESS_KEY")
+secret_key = os.getenv("BITHUMB_SECRET_KEY")
+bithumb = sign_python_bithumb(python_bithumb.Bithumb(access_key, secret_key))
+
+# 상수 정의
+# SYMBOLS(쉼표 구분, 예: "KRW-BTC,KRW-ETH")가 없으면 KRW 마켓 앞에서부터 MAX_SYMBOLS개
+SYMBOLS = [s.strip() for s in os.getenv("SYMBOLS", "").split(",") if s.strip()]
+MAX_SYMBOLS = 100
+INTERVAL = "1h"
+DAILY_TRADES = 5           # 마켓별 하루 최대 매수 횟수
+FIXED_BUY_AMOUNT = 10001   # 1회 매수 금액 (KRW)
+MIN_ORDER_KRW = 5000       # 빗썸 최소 주문 금액
+TICK_SECONDS = 60          # 봉 중간 현재가 재평가 주기 (초)
+
+FETCH_TIMEOUTS = {'prices': 10, 'fear_greed': 10, 'balances': 5}
+
+BUY_REASONS = {
+    1: "이동평균선 (MA5 > MA20)",
+    2: "RSI (RSI < 35)",
+    3: "MACD (MACD > MACD_Signal)",
+    4: "볼린저 밴드 (현재 가격 < 볼린저 밴드 하단)",
+    5: "시장 심리 (공포 탐욕 지수 < 30)",
+}
+SELL_REASONS = {
+    1: "이동평균선 (MA5 < MA20)",
+    2: "RSI (RSI > 65)",
+    3: "MACD (MACD < MACD_Signal)",
+    4: "볼린저 밴드 (현재 가격 > 볼린저 밴드 상단)",
+    5: "시장 심리 (공포 탐욕 지수 > 70)",
+}
+
+# 모든 마켓의 체결/평균 단가/실현 손익 원장
+ledger = TradeLedger()
+
+# 틱마다 get_balances() 한 번으로 받아 두는 전체 잔고 (주문 후 invalidate()하면 다음 조회 때 다시 받아옴)
+balances = BalanceSnapshot(bithumb)
+
+def log_fill(fill, realized):
+    """
+    체결 추적기가 주문이 끝났을 때 호출합니다. (실제 체결 내역 기준 가격/수량/수수료와 실현 손익 출력)
+    """
+    if fill.volume <= 0:
+        log.warning(f"❗ {fill.market} 주문 {fill.uuid} 체결 없이 종료 ({fill.state})")
+        return
+    side = "매수" if fill.side == 'bid' else "매도"
+    log.info(f"✅ {fill.market} {side} 체결 - 평균 체결가: {fill.price:.2f} KRW, 수량: {fill.volume:.8f}, 수수료: {fill.fee} KRW",
+             extra={'fill': fill._asdict()})
+    if fill.side == 'ask' and realized:
+        log.info(f"💰 {fill.market} 수익: {realized['profit']:.2f} KRW, 수익률: {realized['profit_rate']:.2f}% (평균 매수 가격: {realized['average_buy_price']:.2f} KRW)")
+
+# 주문이 끝날 때까지 따라가며 실제 체결 결과를 원장에 반영하고 잔고 스냅샷을 무효화하는 추적기
+fills = FillTracker(bithumb, ledger, balances, on_fill=log_fill)
+
+# 원본 갱신 일정에 맞춰서만 조회하는 공포 탐욕 지수 캐시
+fear_greed_index = get_index()
+
+def fetch_fear_and_greed():
+    """
+    공포/탐욕 지수를 반환합니다. 하루 한 번 바뀌는 값이라 캐시(fear_greed.json)에서 바로 읽고,
+    원본 갱신 시각이 지났을 때만 백그라운드에서 다시 받아옵니다. (모든 마켓이 공유, 조회 실패 시 이전 값 사용)
+    """
+    value = fear_greed_index.value()
+    if value is None:
+        log.error("❗ 공포 탐욕 지수 없음 (조회 실패)")
+    return value
+
+def tick_calls(symbols):
+    """
+    한 틱에 필요한 조회 목록. 마켓 수와 관계없이 현재가 ceil(N/50)번 + 잔고 1번 + 공포 탐욕 지수 1번입니다.
+    """
+    return {
+        'prices': (batch_prices, symbols),
+        'fear_greed': (fetch_fear_and_greed,),
+        'balances': (balances.refresh,),
+    }
+
+def place_buys(buys, symbols, prices, trades_today, now):
+    """
+    매수 신호가 난 마켓들에 FIXED_BUY_AMOUNT씩 시장가 매수합니다. KRW 잔고는 틱 시작 시점 스냅샷에서 차감해 가며 사용합니다.
+
+    Returns:
+        set: 이번 틱에 매수한 마켓
+    """
+    bought = set()
+    krw_balance = balances.available('KRW')
+    for i, reasons in buys:
+        symbol = symbols[i]
+        if trades_today[symbol] >= DAILY_TRADES:
+            continue
+        if krw_balance < FIXED_BUY_AMOUNT:
+            log.warning(f"❗ 매수 가능한 KRW 잔고 부족 - 남은 매수 신호 {symbol} 외 건너뜀")
+            break
+        price = prices.get(symbol)
+        if not price:
+            log.warning(f"❗ {symbol} 현재가 없음 - 매수 건너뜀")
+            continue
+        log.info("🟢 %s 매수 신호: %s", symbol, ", ".join(BUY_REASONS[r] for r in reasons))
+        try:
+            with metrics.span("order", side="buy"):
+                buy_result = bithumb.buy_market_order(symbol, FIXED_BUY_AMOUNT)
+            metrics.inc("orders_total", side="buy", result="ok" if buy_result else "failed")
+            if buy_result:
+                fills.track(buy_result, symbol)
+                krw_balance -= FIXED_BUY_AMOUNT
+                trades_today[symbol] += 1
+                bought.add(symbol)
+                log.info(f"🚀 {now.strftime('%H:%M:%S')} {symbol} 시장가 매수 주문 접수! - 현재가: {price} KRW, 금액: {FIXED_BUY_AMOUNT} KRW ({trades_today[symbol]}/{DAILY_TRADES})")
+            else:
+                log.warning(f"❗ {symbol} 시장가 매수 주문 실패: {buy_result}")
+        except Exception as e:
+            metrics.inc("errors_total", source="buy")
+            log.error(f"❗ {symbol} 매수 중 오류 발생: {e}")
+    if bought:
+        balances.invalidate()
+    return bought
+
+def place_sells(sells, symbols, prices, now):
+    """
+    매도 신호가 난 마켓 중 원장에 보유분이 있는 마켓을 전량 시장가 매도합니다.
+    (마켓마다 다른 통화를 팔므로 잔고 스냅샷은 매도를 모두 마친 뒤 한 번만 무효화)
+    """
+    sold = False
+    for i, reasons in sells:
+        symbol = symbols[i]
+        currency = symbol.split("-", 1)[1]
+        if ledger.position(symbol).amount <= 0:
+            continue
+        try:
+            # 같은 틱에 매수했다면 스냅샷이 무효화되어 있어 이때만 다시 조회 (매도가 여러 건이어도 한 번)
+            sell_amount = balances.available(currency)
+            price = prices.get(symbol)
+            if not price or sell_amount <= 0 or price * sell_amount < MIN_ORDER_KRW:
+                continue
+            log.info("🔴 %s 매도 신호: %s", symbol, ", ".join(SELL_REASONS[r] for r in reasons))
+            with metrics.span("order", side="sell"):
+                sell_result = bithumb.sell_market_order(symbol, sell_amount)
+            metrics.inc("orders_total", side="sell", result="ok" if sell_result else "failed")
+            if sell_result:
+                fills.track(sell_result, symbol)
+                sold = True
+                log.info(f"🚀 {now.strftime('%H:%M:%S')} {symbol} 시장가 매도 주문 접수! - 현재가: {price} KRW, 수량: {sell_amount}")
+            else:
+                log.warning(f"❗ {symbol} 시장가 매도 주문 실패: {sell_result}")
+        except Exception as e:
+            metrics.inc("errors_total", source="sell")
+            log.error(f"❗ {symbol} 매도 중 오류 발생: {e}")
+    if sold:
+        balances.invalidate()
+
+async def main():
+    symbols = SYMBOLS or krw_markets(MAX_SYMBOLS)
+    engine = MultiSymbolEngine(symbols, INTERVAL)
+    scheduler = CandleScheduler(INTERVAL, period=engine.period)
+    trades_today = dict.fromkeys(symbols, 0)
+    last_reset_date = datetime.now().date()
+
+    log.info(f"--- 멀티 마켓 자동 매매 시작 ({len(symbols)}개 마켓) ---")
+    metrics.start_exporter()
+    fear_greed_index.start()
+
+    while True:
+        try:
+            now = datetime.now()
+            if now.date() != last_reset_date:
+                trades_today = dict.fromkeys(symbols, 0)
+                last_reset_date = now.date()
+                log.info("🔄 일일 매매 횟수 초기화 (자정 기준)")
+
+            # 봉 경계가 지났을 때만 마켓별 봉 갱신 (그 사이에는 묶음 현재가로 진행 중인 봉만 보정)
+            with metrics.span("candles"):
+                candle_errors = await asyncio.to_thread(engine.refresh_candles)
+            if candle_errors:
+                log.warning(f"❗ 봉 갱신 실패 {len(candle_errors)}개 마켓: {', '.join(list(candle_errors)[:5])}")
+
+            inputs, errors, elapsed = await gather_calls(tick_calls(symbols), FETCH_TIMEOUTS)
+            for name, error in errors.items():
+                log.error(f"❗ {name} 조회 오류: {error}")
+
+            prices = inputs['prices'] or {}
+            with metrics.span("evaluate"):
+                engine.apply_prices(prices)
+                buys, sells, _ = engine.evaluate(inputs['fear_greed'])
+            metrics.inc("signals_total", len(buys), side="buy")
+            metrics.inc("signals_total", len(sells), side="sell")
+            log.info(f"📊 {now.strftime('%H:%M:%S')} {len(symbols)}개 마켓 평가 - 매수 신호 {len(buys)}, 매도 신호 {len(sells)} (조회 {elapsed:.2f}초)")
+
+            if 'balances' in errors:
+                log.warning("❗ 잔고 확인 실패 - 이번 틱 주문 생략")
+            else:
+                place_buys(buys, symbols, prices, trades_today, now)
+                place_sells(sells, symbols, prices, now)
+
+            try:
+                reason = await asyncio.wait_for(scheduler.wait(), TICK_SECONDS)
+                log.info(f"⏳ {INTERVAL} 봉 경계 도달 ({reason})")
+            except asyncio.TimeoutError:
+                pass
+
+        except Exception as e:
+            metrics.inc("errors_total", source="main_loop")
+            log.error("❗ 메인 루프 오류 발생: %s", e, exc_info=True)
+            await asyncio.sleep(5)
+
+if __name__ == "__main__":
+    asyncio.run(main())